@@ -1,20 +1,58 @@
 # --- Prompt Input ---
 import streamlit as st
-import json
 import os
-# --- Helper function to load file content ---
-def load_file(path, is_json=False):
-    if not os.path.exists(path):
-        return None
-    with open(path, "r", encoding="utf-8") as f:
-        if is_json:
-            try:
-                return json.load(f)
-            except:
-                return {"error": "Invalid JSON"}
-        else:
-            return f.read()
-        
+import re
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Result files are parsed once per on-disk version and shared across reruns
+from atlas.file_cache import load_file
+from atlas.intervals import dates_in, project_intervals
+from atlas.result_store import EXPORT_FILES, ResultStore, current_run, export_path
+from atlas.search import SearchIndex, project_documents, result_documents
+
+PROJECT_FILE = "project_atlas.json"
+SEARCHED_STAGES = ("scanner", "dispatcher", "safety", "qaqc", "scheduler", "planner")
+
+# --- Exports of the current run (ATLAS_RUN_ID, else the newest) ---
+@st.cache_resource
+def result_store():
+    return ResultStore()
+
+def result_file(stage):
+    """Path of ``stage``'s export for the current run; the bundled sample files before any run."""
+    try:
+        return export_path(current_run(result_store()), stage)
+    except LookupError:
+        return EXPORT_FILES[stage]
+
+# --- Intent routing: stems looked up per prompt word instead of a chain of substring checks ---
+# A word matches when it starts with a stem, so "scheduling", "planning" and
+# "inspections" route like "schedule", "plan" and "inspection".
+INTENTS = {
+    "schedul": "scheduler",
+    "safe": "safety", "violat": "safety",
+    "qa": "qaqc", "qc": "qaqc", "inspect": "qaqc",
+    "dispatch": "dispatcher",
+    "scan": "scanner",
+    "plan": "planner",
+    "evaluat": "evaluation", "score": "evaluation", "final": "evaluation",
+}
+
+def intents_in(prompt):
+    words = re.findall(r"[a-z]+", prompt)
+    return {INTENTS[word[:n]] for word in words for n in range(2, len(word) + 1) if word[:n] in INTENTS}
+
+# --- Full-text index over result files and project records, updated per changed file ---
+@st.cache_resource
+def search_index():
+    return SearchIndex()
+
+def search(prompt, limit=8):
+    index = search_index()
+    index.sync({**{result_file(stage): result_documents for stage in SEARCHED_STAGES}, PROJECT_FILE: project_documents})
+    return index.search(prompt, limit)
+
 st.subheader("🤖 Ask Atlas")
 user_prompt = st.text_input("What would you like to know?", placeholder="e.g., Any QA issues? What’s the schedule?")
 
@@ -22,18 +60,19 @@ if user_prompt:
     st.markdown("### 🧠 Project Atlas Says:")
 
     prompt = user_prompt.lower()
+    intents = intents_in(prompt)
 
     # Trigger responses based on keyword detection
-    if "schedule" in prompt or "scheduler" in prompt:
-        scheduler_txt = load_file("scheduler_results.txt")
+    if "scheduler" in intents:
+        scheduler_txt = load_file(result_file("scheduler"))
         if scheduler_txt:
             st.markdown("#### 📅 Scheduler Agent")
             st.code(scheduler_txt.strip())
         else:
             st.info("Scheduler has no updates.")
 
-    if "safety" in prompt or "violation" in prompt:
-        safety_json = load_file("safety_results.json", is_json=True)
+    if "safety" in intents:
+        safety_json = load_file(result_file("safety"), is_json=True)
         if safety_json and "violations" in safety_json:
             st.markdown("#### 🦺 Safety Agent")
             for v in safety_json["violations"]:
@@ -41,8 +80,8 @@ if user_prompt:
         else:
             st.info("No safety concerns reported.")
 
-    if "qa" in prompt or "qc" in prompt or "inspection" in prompt:
-        qaqc_json = load_file("qaqc_results.json", is_json=True)
+    if "qaqc" in intents:
+        qaqc_json = load_file(result_file("qaqc"), is_json=True)
         if qaqc_json and "inspections" in qaqc_json:
             st.markdown("#### 🧪 QA/QC Agent")
             for i in qaqc_json["inspections"]:
@@ -50,8 +89,8 @@ if user_prompt:
         else:
             st.info("No QA/QC failures found.")
 
-    if "dispatch" in prompt or "dispatcher" in prompt:
-        json_data = load_file("dispatcher_results.json", is_json=True)
+    if "dispatcher" in intents:
+        json_data = load_file(result_file("dispatcher"), is_json=True)
         if json_data and "Routing List" in json_data:
             st.markdown("#### 📦 Dispatcher Agent")
             for item in json_data["Routing List"]:
@@ -59,8 +98,8 @@ if user_prompt:
         else:
             st.info("Dispatcher has no routes assigned.")
 
-    if "scan" in prompt or "scanner" in prompt:
-        txt = load_file("scanner_results.txt")
+    if "scanner" in intents:
+        txt = load_file(result_file("scanner"))
         if txt:
             st.markdown("#### 📡 Scanner Agent")
             for line in txt.split("\n"):
@@ -69,8 +108,8 @@ if user_prompt:
         else:
             st.info("No scanner results available.")
 
-    if "plan" in prompt or "planner" in prompt:
-        planner_json = load_file("planner_results.json", is_json=True)
+    if "planner" in intents:
+        planner_json = load_file(result_file("planner"), is_json=True)
         if planner_json and "actions" in planner_json:
             st.markdown("#### 📋 Planner Agent")
             st.subheader(planner_json.get("summary", "Mitigation Plan"))
@@ -79,8 +118,8 @@ if user_prompt:
         else:
             st.info("Planner has no mitigation actions.")
 
-    if "evaluation" in prompt or "score" in prompt or "final" in prompt:
-        eval_json = load_file("evaluation_results.json", is_json=True)
+    if "evaluation" in intents:
+        eval_json = load_file(result_file("evaluation"), is_json=True)
         if eval_json and "score" in eval_json:
             st.markdown("#### 📊 Evaluator Agent")
             st.metric(label="🧠 Plan Quality Score", value=f"{eval_json['score']} / 10")
@@ -89,5 +128,25 @@ if user_prompt:
         else:
             st.info("No evaluation report yet.")
 
-    if all(kw not in prompt for kw in ["scanner", "dispatcher", "scheduler", "safety", "qa", "qc", "planner", "evaluation", "score", "plan", "schedule"]):
+    prompt_dates = dates_in(prompt)
+    if prompt_dates and os.path.exists(PROJECT_FILE):
+        # Shared, bounded index that is rebuilt only when the project file changes
+        index = project_intervals(PROJECT_FILE)
+        start, end = prompt_dates[0], prompt_dates[-1]
+        active = index.overlapping(start, end)
+        st.markdown(f"#### 🗓️ Activities active {start}" + (f" to {end}" if end != start else ""))
+        if active:
+            for a in active:
+                flag = " (critical)" if a.get("critical") else ""
+                st.markdown(f"- {a['task_id']}: {a['description']}, {a['start_date']} → {a['end_date']}, {a['assigned_to']}{flag}")
+        else:
+            st.info("No activities scheduled in that window.")
+
+    hits = search(prompt)
+    if hits:
+        st.markdown("#### 🔎 Related Records")
+        for hit in hits:
+            st.markdown(f"- **{hit['title']}**: {hit['snippet']}")
+
+    if not prompt_dates and not intents and not hits:
         st.info("Couldn't understand your request. Try asking about schedule, safety, QA/QC, etc.")
@@ -0,0 +1,67 @@
+import argparse
+import itertools
+import json
+import os
+import socket
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SOCKET_PATH = os.getenv("ATLAS_DAEMON_SOCKET", os.path.join(HERE, ".atlas_daemon.sock"))
+STAGES = ("scanner", "dispatcher", "scheduler", "safety", "qaqc", "planner", "evaluation")
+
+
+# --- Daemon client ---
+def request_daemon(request, path=SOCKET_PATH):
+    """Yield the daemon's replies to ``request``; raises OSError when no daemon is listening."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+        conn.connect(path)
+        conn.sendall((json.dumps(request) + "\n").encode("utf-8"))
+        with conn.makefile("r", encoding="utf-8") as replies:
+            for line in replies:
+                yield json.loads(line)
+
+
+def request_local(request):
+    """Serve ``request`` in this process, for when no daemon is running."""
+    import atlas_daemon
+
+    os.chdir(HERE)
+    replies = []
+    atlas_daemon.handle(request, replies.append)
+    return replies
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run Project Atlas stages through the warm agent daemon.")
+    parser.add_argument("target", choices=("pipeline",) + STAGES, help="a single stage, or the whole pipeline")
+    parser.add_argument("--run-id", help="pipeline run to read and write, e.g. a failed run to resume (default: newest run, or a new one for 'pipeline')")
+    parser.add_argument("--local", action="store_true", help="run in this process instead of the daemon")
+    args = parser.parse_args(argv)
+
+    request = {"pipeline": True} if args.target == "pipeline" else {"stage": args.target}
+    if args.run_id:
+        request["run_id"] = args.run_id
+
+    replies = None
+    if not args.local:
+        try:
+            replies = request_daemon(request)
+            first = next(replies)
+        except OSError:
+            print(f"No daemon at {SOCKET_PATH}; running in this process.", file=sys.stderr)
+            replies = None
+        else:
+            replies = itertools.chain([first], replies)
+    if replies is None:
+        replies = request_local(request)
+
+    for reply in replies:
+        if "error" in reply:
+            sys.exit(f"❌ {reply['error']}")
+        if "stage" in reply:
+            print(f"\n--- {reply['stage']} (run {reply['run_id']}, {reply['seconds']:.2f}s) ---\n")
+            print(reply["output"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+import contextlib
+import importlib.util
+import json
+import os
+import socketserver
+import sys
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from atlas.executor import run_concurrently
+from atlas.result_store import ResultStore, current_run
+
+# --- Stages ---
+# Each stage is one of the agent scripts, imported once and kept loaded:
+# crewai and the .env settings survive between requests, so a request only
+# pays for the stage's own work. Requests are served on separate threads and
+# crewai mutates an agent while it runs, so each ``run()`` builds its own.
+HERE = os.path.dirname(os.path.abspath(__file__))
+PROJECT_FILE = "project_atlas.json"
+SOCKET_PATH = os.getenv("ATLAS_DAEMON_SOCKET", os.path.join(HERE, ".atlas_daemon.sock"))
+STAGE_SCRIPTS = {
+    "scanner": "scanner_agent.py",
+    "dispatcher": "dispatcher_agent.py",
+    "scheduler": "scheduler_agent.py",
+    "safety": "safety_agent.py",
+    "qaqc": "qaqc_agent.py",
+    "planner": "planner_agent.py",
+    "evaluation": "evaluator_agent.py",
+}
+# Stages in one group only read earlier groups' rows, so they run side by side.
+PIPELINE = (("scanner",), ("dispatcher",), ("scheduler", "safety", "qaqc"), ("planner",), ("evaluation",))
+
+_modules = {}
+_modules_lock = threading.Lock()
+
+
+def stage_module(stage):
+    if stage not in STAGE_SCRIPTS:
+        raise ValueError(f"Unknown stage: {stage!r} (expected one of {', '.join(STAGE_SCRIPTS)})")
+    with _modules_lock:
+        if stage not in _modules:
+            spec = importlib.util.spec_from_file_location(f"atlas_stage_{stage}", os.path.join(HERE, STAGE_SCRIPTS[stage]))
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            _modules[stage] = module
+        return _modules[stage]
+
+
+def run_stage(stage, run_id):
+    start = time.perf_counter()
+    output = stage_module(stage).run(run_id)
+    return {"stage": stage, "run_id": run_id, "seconds": round(time.perf_counter() - start, 3), "output": output}
+
+
+def handle(request, reply):
+    """Serve one request, calling ``reply`` with a dict per finished stage.
+
+    ``{"stage": "planner", "run_id": ...}`` runs one stage (``run_id``
+    defaults to the newest run); ``{"pipeline": true}`` runs every stage for
+    a new run. A failed stage replies with ``error`` and ends the request.
+    Stages whose inputs match a checkpoint are restored rather than rerun,
+    so repeating a pipeline request with a failed run's ``run_id`` resumes
+    it at the first stale stage.
+    """
+    try:
+        store = ResultStore()
+        run_id = request.get("run_id")
+        if request.get("pipeline"):
+            run_id = run_id or store.new_run(PROJECT_FILE)
+            for group in PIPELINE:
+                for result in run_concurrently(lambda stage=stage: run_stage(stage, run_id) for stage in group):
+                    reply(result)
+        else:
+            stage = request["stage"]
+            if run_id is None:
+                run_id = store.new_run(PROJECT_FILE) if stage == "scanner" else current_run(store)
+            reply(run_stage(stage, run_id))
+    except Exception as exc:
+        reply({"error": f"{type(exc).__name__}: {exc}"})
+    reply({"done": True})
+
+
+# --- Unix socket server: one JSON request line in, JSON reply lines out ---
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            return
+
+        def reply(message):
+            self.wfile.write((json.dumps(message, default=str) + "\n").encode("utf-8"))
+            self.wfile.flush()
+
+        try:
+            request = json.loads(line)
+        except ValueError:
+            reply({"error": "Request must be one line of JSON"})
+            return
+        handle(request, reply)
+
+
+class _Server(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+
+def serve(path=SOCKET_PATH):
+    with contextlib.suppress(FileNotFoundError):
+        os.remove(path)
+    with _Server(path, _Handler) as server:
+        print(f"Atlas daemon listening on {path}")
+        try:
+            server.serve_forever()
+        finally:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(path)
+
+
+def serve_stdin():
+    """Requests on stdin, replies on stdout; the agents' own output goes to stderr."""
+    out = sys.stdout
+
+    def reply(message):
+        out.write(json.dumps(message, default=str) + "\n")
+        out.flush()
+
+    with contextlib.redirect_stdout(sys.stderr):
+        for line in sys.stdin:
+            if line.strip():
+                try:
+                    handle(json.loads(line), reply)
+                except ValueError:
+                    reply({"error": "Request must be one line of JSON"})
+
+
+if __name__ == "__main__":
+    # Relative paths in the agent scripts (project file, result store) resolve here
+    os.chdir(HERE)
+    for name in STAGE_SCRIPTS:
+        stage_module(name)
+    if "--stdin" in sys.argv[1:]:
+        serve_stdin()
+    else:
+        serve()
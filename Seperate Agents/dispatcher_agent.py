@@ -1,75 +1,77 @@
-from crewai import Agent, Task, Crew
+from crewai import Agent, Task
 from crewai.tools import BaseTool
 from dotenv import load_dotenv
+from pydantic import Field
+import json
 import os
+import sys
 
-load_dotenv()
-
-# --- Read output from ScannerAgent ---
-with open("scanner_results.txt", "r") as f:
-    raw_issues = f.read()
-
-# --- Dispatcher Logic ---
-class DispatcherLogic:
-    def __init__(self, issues_str: str):
-        self.issues = self._split_issues(issues_str)
-        self.routes = []
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from atlas.checkpoints import run_stage
+from atlas.dispatcher import DispatcherLogic
+from atlas.issues import Issue
+from atlas.result_store import ResultStore, current_run
 
-    def _split_issues(self, text: str):
-        # Split based on type tags while preserving the tag
-        parts = text.split('[')
-        tagged = [f"[{p.strip()}" for p in parts if p.strip()]
-        return tagged
+load_dotenv()
 
-    def route_issues(self):
-        for issue in self.issues:
-            if "[type_delay]" in issue:
-                self.routes.append(f"Route [type_delay] to SchedulerAgent:\n{issue}")
-            elif "[type_safety]" in issue:
-                self.routes.append(f"Route [type_safety] to SafetyAgent:\n{issue}")
-            elif "[type_inspection]" in issue:
-                self.routes.append(f"Route [type_inspection] to QAQCAgent:\n{issue}")
-        return "\n\n".join(self.routes)
+# --- Routing in the schema of dispatcher_results.json ---
+def build_routing_list(routes):
+    return {
+        "Routing List": [
+            {
+                "Issue Type": route["issue_type"],
+                "Details": route["details"],
+                "Assigned Agent": route["agent"],
+                "Date": route["date"],
+                "Section": route["section"],
+                "Record ID": route["record_id"],
+            }
+            for route in routes
+        ]
+    }
 
 # --- DispatcherTool using BaseTool ---
 class DispatcherTool(BaseTool):
     name: str = "DispatchProjectIssues"
     description: str = "Routes tagged issues to the appropriate agents based on issue type."
+    routes: list = Field(default_factory=list)
 
     def _run(self, **kwargs) -> str:
-        dispatcher = DispatcherLogic(raw_issues)
-        return dispatcher.route_issues()
+        return json.dumps(build_routing_list(self.routes), indent=2)
+
+# --- DispatcherAgent (built per run; tools are bound on the task) ---
+def build_agent():
+    return Agent(
+        role="Dispatcher",
+        goal="Route issues to the correct agent based on their type.",
+        backstory="You are the issue triage lead. Your job is to route issues detected in the project to the appropriate department.",
+        verbose=True
+    )
+
 
-# --- DispatcherAgent ---
-dispatcher_agent = Agent(
-    role="Dispatcher",
-    goal="Route issues to the correct agent based on their type.",
-    backstory="You are the issue triage lead. Your job is to route issues detected in the project to the appropriate department.",
-    tools=[DispatcherTool()],
-    verbose=True
-)
+def run(run_id=None):
+    # --- Read this run's structured issues from the result store ---
+    store = ResultStore()
+    run_id = run_id or current_run(store)
+    scanned = store.read("scanner", run_id)
+    routes = list(DispatcherLogic([Issue(**issue) for issue in scanned]).iter_routes())
 
-# --- DispatcherTask ---
-dispatcher_task = Task(
-    description="Use the tool to route project issues to the correct agent based on the type.",
-    expected_output="A routing list generated by the DispatcherTool.",
-    agent=dispatcher_agent,
-    tool_choice="auto"  # <- ensure the agent uses the tool
-)
+    # --- DispatcherTask ---
+    def build_task():
+        return Task(
+            description="Use the tool to route project issues to the correct agent based on the type.",
+            expected_output="A routing list generated by the DispatcherTool.",
+            agent=build_agent(),
+            tools=[DispatcherTool(routes=routes)],
+            tool_choice="auto"  # <- ensure the agent uses the tool
+        )
 
-# --- Crew Execution ---
-crew = Crew(
-    agents=[dispatcher_agent],
-    tasks=[dispatcher_task],
-    verbose=True
-)
+    def save(results):
+        # Save the exact routing for downstream agents; the LLM's restatement is only printed
+        return routes, build_routing_list(routes), str(results)
 
-results = crew.kickoff()
+    return run_stage(store, "dispatcher", run_id, __file__, scanned, build_task, save)
 
-# Save dispatcher output to file for downstream agents
-with open("dispatcher_results.json", "w") as f:
-    f.write(str(results))
 
-print("\n--- Dispatcher Output ---\n")
-for line in str(results).split("\n"):
-    print(line)
+if __name__ == "__main__":
+    run()
@@ -1,22 +1,16 @@
-from crewai import Agent, Task, Crew
+from crewai import Agent, Task
 from crewai.tools import BaseTool
 from dotenv import load_dotenv
+from pydantic import Field
 import json
 import os
+import sys
 
-load_dotenv()
-
-# --- Load planner output ---
-planner_path = "planner_results.json"
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from atlas.checkpoints import run_stage
+from atlas.result_store import ResultStore, current_run
 
-if not os.path.exists(planner_path):
-    raise FileNotFoundError("planner_results.json not found. Run planner_agent.py first.")
-
-with open(planner_path, "r", encoding="utf-8") as f:
-    try:
-        planner_data = json.load(f)
-    except json.JSONDecodeError:
-        raise ValueError("planner_results.json is not valid JSON.")
+load_dotenv()
 
 # --- Evaluation Logic ---
 class EvaluationLogic:
@@ -65,46 +59,47 @@ class EvaluationLogic:
 class EvaluationTool(BaseTool):
     name: str = "EvaluatePlan"
     description: str = "Evaluates the final mitigation plan for completeness and SOP alignment."
+    plan: dict = Field(default_factory=dict)
 
     def _run(self, **kwargs) -> str:
-        logic = EvaluationLogic(planner_data)
+        logic = EvaluationLogic(self.plan)
         return json.dumps(logic.evaluate(), indent=2)
 
-# --- Agent ---
-evaluator_agent = Agent(
-    role="Project Evaluator",
-    goal="Evaluate the final mitigation plan for quality and SOP alignment.",
-    backstory="You're the final checkpoint. You analyze plan clarity, SOP compliance, and provide an overall quality score.",
-    tools=[EvaluationTool()],
-    verbose=True
-)
-
-# --- Task ---
-evaluator_task = Task(
-    description="Use the provided tool to evaluate the project mitigation plan generated by the PlannerAgent. Score plan quality and check for SOP compliance.",
-    expected_output="Score (0-10), SOP compliance status, and feedback remarks.",
-    agent=evaluator_agent,
-    tool_choice="required"
-)
-
-# --- Run the Crew ---
-crew = Crew(
-    agents=[evaluator_agent],
-    tasks=[evaluator_task],
-    verbose=True
-)
-
-results = crew.kickoff()
-
-# --- Save Output ---
-try:
-    parsed = json.loads(str(results))
-except json.JSONDecodeError:
-    parsed = {"error": "Could not parse evaluator output", "raw": str(results)}
-
-with open("evaluation_results.json", "w", encoding="utf-8") as f:
-    json.dump(parsed, f, indent=2)
-
-# --- Print Result ---
-print("\n--- Evaluation Output ---\n")
-print(json.dumps(parsed, indent=2, ensure_ascii=False))
+# --- Agent (built per run; tools are bound on the task) ---
+def build_agent():
+    return Agent(
+        role="Project Evaluator",
+        goal="Evaluate the final mitigation plan for quality and SOP alignment.",
+        backstory="You're the final checkpoint. You analyze plan clarity, SOP compliance, and provide an overall quality score.",
+        verbose=True
+    )
+
+
+def run(run_id=None):
+    # --- Load this run's plan from the result store ---
+    store = ResultStore()
+    run_id = run_id or current_run(store)
+    planner_data = {"actions": store.read("planner", run_id)}
+
+    # --- Task ---
+    def build_task():
+        return Task(
+            description="Use the provided tool to evaluate the project mitigation plan generated by the PlannerAgent. Score plan quality and check for SOP compliance.",
+            expected_output="Score (0-10), SOP compliance status, and feedback remarks.",
+            agent=build_agent(),
+            tools=[EvaluationTool(plan=planner_data)],
+            tool_choice="required"
+        )
+
+    def save(results):
+        try:
+            parsed = json.loads(str(results))
+        except json.JSONDecodeError:
+            parsed = {"error": "Could not parse evaluator output", "raw": str(results)}
+        return [parsed], parsed, json.dumps(parsed)
+
+    return run_stage(store, "evaluation", run_id, __file__, planner_data, build_task, save)
+
+
+if __name__ == "__main__":
+    run()
@@ -1,31 +1,16 @@
-from crewai import Agent, Task, Crew
+from crewai import Agent, Task
 from crewai.tools import BaseTool
 from dotenv import load_dotenv
+from pydantic import Field
 import json
 import os
+import sys
 
-load_dotenv()
-
-# --- Helper to safely load JSON ---
-def load_json(filename):
-    if not os.path.exists(filename):
-        return None
-    with open(filename, "r", encoding="utf-8") as f:
-        try:
-            return json.load(f)
-        except json.JSONDecodeError:
-            return None
-def load_text(filename):
-    if not os.path.exists(filename):
-        return None
-    with open(filename, "r", encoding="utf-8") as f:
-        return f.read()
-
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from atlas.checkpoints import run_stage
+from atlas.result_store import ResultStore, current_run
 
-# --- Load inputs from agents ---
-scheduler_data = load_text("scheduler_results.txt")
-safety_data = load_json("safety_results.json")
-qaqc_data = load_json("qaqc_results.json")
+load_dotenv()
 
 # --- Planner Logic ---
 class PlannerLogic:
@@ -68,46 +53,51 @@ class PlannerLogic:
 class PlannerTool(BaseTool):
     name: str = "AggregateMitigationPlan"
     description: str = "Reads outputs from all agents and generates a single, unified mitigation plan."
+    scheduler: str = ""
+    safety: dict = Field(default_factory=dict)
+    qaqc: dict = Field(default_factory=dict)
 
     def _run(self, **kwargs) -> str:
-        logic = PlannerLogic(scheduler_data, safety_data, qaqc_data)
+        logic = PlannerLogic(self.scheduler, self.safety, self.qaqc)
         return json.dumps(logic.create_plan(), indent=2)
 
-# --- Agent ---
-planner_agent = Agent(
-    role="Planner",
-    goal="Consolidate mitigation actions from all project agents.",
-    backstory="You are the master coordinator. You gather insights from schedule, safety, and quality agents and assemble a unified action plan.",
-    tools=[PlannerTool()],
-    verbose=True
-)
-
-# --- Task ---
-planner_task = Task(
-    description="Use the provided tool to aggregate mitigation strategies from SchedulerAgent, SafetyAgent, and QAQCAgent. Build a unified project response plan.",
-    expected_output="JSON object with a summary and action items from each agent.",
-    agent=planner_agent,
-    tool_choice="required"
-)
-
-# --- Run the Crew ---
-crew = Crew(
-    agents=[planner_agent],
-    tasks=[planner_task],
-    verbose=True
-)
-
-results = crew.kickoff()
-
-# --- Save & Print ---
-try:
-    parsed = json.loads(str(results))
-except json.JSONDecodeError:
-    parsed = {"error": "Unable to parse planner output", "raw": str(results)}
-
-with open("planner_results.json", "w", encoding="utf-8") as f:
-    json.dump(parsed, f, indent=2)
-
-print("\n--- Planner Output ---\n")
-print(json.dumps(parsed, indent=2, ensure_ascii=False))
+# --- Agent (built per run; tools are bound on the task) ---
+def build_agent():
+    return Agent(
+        role="Planner",
+        goal="Consolidate mitigation actions from all project agents.",
+        backstory="You are the master coordinator. You gather insights from schedule, safety, and quality agents and assemble a unified action plan.",
+        verbose=True
+    )
+
+
+def run(run_id=None):
+    # --- Load this run's inputs from the issue agents ---
+    store = ResultStore()
+    run_id = run_id or current_run(store)
+    scheduler_data = "\n".join(row["action"] for row in store.read("scheduler", run_id))
+    safety_data = {"violations": store.read("safety", run_id)}
+    qaqc_data = {"inspections": store.read("qaqc", run_id)}
+
+    # --- Task ---
+    def build_task():
+        return Task(
+            description="Use the provided tool to aggregate mitigation strategies from SchedulerAgent, SafetyAgent, and QAQCAgent. Build a unified project response plan.",
+            expected_output="JSON object with a summary and action items from each agent.",
+            agent=build_agent(),
+            tools=[PlannerTool(scheduler=scheduler_data, safety=safety_data, qaqc=qaqc_data)],
+            tool_choice="required"
+        )
+
+    def save(results):
+        try:
+            parsed = json.loads(str(results))
+        except json.JSONDecodeError:
+            parsed = {"error": "Unable to parse planner output", "raw": str(results)}
+        return parsed.get("actions", []), parsed, json.dumps(parsed)
+
+    return run_stage(store, "planner", run_id, __file__, [scheduler_data, safety_data, qaqc_data], build_task, save)
+
 
+if __name__ == "__main__":
+    run()
@@ -1,33 +1,32 @@
-from crewai import Agent, Task, Crew
+from crewai import Agent, Task
 from crewai.tools import BaseTool
 from dotenv import load_dotenv
+from pydantic import Field
 import json
 import os
+import sys
 
-load_dotenv()
-
-# --- Load dispatcher output ---
-dispatcher_path = "dispatcher_results.json"
-
-if not os.path.exists(dispatcher_path):
-    raise FileNotFoundError("dispatcher_results.json not found. Run dispatcher_agent.py first.")
-
-with open(dispatcher_path, "r") as f:
-    try:
-        dispatcher_data = json.load(f)
-    except json.JSONDecodeError:
-        raise ValueError("dispatcher_results.json is not valid JSON.")
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from atlas.intervals import dates_in, project_intervals
+from atlas.checkpoints import file_digest, run_stage
+from atlas.result_store import ResultStore, current_run
 
-# --- Filter QAQC-relevant issues ---
-qaqc_issues = [
-    route["Details"] for route in dispatcher_data.get("Routing List", [])
-    if route.get("Assigned Agent") == "QAQCAgent"
-]
+load_dotenv()
 
 # --- QAQC Analysis Logic ---
+PROJECT_FILE = "project_atlas.json"
+
 class QAQCLogic:
-    def __init__(self, issues):
+    def __init__(self, issues, intervals=None):
         self.issues = issues
+        self.intervals = intervals
+
+    def active_on(self, issue):
+        """Activities in progress on the issue's date."""
+        dates = dates_in(issue)
+        if self.intervals is None or not dates:
+            return None
+        return self.intervals.at(dates[0])
 
     def analyze_and_recommend(self):
         if not self.issues:
@@ -35,60 +34,69 @@ class QAQCLogic:
 
         results = []
         for issue in self.issues:
-            results.append({
+            result = {
                 "inspection_failure": issue,
                 "recommended_rework": (
                     "Remove and reapply the affected material or component. "
                     "Ensure proper bonding and compliance with spec before requesting reinspection."
                 )
-            })
+            }
+            active = self.active_on(issue)
+            if active is not None:
+                result["active_activities"] = [a["task_id"] for a in active]
+            results.append(result)
         return {"inspections": results}
 
 # --- QAQC Tool ---
 class QAQCTool(BaseTool):
     name: str = "InspectionFailureReviewer"
     description: str = "Analyzes failed inspection reports and recommends rework actions."
+    issues: list = Field(default_factory=list)
 
     def _run(self, **kwargs) -> str:
-        logic = QAQCLogic(qaqc_issues)
+        logic = QAQCLogic(self.issues, project_intervals(PROJECT_FILE))
         return json.dumps(logic.analyze_and_recommend())
 
 
-# --- QAQC Agent ---
-qaqc_agent = Agent(
-    role="QA/QC Specialist",
-    goal="Ensure inspection failures are addressed with proper rework.",
-    backstory="You are in charge of quality control. You verify inspection failures are remediated promptly and effectively.",
-    tools=[QAQCTool()],
-    verbose=True
-)
-
-# --- QAQC Task ---
-qaqc_task = Task(
-    description="Use the provided tool to assess failed inspections and recommend corrective rework actions only.",
-    expected_output="Structured output showing inspection issues and recommended rework.",
-    agent=qaqc_agent,
-    tool_choice="auto"
-)
-
-# --- Run Crew ---
-crew = Crew(
-    agents=[qaqc_agent],
-    tasks=[qaqc_task],
-    verbose=True
-)
-
-results = crew.kickoff()
-
-# --- Save Result ---
-try:
-    parsed_output = results if isinstance(results, dict) else json.loads(str(results))
-except json.JSONDecodeError:
-    parsed_output = {"error": "Could not parse output", "raw": str(results)}
-
-with open("qaqc_results.json", "w", encoding="utf-8") as f:
-    json.dump(parsed_output, f, indent=2)
-
-# --- Print Output ---
-print("\n--- QAQC Output ---\n")
-print(json.dumps(parsed_output, indent=2))
+# --- QAQC Agent (built per run; tools are bound on the task) ---
+def build_agent():
+    return Agent(
+        role="QA/QC Specialist",
+        goal="Ensure inspection failures are addressed with proper rework.",
+        backstory="You are in charge of quality control. You verify inspection failures are remediated promptly and effectively.",
+        verbose=True
+    )
+
+
+def run(run_id=None):
+    # --- Routes for this agent only, from the result store ---
+    store = ResultStore()
+    run_id = run_id or current_run(store)
+    qaqc_issues = [
+        route["details"] for route in store.read("dispatcher", run_id, agent="QAQCAgent")
+    ]
+
+    # --- QAQC Task ---
+    def build_task():
+        return Task(
+            description="Use the provided tool to assess failed inspections and recommend corrective rework actions only.",
+            expected_output="Structured output showing inspection issues and recommended rework.",
+            agent=build_agent(),
+            tools=[QAQCTool(issues=qaqc_issues)],
+            tool_choice="auto"
+        )
+
+    def save(results):
+        try:
+            parsed_output = results if isinstance(results, dict) else json.loads(str(results))
+        except json.JSONDecodeError:
+            parsed_output = {"error": "Could not parse output", "raw": str(results)}
+        rows = [{**i, "agent": "QAQCAgent"} for i in parsed_output.get("inspections", [])]
+        return rows, parsed_output, json.dumps(parsed_output)
+
+    project = file_digest(PROJECT_FILE)
+    return run_stage(store, "qaqc", run_id, __file__, [qaqc_issues, project], build_task, save, tool_inputs=project)
+
+
+if __name__ == "__main__":
+    run()
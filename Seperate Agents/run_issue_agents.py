@@ -0,0 +1,44 @@
+import os
+import subprocess
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from atlas.executor import run_concurrently
+from atlas.result_store import DEFAULT_STORE_PATH, ResultStore, current_run
+
+# --- Scripts ---
+# The issue agents only read the dispatcher's rows and never each other's
+# output, so they can run side by side. The planner needs all three.
+HERE = os.path.dirname(os.path.abspath(__file__))
+ISSUE_AGENT_SCRIPTS = ["scheduler_agent.py", "safety_agent.py", "qaqc_agent.py"]
+PLANNER_SCRIPT = "planner_agent.py"
+
+
+# Pin every script to one run, so a scan started meanwhile can't switch it
+RUN_ENV = {**os.environ, "ATLAS_RUN_ID": current_run(ResultStore(os.path.join(HERE, os.getenv("ATLAS_RESULT_STORE", DEFAULT_STORE_PATH))))}
+
+
+def run_script(script):
+    return subprocess.run([sys.executable, script], cwd=HERE, capture_output=True, text=True, env=RUN_ENV)
+
+
+# --- Run issue agents concurrently, then the planner on the join ---
+results = run_concurrently(lambda script=script: run_script(script) for script in ISSUE_AGENT_SCRIPTS)
+
+failed = []
+for script, result in zip(ISSUE_AGENT_SCRIPTS, results):
+    print(f"\n--- {script} (exit {result.returncode}) ---\n")
+    print(result.stdout)
+    if result.returncode != 0:
+        print(result.stderr, file=sys.stderr)
+        failed.append(script)
+
+if failed:
+    sys.exit(f"Not running {PLANNER_SCRIPT}: {', '.join(failed)} failed.")
+
+planner = run_script(PLANNER_SCRIPT)
+print(f"\n--- {PLANNER_SCRIPT} (exit {planner.returncode}) ---\n")
+print(planner.stdout)
+if planner.returncode != 0:
+    print(planner.stderr, file=sys.stderr)
+    sys.exit(planner.returncode)
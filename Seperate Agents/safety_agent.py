@@ -1,33 +1,32 @@
-from crewai import Agent, Task, Crew
+from crewai import Agent, Task
 from crewai.tools import BaseTool
 from dotenv import load_dotenv
+from pydantic import Field
 import json
 import os
+import sys
 
-load_dotenv()
-
-# --- Load dispatcher output ---
-dispatcher_path = "dispatcher_results.json"
-
-if not os.path.exists(dispatcher_path):
-    raise FileNotFoundError("dispatcher_results.json not found. Run dispatcher_agent.py first.")
-
-with open(dispatcher_path, "r") as f:
-    try:
-        dispatcher_data = json.load(f)
-    except json.JSONDecodeError:
-        raise ValueError("dispatcher_results.json is not valid JSON.")
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from atlas.intervals import dates_in, describe_activities, project_intervals
+from atlas.checkpoints import file_digest, run_stage
+from atlas.result_store import ResultStore, current_run
 
-# --- Filter safety-related issues ---
-safety_issues = [
-    route["Details"] for route in dispatcher_data.get("Routing List", [])
-    if route.get("Assigned Agent") == "SafetyAgent"
-]
+load_dotenv()
 
 # --- Safety Analysis Logic ---
+PROJECT_FILE = "project_atlas.json"
+
 class SafetyLogic:
-    def __init__(self, issues):
+    def __init__(self, issues, intervals=None):
         self.issues = issues
+        self.intervals = intervals
+
+    def active_on(self, issue):
+        """Activities in progress on the issue's date."""
+        dates = dates_in(issue)
+        if self.intervals is None or not dates:
+            return None
+        return self.intervals.at(dates[0])
 
     def analyze_and_recommend(self):
         if not self.issues:
@@ -35,67 +34,74 @@ class SafetyLogic:
 
         recommendations = []
         for issue in self.issues:
-            recommendations.append(
+            recommendation = (
                 f"⚠️ Safety Violation:\n{issue}\n"
                 f"🔧 Mitigation Strategy: Conduct a mandatory PPE refresher session. "
                 f"Assign a dedicated floor-level safety supervisor to ensure compliance.\n"
             )
+            active = self.active_on(issue)
+            if active is not None:
+                recommendation += f"👷 Activities on site that day: {describe_activities(active)}\n"
+            recommendations.append(recommendation)
         return "\n".join(recommendations)
 
 # --- CrewAI Tool ---
 class SafetyTool(BaseTool):
     name: str = "SafetyViolationResponder"
     description: str = "Analyzes safety violations and recommends corrective actions."
+    issues: list = Field(default_factory=list)
 
     def _run(self, **kwargs) -> str:
-        logic = SafetyLogic(safety_issues)
+        logic = SafetyLogic(self.issues, project_intervals(PROJECT_FILE))
         return logic.analyze_and_recommend()
 
-# --- Agent Setup ---
-safety_agent = Agent(
-    role="Safety Officer",
-    goal="Mitigate site safety risks by analyzing reported violations.",
-    backstory="You ensure the construction site is compliant with all safety regulations and proactively handle any violations.",
-    tools=[SafetyTool()],
-    verbose=True
-)
-
-# --- Task Definition ---
-safety_task = Task(
-    description="Use the provided tool ONLY. Do not add new issues or make assumptions. Respond only to violations listed in dispatcher_results.json.",
-    expected_output="Mitigation plan for each violation found in dispatcher_results.json.",
-    agent=safety_agent,
-    tool_choice="auto"
-)
-
-# --- Run Crew ---
-crew = Crew(
-    agents=[safety_agent],
-    tasks=[safety_task],
-    verbose=True
-)
-
-results = crew.kickoff()
-
-# --- Save Result ---
-# Try to convert CrewOutput → JSON-safe dict
-try:
-    parsed_result = json.loads(str(results))
-except json.JSONDecodeError:
-    parsed_result = {
-        "violations": [
-            {
-                "raw_output": str(results),
-                "note": "Could not parse as structured JSON. This is fallback raw text."
+# --- Agent Setup (built per run; tools are bound on the task) ---
+def build_agent():
+    return Agent(
+        role="Safety Officer",
+        goal="Mitigate site safety risks by analyzing reported violations.",
+        backstory="You ensure the construction site is compliant with all safety regulations and proactively handle any violations.",
+        verbose=True
+    )
+
+
+def run(run_id=None):
+    # --- Routes for this agent only, from the result store ---
+    store = ResultStore()
+    run_id = run_id or current_run(store)
+    safety_issues = [
+        route["details"] for route in store.read("dispatcher", run_id, agent="SafetyAgent")
+    ]
+
+    # --- Task Definition ---
+    def build_task():
+        return Task(
+            description="Use the provided tool ONLY. Do not add new issues or make assumptions. Respond only to violations routed by the dispatcher.",
+            expected_output="Mitigation plan for each violation routed by the dispatcher.",
+            agent=build_agent(),
+            tools=[SafetyTool(issues=safety_issues)],
+            tool_choice="auto"
+        )
+
+    def save(results):
+        # Try to convert CrewOutput → JSON-safe dict
+        try:
+            parsed_result = json.loads(str(results))
+        except json.JSONDecodeError:
+            parsed_result = {
+                "violations": [
+                    {
+                        "raw_output": str(results),
+                        "note": "Could not parse as structured JSON. This is fallback raw text."
+                    }
+                ]
             }
-        ]
-    }
+        rows = [{**v, "agent": "SafetyAgent"} for v in parsed_result.get("violations", [])]
+        return rows, parsed_result, str(results)
 
-with open("safety_results.json", "w", encoding="utf-8") as f:
-    json.dump(parsed_result, f, indent=2)
+    project = file_digest(PROJECT_FILE)
+    return run_stage(store, "safety", run_id, __file__, [safety_issues, project], build_task, save, tool_inputs=project)
 
 
-# --- Print Output ---
-print("\n--- Safety Output ---\n")
-for line in str(results).split("\n"):
-    print(line)
+if __name__ == "__main__":
+    run()
@@ -1,84 +1,79 @@
-from crewai import Agent, Task, Crew
+from crewai import Agent, Task
 from crewai.tools import BaseTool  # ✅ Latest import method
-import json
 from dotenv import load_dotenv
+from pydantic import Field
 import os
+import sys
 
-load_dotenv()
-
-
-# --- Scanner Logic ---
-class ScannerAgentLogic:
-    def __init__(self, project_data):
-        self.project_data = project_data
-        self.issues = []
-
-    def scan_emails(self):
-        for email in self.project_data.get("emails", []):
-            if "delay" in email["body"].lower():
-                self.issues.append(f"[type_delay] {email['date']} - {email['subject']}: {email['body']}")
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from atlas.checkpoints import file_digest, run_stage
+from atlas.keywords import load_vocabulary
+from atlas.pipeline import project_pipeline
+from atlas.result_store import ResultStore
+from atlas.watermark import Watermark
 
-    def scan_site_logs(self):
-        for log in self.project_data.get("site_logs", []):
-            if "violation" in log["description"].lower():
-                self.issues.append(f"[type_safety] {log['log_date']} - {log['description']}")
-
-    def scan_inspection_reports(self):
-        for report in self.project_data.get("inspection_reports", []):
-            if "fail" in report["status"].lower():
-                self.issues.append(f"[type_inspection] {report['date']} - {report['area']}: {report['comments']}")
-
-    def run_scan(self):
-        self.scan_emails()
-        self.scan_site_logs()
-        self.scan_inspection_reports()
-        return "\n".join(self.issues)
+load_dotenv()
 
-# --- Load project data ---
-with open("project_atlas.json", "r") as f:
-    project_data = json.load(f)
+# --- Project data is streamed by the scanner, never loaded whole ---
+PROJECT_FILE = "project_atlas.json"
 
 # --- Define Tool using BaseTool ---
 class ScannerTool(BaseTool):
     name: str = "ScanProjectData"
     description: str = "Scans project data to detect delays, safety violations, and inspection failures."
+    issues: list = Field(default_factory=list)
 
     def _run(self, **kwargs) -> str:
-        scanner = ScannerAgentLogic(project_data)
-        return scanner.run_scan()
-
-# --- Agent with ScannerTool ---
-scanner_agent = Agent(
-    role="Scanner",
-    goal="Detect project issues from logs, emails, and inspection data.",
-    backstory="You're the first line of defense in spotting issues in a construction project.",
-    tools=[ScannerTool()],
-    verbose=True
-)
-
-# --- Task assigned to Scanner ---
-scanner_task = Task(
-    description=(
-        "Scan all project-related documents including emails, site logs, and inspection reports. "
-        "Identify any issues related to delays, safety violations, or failed inspections. "
-        "Clearly tag each issue using the appropriate format such as [type_delay], [type_safety], or [type_inspection]."
-    ),
-    expected_output="List of tagged issues found in the project data.",
-    agent=scanner_agent
-)
-
-# --- Run the Crew ---
-crew = Crew(
-    agents=[scanner_agent],
-    tasks=[scanner_task],
-    verbose=True
-)
-
-
-
-results = crew.kickoff()
-with open("scanner_results.txt", "w") as out_file:
-    out_file.write(str(results))
-print("\n--- Scanner Output ---\n")
-print(results)
-
+        return "\n".join(map(str, self.issues))
+
+# --- Agent (built per run; tools are bound on the task) ---
+def build_agent():
+    return Agent(
+        role="Scanner",
+        goal="Detect project issues from logs, emails, and inspection data.",
+        backstory="You're the first line of defense in spotting issues in a construction project.",
+        verbose=True
+    )
+
+
+def run(run_id=None):
+    # --- Incremental mode: only scan records added since the last saved watermark ---
+    watermark_path = os.getenv("ATLAS_SCAN_WATERMARK")
+    watermark = Watermark(watermark_path) if watermark_path else None
+
+    # --- Every scan starts a run; later agents read this run's rows from the result store ---
+    store = ResultStore()
+    run_id = store.new_run(PROJECT_FILE, run_id=run_id or os.getenv("ATLAS_RUN_ID"))
+
+    # The checkpoint covers the project file and vocabulary; watermarked scans
+    # depend on state outside the file and always run.
+    inputs = None if watermark else [file_digest(PROJECT_FILE), load_vocabulary()]
+
+    # The scan runs once; the tool and the structured rows share its result
+    pipeline = project_pipeline(PROJECT_FILE, watermark=watermark)
+
+    # --- Task assigned to Scanner ---
+    def build_task():
+        return Task(
+            description=(
+                "Scan all project-related documents including emails, site logs, and inspection reports. "
+                "Identify any issues related to delays, safety violations, or failed inspections. "
+                "Clearly tag each issue using the appropriate format such as [type_delay], [type_safety], or [type_inspection]."
+            ),
+            expected_output="List of tagged issues found in the project data.",
+            agent=build_agent(),
+            tools=[ScannerTool(issues=pipeline.result("scan"))]
+        )
+
+    def save(results):
+        # Structured issues for the dispatcher, so routing never re-parses the text
+        return [issue._asdict() for issue in pipeline.result("scan")], str(results), str(results)
+
+    output = run_stage(store, "scanner", run_id, __file__, inputs, build_task, save)
+    if watermark:
+        watermark.save()
+    return output
+
+
+if __name__ == "__main__":
+    run()
@@ -1,33 +1,52 @@
-from crewai import Agent, Task, Crew
+from crewai import Agent, Task
 from crewai.tools import BaseTool
 from dotenv import load_dotenv
-import json
+from pydantic import Field
+import functools
 import os
+import sys
 
-load_dotenv()
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from atlas.checkpoints import file_digest, run_stage
+from atlas.delay_impact import DelayImpactLogic, parse_delay_days
+from atlas.intervals import IntervalIndex, dates_in, describe_activities
+from atlas.resources import ResourceLoading
+from atlas.result_store import ResultStore, current_run
+from atlas.risk import ScheduleRisk
+from atlas.schedule import load_activities, to_days
 
-# --- Load dispatcher output (validated) ---
-dispatcher_path = "dispatcher_results.json"
+load_dotenv()
 
-if not os.path.exists(dispatcher_path):
-    raise FileNotFoundError("dispatcher_results.json not found. Run dispatcher_agent.py first.")
+# --- Schedule network (CPM), delay impact and risk ---
+PROJECT_FILE = "project_atlas.json"
 
-with open(dispatcher_path, "r") as f:
-    try:
-        dispatcher_data = json.load(f)
-    except json.JSONDecodeError:
-        raise ValueError("dispatcher_results.json is not valid JSON.")
+@functools.lru_cache(maxsize=1)
+def _schedule_models(path, mtime_ns):
+    activities = load_activities(path)
+    impact = DelayImpactLogic.from_activities(activities)
+    risk = ScheduleRisk.from_activities(impact.network, activities)
+    return impact, risk, IntervalIndex.from_activities(activities), ResourceLoading.from_activities(activities)
 
-# --- Filter scheduler-relevant issues ---
-scheduler_issues = [
-    route["Details"] for route in dispatcher_data.get("Routing List", [])
-    if route.get("Assigned Agent") == "SchedulerAgent"
-]
+def schedule_models(path=PROJECT_FILE):
+    """(impact, risk, intervals, loading), rebuilt only when the project file changes."""
+    return _schedule_models(path, os.stat(path).st_mtime_ns)
 
 # --- Logic to generate schedule recommendations ---
 class SchedulerLogic:
-    def __init__(self, issues):
+    def __init__(self, issues, impact=None, risk=None, intervals=None, loading=None):
         self.issues = issues
+        self.impact = impact
+        self.risk = risk
+        self.intervals = intervals
+        self.loading = loading
+
+    def delay_window(self, issue):
+        """Activities in progress between the issue date and the end of its delay."""
+        dates = dates_in(issue)
+        if self.intervals is None or not dates:
+            return None
+        window_end = to_days(dates[0]) + (parse_delay_days(issue) or 0)
+        return self.intervals.overlapping(dates[0], window_end)
 
     def analyze_and_suggest(self):
         if not self.issues:
@@ -38,51 +57,68 @@ class SchedulerLogic:
             suggestion = (
                 f"Delay Identified:\n{issue}\n"
                 f"Suggested Action: Coordinate with vendor and reschedule the impacted task. "
-                f"Consider pushing it to a buffer date like May 30.\n"
+                f"Only activities with total float can absorb the slip without moving the project finish.\n"
             )
+            active = self.delay_window(issue)
+            if active is not None:
+                suggestion += f"Activities in progress during the delay window: {describe_activities(active)}\n"
             suggestions.append(suggestion)
+        if self.impact is not None:
+            suggestions.append("Delay impact on the schedule:\n" + self.impact.report(self.issues))
+            suggestions.append("Schedule float (CPM):\n" + self.impact.network.summary())
+        if self.loading is not None:
+            # Over-allocated crews can't absorb re-sequenced work in those windows.
+            suggestions.append("Subcontractor loading:\n" + self.loading.summary())
+        if self.risk is not None:
+            shift = self.impact.shifts(self.issues)[0] if self.impact is not None else None
+            # Fixed seed: the same inputs give the same tool output (and LLM cache key).
+            suggestions.append("Schedule risk:\n" + self.risk.summary(shift=shift, seed=0))
         return "\n".join(suggestions)
 
 # --- Tool wrapper for CrewAI ---
 class SchedulerTool(BaseTool):
     name: str = "ScheduleIssueResolution"
     description: str = "Analyzes project delays and suggests schedule changes to reduce risk."
+    issues: list = Field(default_factory=list)
 
     def _run(self, **kwargs) -> str:
-        logic = SchedulerLogic(scheduler_issues)
+        logic = SchedulerLogic(self.issues, *schedule_models())
         return logic.analyze_and_suggest()
 
-# --- Scheduler Agent ---
-scheduler_agent = Agent(
-    role="Scheduler",
-    goal="Reduce risk of project delay by resolving scheduling conflicts and delays.",
-    backstory="You are the project schedule specialist. You evaluate delays and recommend fixes to keep things on track.",
-    tools=[SchedulerTool()],
-    verbose=True
-)
-
-# --- Task for Scheduler Agent ---
-scheduler_task = Task(
-    description="Use the provided tool to analyze known project delays and propose realistic, specific schedule mitigations. Do not invent new issues.",
-    expected_output="One action item per delay issue pulled from dispatcher_results.json.",
-    agent=scheduler_agent,
-    tool_choice="auto"
-)
-
-# --- Execute Crew ---
-crew = Crew(
-    agents=[scheduler_agent],
-    tasks=[scheduler_task],
-    verbose=True
-)
-
-results = crew.kickoff()
-
-# --- Save result ---
-with open("scheduler_results.txt", "w") as f:
-    f.write(str(results))
-
-# --- Print formatted output ---
-print("\n--- Scheduler Output ---\n")
-for line in str(results).split("\n"):
-    print(line)
+# --- Scheduler Agent (built per run; tools are bound on the task) ---
+def build_agent():
+    return Agent(
+        role="Scheduler",
+        goal="Reduce risk of project delay by resolving scheduling conflicts and delays.",
+        backstory="You are the project schedule specialist. You evaluate delays and recommend fixes to keep things on track.",
+        verbose=True
+    )
+
+
+def run(run_id=None):
+    # --- Routes for this agent only, from the result store ---
+    store = ResultStore()
+    run_id = run_id or current_run(store)
+    scheduler_issues = [
+        route["details"] for route in store.read("dispatcher", run_id, agent="SchedulerAgent")
+    ]
+
+    # --- Task for Scheduler Agent ---
+    def build_task():
+        return Task(
+            description="Use the provided tool to analyze known project delays and propose realistic, specific schedule mitigations. Do not invent new issues.",
+            expected_output="One action item per delay issue routed by the dispatcher.",
+            agent=build_agent(),
+            tools=[SchedulerTool(issues=scheduler_issues)],
+            tool_choice="auto"
+        )
+
+    def save(results):
+        return [{"agent": "SchedulerAgent", "action": str(results)}], str(results), str(results)
+
+    project = file_digest(PROJECT_FILE)
+    return run_stage(store, "scheduler", run_id, __file__, [scheduler_issues, project], build_task, save, tool_inputs=project)
+
+
+if __name__ == "__main__":
+    run()
@@ -1,152 +1,165 @@
 # Your imports and setup remain unchanged
 import streamlit as st
-from crewai import Agent, Task, Crew, Flow
+from crewai import Task, Crew, Flow
 from crewai.tools import BaseTool
-from crewai.knowledge.source.crew_docling_source import CrewDoclingSource
 from dotenv import load_dotenv
 from pydantic import Field
-import json, os, uuid, re
+import os
 from colorama import init
+from atlas.dispatcher import batch_routes
+from atlas.executor import max_concurrency
+from atlas.jobs import default_manager
+from atlas.llm_cache import cached_kickoff, crew_cache_key
+from atlas.pipeline import project_pipeline
+from atlas.stage_store import default_store
+from atlas.streamlit_cache import cached_agent
+from atlas.ui import issue_counts, issue_table, job_progress, paged_outputs, render_counts
 
 st.set_page_config(page_title="Project Atlas - Risk Mitigation", layout="wide")
 st.title("🏗️ Project Atlas - Risk Mitigation Engine")
 init(autoreset=True)
 load_dotenv()
 
+# Runs execute as background jobs; the job id lives in the URL so a refresh
+# (or another tab) picks the same run back up instead of restarting it
+manager = default_manager()
+
+def render_job(job_id, retry=None):
+    job = job_progress(manager, job_id)
+    if job["state"] == "failed":
+        st.error(f"❌ Run failed: {job['error']}")
+    elif job["state"] == "interrupted":
+        st.warning("⚠️ This run was interrupted.")
+    if job["state"] in ("failed", "interrupted"):
+        # Failed runs are only resubmitted on request, never by a rerun
+        if retry is None:
+            st.info("Upload the project again to retry it.")
+        elif st.button("🔁 Retry run"):
+            retry()
+            st.rerun()
+    if job["state"] != "done":
+        st.stop()
+
+    outputs = {stage["name"]: stage["output"] for stage in job["stages"]}
+    st.success("✅ All agents executed successfully!")
+
+    st.markdown("## 📊 Agent Execution Logs")
+    paged_outputs(
+        ((f"🧠 {stage['name']}", stage["output"]) for stage in job["stages"]),
+        key="crew_logs", expanded=False, language="markdown",
+    )
+
+    st.markdown("---")
+    st.markdown("## 📂 Dispatcher Routing Summary")
+    routes = job["meta"]["routes"]
+    render_counts(issue_counts(routes))
+    issue_table(routes, key="crew_issues")
+
+    st.markdown("## ✅ Final Master Mitigation Plan")
+    st.markdown(outputs.get("planner") or "_PlannerAgent did not return any output._")
+
+    st.markdown("## 🔪 Evaluation Report")
+    st.markdown(outputs.get("evaluator") or "No evaluation available")
+
+    st.download_button(
+        label="📅 Download Mitigation Plan",
+        data=str(outputs.get("planner")),
+        file_name="master_mitigation_plan.md",
+        mime="text/markdown"
+    )
+
 uploaded_file = st.file_uploader("📄 Upload your .json file", type="json")
+job_id = st.query_params.get("job")
 if not uploaded_file:
+    if job_id and manager.status(job_id):
+        render_job(job_id)
+        st.stop()
     st.warning("Please upload a project JSON file to proceed.")
     st.stop()
 
-project_data = json.load(uploaded_file)
-
-sops = {
-    "scanner": CrewDoclingSource(file_paths=["sops/scanner_sop.md"]),
-    "dispatcher": CrewDoclingSource(file_paths=["sops/dispatcher_sop.md"]),
-    "scheduler": CrewDoclingSource(file_paths=["sops/scheduler_sop.md"]),
-    "safety": CrewDoclingSource(file_paths=["sops/safety_sop.md"]),
-    "qaqc": CrewDoclingSource(file_paths=["sops/qaqc_sop.md"]),
-    "planner": CrewDoclingSource(file_paths=["sops/planner_sop.md"]),
-    "evaluator": CrewDoclingSource(file_paths=["sops/evaluation_sop.md"]),
-}
+# The upload is streamed by the scanner instead of being parsed up front;
+# scan and dispatch run once and every consumer reads the memoized result
+pipeline = project_pipeline(uploaded_file, store=default_store())
 
 class ScannerTool(BaseTool):
     name: str = Field(default="ScanProjectData")
     description: str = Field(default="Scans project data for issues.")
+    issues: list = Field(default_factory=list)
     def _run(self, **kwargs):
-        issues = []
-        for email in project_data.get("emails", []):
-            if "delay" in email["body"].lower():
-                issues.append(f"[type_delay] {email['date']} - {email['subject']}: {email['body']}")
-        for log in project_data.get("site_logs", []):
-            if "violation" in log["description"].lower():
-                issues.append(f"[type_safety] {log['log_date']} - {log['description']}")
-        for report in project_data.get("inspection_reports", []):
-            if "fail" in report["status"].lower():
-                issues.append(f"[type_inspection] {report['date']} - {report['area']}: {report['comments']}")
-        return '\n'.join(issues)
+        return '\n'.join(map(str, self.issues))
 
 class DispatcherTool(BaseTool):
     name: str = Field(default="DispatchIssues")
     description: str = Field(default="Routes tagged issues to respective agents.")
+    routes: list = Field(default_factory=list)
     def _run(self, **kwargs):
-        issues = ScannerTool()._run()
-        routes = []
-        agent_map = {
-            "type_delay": "SchedulerAgent",
-            "type_safety": "SafetyAgent",
-            "type_inspection": "QAQCAgent"
-        }
-        for line in issues.split("\n"):
-            if line.startswith("[") and "]" in line:
-                tag = line.split("]")[0][1:].strip()
-                details = line.split("]", 1)[1].strip()
-                assigned_agent = agent_map.get(tag, "UnknownAgent")
-                routes.append({"issue_type": tag, "agent": assigned_agent, "details": details})
-        output = [f"- **{r['issue_type']}** → **{r['agent']}**: {r['details']}" for r in routes]
+        output = [f"- **{r['issue_type']}** → **{r['agent']}**: {r['details']}" for r in self.routes]
         return '\n'.join(output)
 
-scanner_agent = Agent(
+scanner_agent = cached_agent(
     role="Scanner", goal="Detect project issues",
-    backstory="Identify project problems from project data.",
-    tools=[ScannerTool()], knowledge_sources=[sops["scanner"]]
+    backstory="Identify project problems from project data.", sop="scanner"
 )
-dispatcher_agent = Agent(
+dispatcher_agent = cached_agent(
     role="Dispatcher", goal="Route issues",
-    backstory="Assign each issue to the correct domain expert.",
-    tools=[DispatcherTool()], knowledge_sources=[sops["dispatcher"]]
+    backstory="Assign each issue to the correct domain expert.", sop="dispatcher"
 )
 scanner_task = Task(
     description="Scan project data for issues.",
-    expected_output="List of issues", agent=scanner_agent, tool_choice="required"
+    expected_output="List of issues", agent=scanner_agent,
+    tools=[ScannerTool(issues=pipeline.result("scan"))], tool_choice="required"
 )
 dispatcher_task = Task(
     description="Dispatch issues based on tags.",
-    expected_output="Routing dictionary", agent=dispatcher_agent, tool_choice="required"
+    expected_output="Routing dictionary", agent=dispatcher_agent,
+    tools=[DispatcherTool(routes=pipeline.result("routes"))], tool_choice="required"
 )
 
 issue_agents, issue_tasks = [], []
 
-class CustomToolFactory:
-    @staticmethod
-    def create(issue_type, detail):
-        class DynamicTool(BaseTool):
-            name: str = Field(default=f"Handle_{issue_type}_{uuid.uuid4().hex[:6]}")
-            description: str = Field(default=f"Handles {issue_type} issues")
-            def _run(inner_self, **kwargs):
-                if issue_type == "type_delay":
-                    return f"""Mitigation plan: {detail}
-
-Steps:
-1. Contact vendor regarding delay
+MITIGATION_STEPS = {
+    "type_delay": """1. Contact vendor regarding delay
 2. Adjust delivery timeline in the schedule
-3. Notify stakeholders about updated timelines"""
-                elif issue_type == "type_safety":
-                    return f"""Mitigation plan: {detail}
-
-Steps:
-1. Investigate the safety violation
+3. Notify stakeholders about updated timelines""",
+    "type_safety": """1. Investigate the safety violation
 2. Conduct mandatory toolbox talk
-3. Perform safety re-audit on site"""
-                elif issue_type == "type_inspection":
-                    return f"""Mitigation plan: {detail}
-
-Steps:
-1. Schedule rework for identified issue
+3. Perform safety re-audit on site""",
+    "type_inspection": """1. Schedule rework for identified issue
 2. Apply bonding/sealing as per SOP
-3. Request reinspection and document resolution"""
-                return f"""Mitigation plan: {detail}
-
-Steps:
-1. Initial assessment
+3. Request reinspection and document resolution""",
+}
+DEFAULT_STEPS = """1. Initial assessment
 2. Assign responsible team
 3. Track progress and confirm closure"""
-        return DynamicTool()
-
-raw_issues = ScannerTool()._run().split("\n")
-routes = []
-agent_map = {
-    "type_delay": "SchedulerAgent",
-    "type_safety": "SafetyAgent",
-    "type_inspection": "QAQCAgent"
-}
-for line in raw_issues:
-    if line.startswith("[") and "]" in line:
-        tag = line.split("]")[0][1:].strip()
-        details = line.split("]", 1)[1].strip()
-        assigned_agent = agent_map.get(tag, "UnknownAgent")
-        routes.append({"issue_type": tag, "agent": assigned_agent, "details": details})
-for route in routes:
-    issue_type, agent_name, detail = route["issue_type"], route["agent"], route["details"]
-    sop = sops["scheduler"] if agent_name == "SchedulerAgent" else sops["safety"] if agent_name == "SafetyAgent" else sops["qaqc"]
-    tool = CustomToolFactory.create(issue_type=issue_type, detail=detail)
-    agent = Agent(role=agent_name, goal=f"Handle {issue_type} issues",
-                  backstory=f"Resolve all {issue_type} issues.",
-                  tools=[tool], knowledge_sources=[sop])
-    task = Task(description=f"Resolve: {detail}",
-                expected_output=f"Mitigation plan (with steps): {detail}",
-                agent=agent, tool_choice="required")
-    issue_agents.append(agent)
+
+class BatchMitigationTool(BaseTool):
+    name: str = Field(default="HandleIssueBatch")
+    description: str = Field(default="Writes a mitigation plan for every issue in a routed batch")
+    routes: list = Field(default_factory=list)
+    def _run(self, **kwargs):
+        plans = [
+            f"Mitigation plan: {route['details']}\n\nSteps:\n{MITIGATION_STEPS.get(route['issue_type'], DEFAULT_STEPS)}"
+            for route in self.routes
+        ]
+        return "\n\n".join(plans)
+
+# One task per batch of routed issues, each with its own agent: crewai mutates
+# an agent while it runs, so concurrent batches must not share one.
+# Every ATLAS_MAX_CONCURRENCY-th task is synchronous; crewai waits for the
+# pending async tasks before running it, which caps the batches in flight.
+routes = pipeline.result("routes")
+concurrency = max_concurrency()
+for i, (agent_name, batch) in enumerate(batch_routes(routes)):
+    sop = "scheduler" if agent_name == "SchedulerAgent" else "safety" if agent_name == "SafetyAgent" else "qaqc"
+    issue_agent = cached_agent(role=agent_name, goal=f"Handle issues routed to {agent_name}",
+                               backstory=f"Resolve all issues routed to {agent_name}.",
+                               sop=sop)
+    issue_list = "\n".join(f"- {route['details']}" for route in batch)
+    task = Task(description=f"Resolve each issue:\n{issue_list}",
+                expected_output="Mitigation plan (with steps) for each issue",
+                agent=issue_agent, tools=[BatchMitigationTool(routes=batch)],
+                tool_choice="required", async_execution=(i + 1) % concurrency != 0)
+    issue_agents.append(issue_agent)
     issue_tasks.append(task)
 
 class PlannerTool(BaseTool):
@@ -158,15 +171,17 @@ class PlannerTool(BaseTool):
             summary += f"### 🧑‍🔧 {task.agent.role}\n\n{task.output.strip()}\n\n---\n"
         return summary
 
-planner_agent = Agent(
+planner_agent = cached_agent(
     role="PlannerAgent", goal="Create a combined plan",
-    backstory="Combine mitigation into a coherent strategy.",
-    tools=[PlannerTool()], knowledge_sources=[sops["planner"]]
+    backstory="Combine mitigation into a coherent strategy.", sop="planner"
 )
+# Issue tasks run concurrently; the planner only waits on their join via context
 planner_task = Task(
     description="Aggregate all mitigation plans",
     expected_output="Master mitigation plan",
     agent=planner_agent,
+    context=issue_tasks,
+    tools=[PlannerTool()],
     tool_choice="required"
 )
 
@@ -177,15 +192,15 @@ class EvaluatorTool(BaseTool):
         score = "9/10 - Plan covers all key areas. Suggestions: Ensure QA tasks are tracked post-implementation."
         return f"""\n📝 Evaluation Report:\n\nScore: {score}\n\nAll identified issues were addressed. Consider post-mitigation validation checks."""
 
-evaluator_agent = Agent(
+evaluator_agent = cached_agent(
     role="EvaluatorAgent", goal="Review the mitigation plan",
-    backstory="Assess if the plan meets safety, timeliness, and compliance standards.",
-    tools=[EvaluatorTool()], knowledge_sources=[sops["evaluator"]]
+    backstory="Assess if the plan meets safety, timeliness, and compliance standards.", sop="evaluation"
 )
 evaluator_task = Task(
     description="Evaluate the Master Mitigation Plan",
     expected_output="Evaluation feedback and score",
     agent=evaluator_agent,
+    tools=[EvaluatorTool()],
     tool_choice="required"
 )
 
@@ -194,51 +209,29 @@ all_tasks = [scanner_task, dispatcher_task] + issue_tasks + [planner_task, evalu
 flow = Flow(all_tasks)
 crew = Crew(agents=all_agents, tasks=all_tasks, flow=flow)
 
-with st.spinner("🚀 Running All Agents..."):
-    crew.kickoff()
-    st.success("✅ All agents executed successfully!")
+stage_names = (["scanner", "dispatcher"]
+               + [f"{task.agent.role} batch {i + 1}" for i, task in enumerate(issue_tasks)]
+               + ["planner", "evaluator"])
 
-    for i, task in enumerate(all_tasks):
-        st.markdown(f"### 🧠 Agent: `{task.agent.role}`")
-        st.markdown("**Output:**")
-        st.code(task.output or "No output generated", language="markdown")
-        st.progress((i + 1) / len(all_tasks))
-        st.markdown("---")
+def run_crew(progress):
+    reported = set()
 
+    def report(name, output):
+        if name not in reported:
+            reported.add(name)
+            progress(name, output)
 
-    st.success("✅ All agents executed successfully!")
-
+    for task, name in zip(all_tasks, stage_names):
+        task.callback = lambda output, name=name: report(name, str(output))
 
-    st.markdown("## 📊 Agent Execution Logs")
-    for task in all_tasks:
-        with st.expander(f"🧠 {task.agent.role} - {task.description}"):
-            st.markdown(f"**Expected Output:** `{task.expected_output}`")
-            st.markdown("**Agent Response:**")
-            st.code(str(task.output) or "No output generated", language="markdown")
+    # The response cache persists the crew's outputs, bounded by its TTL and size
+    cached_kickoff(crew)
+    # Cached runs skip the task callbacks: report what they didn't
+    for name, task in zip(stage_names, crew.tasks):
+        report(name, str(task.output) if task.output is not None else None)
 
-    st.markdown("---")
-    st.markdown("## 📂 Dispatcher Routing Summary")
-    dispatcher_output_lines = str(dispatcher_task.output).split("\n")
-    for line in dispatcher_output_lines:
-        match = re.match(r'- \*\*(.*?)\*\* → \*\*(.*?)\*\*: (.*)', line)
-        if match:
-            issue_type, agent, details = match.groups()
-            date_match = re.search(r'(\d{4}-\d{2}-\d{2})', details)
-            date = date_match.group(1) if date_match else "N/A"
-            description = details.replace(date, "").strip(" -")
-            icon = "🚚" if issue_type == "type_delay" else "⚠️" if issue_type == "type_safety" else "🧪"
-            st.markdown(f"#### {icon} {issue_type.replace('_', ' ').title()}\n- 👤 **Assigned to**: `{agent}`\n- 📅 **Date**: {date}\n- 📜 **Details**: {description}")
-            st.markdown("---")
-
-    st.markdown("## ✅ Final Master Mitigation Plan")
-    st.markdown(planner_task.output or "_PlannerAgent did not return any output._")
-
-    st.markdown("## 🔪 Evaluation Report")
-    st.markdown(str(evaluator_task.output) or "No evaluation available")
-
-    st.download_button(
-        label="📅 Download Mitigation Plan",
-        data=str(planner_task.output),
-        file_name="master_mitigation_plan.md",
-        mime="text/markdown"
-    )
+# Same id as long as the response cache would return the same outputs: a
+# changed SOP, model or routing starts a new job instead of showing the old plan
+job_id = manager.submit(run_crew, job_id=f"crew-{crew_cache_key(crew)[:16]}", meta={"routes": routes})
+st.query_params["job"] = job_id
+render_job(job_id, retry=lambda: manager.submit(run_crew, job_id=job_id, meta={"routes": routes}, retry=True))
@@ -1,11 +1,17 @@
 import streamlit as st
-from crewai import Agent, Task, Flow
+from crewai import Task, Flow
 from crewai.tools import BaseTool
-from crewai.knowledge.source.crew_docling_source import CrewDoclingSource
 from dotenv import load_dotenv
 from pydantic import Field
 from colorama import Fore, init
-import json, os
+import json, os, time
+from atlas.dispatcher import batch_routes
+from atlas.executor import run_concurrently
+from atlas.pipeline import project_pipeline
+from atlas.run_history import RunHistory
+from atlas.stage_store import default_store, fingerprint
+from atlas.streamlit_cache import cached_agent, stage_output
+from atlas.ui import issue_counts, issue_table, paged_outputs, render_counts
 
 # Streamlit setup
 st.set_page_config(page_title="Project Atlas - Risk Mitigation", layout="wide")
@@ -19,128 +25,90 @@ load_dotenv()
 uploaded_file = st.file_uploader("📄 Upload your .json file", type="json")
 
 if uploaded_file:
-    project_data = json.load(uploaded_file)
+    # The upload is streamed by the scanner instead of being parsed up front;
+    # scan and dispatch run once and every consumer reads the memoized result
+    started = time.time()
+    pipeline = project_pipeline(uploaded_file, store=default_store())
 
     # -----------------------------------------
-    # Load SOPs
+    # Agent Tools
     # -----------------------------------------
-    scanner_sop = CrewDoclingSource(file_paths=["sops/scanner_sop.md"])
-    dispatcher_sop = CrewDoclingSource(file_paths=["sops/dispatcher_sop.md"])
-    scheduler_sop = CrewDoclingSource(file_paths=["sops/scheduler_sop.md"])
-    safety_sop = CrewDoclingSource(file_paths=["sops/safety_sop.md"])
-    qaqc_sop = CrewDoclingSource(file_paths=["sops/qaqc_sop.md"])
-    planner_sop = CrewDoclingSource(file_paths=["sops/planner_sop.md"])
-    evaluator_sop = CrewDoclingSource(file_paths=["sops/evaluation_sop.md"])
-
-    # -----------------------------------------
-    # Agent Logic Classes
-    # -----------------------------------------
-    class ScannerLogic:
-        def __init__(self, data): self.data = data; self.issues = []
-        def scan(self):
-            for email in self.data.get("emails", []):
-                if "delay" in email["body"].lower():
-                    self.issues.append(f"[type_delay] {email['date']} - {email['subject']}: {email['body']}")
-            for log in self.data.get("site_logs", []):
-                if "violation" in log["description"].lower():
-                    self.issues.append(f"[type_safety] {log['log_date']} - {log['description']}")
-            for report in self.data.get("inspection_reports", []):
-                if "fail" in report["status"].lower():
-                    self.issues.append(f"[type_inspection] {report['date']} - {report['area']}: {report['comments']}")
-            return self.issues
-
     class ScannerTool(BaseTool):
         name: str = Field(default="ScanProjectData")
         description: str = Field(default="Scans project data for issues.")
-        def _run(self, **kwargs): return "\n".join(ScannerLogic(project_data).scan())
-
-    class DispatcherLogic:
-        def __init__(self, issues_str):
-            self.issues = [line.strip() for line in issues_str.split("\n") if line.strip()]
-            self.routes = []
-            self.agent_map = {"type_delay": "SchedulerAgent", "type_safety": "SafetyAgent", "type_inspection": "QAQCAgent"}
-        def route(self):
-            for issue in self.issues:
-                if issue.startswith("[") and "]" in issue:
-                    tag = issue.split("]")[0][1:].strip()
-                    details = issue.split("]", 1)[1].strip()
-                    assigned_agent = self.agent_map.get(tag, "UnknownAgent")
-                    self.routes.append({"issue_type": tag, "agent": assigned_agent, "details": details})
-            return self.routes
+        def _run(self, **kwargs): return "\n".join(map(str, pipeline.result("scan")))
 
     class DispatcherTool(BaseTool):
         name: str = Field(default="DispatchIssues")
         description: str = Field(default="Routes tagged issues to respective agents.")
         def _run(self, **kwargs):
-            output = ScannerLogic(project_data).scan()
-            return json.dumps({"routing": DispatcherLogic("\n".join(output)).route()}, indent=2)
+            return json.dumps({"routing": pipeline.result("routes")}, indent=2)
 
     # -----------------------------------------
     # Build Agents
     # -----------------------------------------
-    scanner_agent = Agent(
+    scanner_agent = cached_agent(
         role="Scanner",
         goal="Detect project issues",
         backstory="You identify project problems.",
-        tools=[ScannerTool()],
-        knowledge_sources=[scanner_sop],
-        verbose=True
+        sop="scanner",
     )
     scanner_task = Task(
         description="Scan project data for issues.",
         expected_output="List of issues",
         agent=scanner_agent,
+        tools=[ScannerTool()],
         tool_choice="required"
     )
 
-    dispatcher_agent = Agent(
+    dispatcher_agent = cached_agent(
         role="Dispatcher",
         goal="Route issues",
         backstory="You triage based on tags.",
-        tools=[DispatcherTool()],
-        knowledge_sources=[dispatcher_sop],
-        verbose=True
+        sop="dispatcher",
     )
     dispatcher_task = Task(
         description="Dispatch issues based on tags.",
         expected_output="Routing dictionary",
         agent=dispatcher_agent,
+        tools=[DispatcherTool()],
         tool_choice="required"
     )
 
-    # Issue Agents
-    issue_agents, issue_tasks = [], []
-
-    def make_tool(issue_type, detail):
-        class CustomTool(BaseTool):
-            name: str = Field(default=f"Handle{issue_type}")
-            description: str = Field(default=f"Handles {issue_type} issues")
-            def _run(self, **kwargs):
-                if issue_type == "type_delay": return f"Delay mitigation: contact vendor, adjust schedule, etc."
-                if issue_type == "type_safety": return f"Safety mitigation: {detail} - Safety briefings, audits."
-                if issue_type == "type_inspection": return f"Inspection mitigation: {detail} - Rework, bonding, reinspect."
-                return f"Unknown issue type"
-        return CustomTool()
-
-    for route in DispatcherLogic("\n".join(ScannerLogic(project_data).scan())).route():
-        issue_type, agent_name, detail = route["issue_type"], route["agent"], route["details"]
-        sop = scheduler_sop if agent_name == "SchedulerAgent" else safety_sop if agent_name == "SafetyAgent" else qaqc_sop
-        tool = make_tool(issue_type, detail)
-        agent = Agent(
-            role=agent_name,
-            goal=f"Handle {issue_type} issues",
-            backstory=f"Handle all {issue_type} issues.",
-            tools=[tool],
-            knowledge_sources=[sop],
-            verbose=True
-        )
+    # Issue Agents: one agent per role, one task per batch of routed issues
+    issue_agents, issue_tasks = {}, []
+
+    def mitigation_for(route):
+        issue_type, detail = route["issue_type"], route["details"]
+        if issue_type == "type_delay": return f"Delay mitigation: contact vendor, adjust schedule, etc."
+        if issue_type == "type_safety": return f"Safety mitigation: {detail} - Safety briefings, audits."
+        if issue_type == "type_inspection": return f"Inspection mitigation: {detail} - Rework, bonding, reinspect."
+        return f"Unknown issue type"
+
+    class BatchMitigationTool(BaseTool):
+        name: str = Field(default="HandleIssueBatch")
+        description: str = Field(default="Handles every issue in a routed batch")
+        routes: list = Field(default_factory=list)
+        def _run(self, **kwargs): return "\n".join(mitigation_for(route) for route in self.routes)
+
+    for agent_name, batch in batch_routes(pipeline.result("routes")):
+        if agent_name not in issue_agents:
+            sop = "scheduler" if agent_name == "SchedulerAgent" else "safety" if agent_name == "SafetyAgent" else "qaqc"
+            issue_agents[agent_name] = cached_agent(
+                role=agent_name,
+                goal=f"Handle issues routed to {agent_name}",
+                backstory=f"Handle all issues routed to {agent_name}.",
+                sop=sop,
+            )
+        issue_list = "\n".join(f"- {route['details']}" for route in batch)
         task = Task(
-            description=f"Resolve: {detail}",
-            expected_output=f"Mitigation plan: {detail}",
-            agent=agent,
+            description=f"Resolve each issue:\n{issue_list}",
+            expected_output="One mitigation plan per issue",
+            agent=issue_agents[agent_name],
+            tools=[BatchMitigationTool(routes=batch)],
             tool_choice="required"
         )
-        issue_agents.append(agent); issue_tasks.append(task)
+        issue_tasks.append(task)
 
     class PlannerTool(BaseTool):
         name: str = Field(default="AggregateMitigationPlans")
@@ -178,18 +146,17 @@ if uploaded_file:
                     summary.append(f"⚙️ **General Mitigation by {role}**: {task.output.strip()}")
             return "\n".join(summary)
 
-    planner_agent = Agent(
+    planner_agent = cached_agent(
         role="Planner",
         goal="Aggregate plans",
         backstory="Combine mitigation actions",
-        tools=[PlannerTool()],
-        knowledge_sources=[planner_sop],
-        verbose=True
+        sop="planner",
     )
     planner_task = Task(
         description="Unify mitigation plans.",
         expected_output="Final mitigation summary",
         agent=planner_agent,
+        tools=[PlannerTool()],
         tool_choice="required"
     )
 
@@ -199,18 +166,17 @@ if uploaded_file:
         def _run(self, **kwargs):
             return json.dumps({"score": 10, "sop_compliance": "Yes", "remarks": "All actions SOP-aligned."}, indent=2)
 
-    evaluation_agent = Agent(
+    evaluation_agent = cached_agent(
         role="Evaluator",
         goal="Evaluate mitigation plan",
         backstory="Ensure plan quality and SOP compliance.",
-        tools=[EvaluationTool()],
-        knowledge_sources=[evaluator_sop],
-        verbose=True
+        sop="evaluation",
     )
     evaluation_task = Task(
         description="Evaluate final mitigation plan.",
         expected_output="Evaluation report",
         agent=evaluation_agent,
+        tools=[EvaluationTool()],
         tool_choice="required"
     )
 
@@ -218,40 +184,54 @@ if uploaded_file:
     # Execute Flow and Display in Streamlit
     # -----------------------------------------
     st.subheader("🔍 Scanner Output")
-    scanner_task.output = scanner_agent.tools[0]._run()
+    scanner_task.output = stage_output("upload_flow.scanner", pipeline.fingerprint("scan"), scanner_task.tools[0]._run)
     st.code(scanner_task.output)
 
     st.subheader("🚦 Dispatcher Output")
-    dispatcher_task.output = dispatcher_agent.tools[0]._run()
-    st.code(dispatcher_task.output)
+    dispatcher_task.output = stage_output("upload_flow.dispatcher", pipeline.fingerprint("routes"), dispatcher_task.tools[0]._run)
+    counts = issue_counts(pipeline.result("routes"))
+    render_counts(counts)
+    issue_table(pipeline.result("routes"), key="upload_flow_issues")
 
     planner_inputs = []
 
-    for task in issue_tasks:
-        st.subheader(f"🛠️ {task.agent.role} Output")
-        task.output = task.agent.tools[0]._run()
-        planner_inputs.append(task.output)
-        st.code(task.output)
+    # Issue batches are independent: run them in parallel, render after the join
+    outputs = stage_output("upload_flow.issue_batches", pipeline.fingerprint("routes"), lambda: run_concurrently(task.tools[0]._run for task in issue_tasks))
+    for task, output in zip(issue_tasks, outputs):
+        task.output = output
+
+    planner_inputs.extend(task.output for task in issue_tasks)
+    st.subheader("🛠️ Issue Agent Outputs")
+    paged_outputs(((f"🛠️ {task.agent.role}", task.output) for task in issue_tasks), key="upload_flow_batches")
 
     st.subheader("📋 Planner Output")
-    planner_task.output = planner_agent.tools[0]._run()
+    planner_task.output = stage_output("upload_flow.planner", fingerprint([pipeline.fingerprint("routes"), outputs]), planner_task.tools[0]._run)
     st.code(planner_task.output)
 
     st.subheader("🔎 Evaluator Output")
-    evaluation_task.output = evaluation_agent.tools[0]._run()
+    evaluation_task.output = stage_output("upload_flow.evaluation", fingerprint(planner_task.output), evaluation_task.tools[0]._run)
     st.code(evaluation_task.output)
 
     flow_output = {
         "Scanner": scanner_task.output,
         "Dispatcher": json.loads(dispatcher_task.output),
-        **{task.agent.role: task.output for task in issue_tasks},
+        **{role: "\n".join(task.output for task in issue_tasks if task.agent.role == role) for role in issue_agents},
         "Planner": json.loads(planner_task.output),
         "Evaluator": json.loads(evaluation_task.output)
     }
 
-    with open("flow_output.json", "w", encoding="utf-8") as f:
-        json.dump(flow_output, f, indent=2)
+    # Append this run to the history once per session; widget reruns reuse the cached outputs
+    run_key = fingerprint(flow_output)
+    if st.session_state.get("recorded_upload_flow") != run_key:
+        RunHistory().append(
+            uploaded_file.name,
+            flow_output,
+            input_hash=pipeline.input_key("scan"),
+            tags=counts["by_tag"],
+            started=started,
+        )
+        st.session_state["recorded_upload_flow"] = run_key
 
-    st.success("✅ Flow completed and saved to flow_output.json")
+    st.success("✅ Flow completed and recorded in run history")
 else:
     st.warning("📁 Please upload a valid `.json` file to start the process.")
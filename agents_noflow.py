@@ -1,9 +1,16 @@
 import streamlit as st
-from crewai import Agent, Task, Crew
+from crewai import Task, Crew
 from crewai.tools import BaseTool
 from pydantic import Field
 import json, os
 from dotenv import load_dotenv
+from atlas.dispatcher import batch_routes
+from atlas.executor import run_concurrently
+from atlas.llm_cache import cached_kickoff
+from atlas.pipeline import project_pipeline
+from atlas.stage_store import default_store, fingerprint
+from atlas.streamlit_cache import cached_agent, crew_output, stage_output
+from atlas.ui import issue_counts, issue_table, paged_outputs, render_counts
 
 # Load environment variables
 load_dotenv()
@@ -12,169 +19,159 @@ load_dotenv()
 st.set_page_config(page_title="Project Atlas - Risk Mitigation", layout="wide")
 st.title("🏗️ Project Atlas - Risk Mitigation Flow")
 
-# Load JSON project data
-with open("project_atlas.json", "r") as f:
-    project_data = json.load(f)
-
-# Helper: Scanner Logic
-class ScannerLogic:
-    def __init__(self, data):
-        self.data = data
-        self.issues = []
-
-    def scan(self):
-        for email in self.data.get("emails", []):
-            if "delay" in email["body"].lower():
-                self.issues.append(f"[type_delay] {email['date']} - {email['subject']}: {email['body']}")
-        for log in self.data.get("site_logs", []):
-            if "violation" in log["description"].lower():
-                self.issues.append(f"[type_safety] {log['log_date']} - {log['description']}")
-        for report in self.data.get("inspection_reports", []):
-            if "fail" in report["status"].lower():
-                self.issues.append(f"[type_inspection] {report['date']} - {report['area']}: {report['comments']}")
-        return self.issues
+# Project data is streamed by the scanner rather than loaded up front
+PROJECT_FILE = "project_atlas.json"
+# Scan and dispatch run once per input; every consumer reads the memoized result
+pipeline = project_pipeline(PROJECT_FILE, store=default_store())
 
 # Scanner Tool
 class ScannerTool(BaseTool):
     name: str = Field(default="ScanProjectData")
     description: str = Field(default="Scans project data for issues")
+    issues: list = Field(default_factory=list)
 
     def _run(self, **kwargs):
-        return "\n".join(ScannerLogic(project_data).scan())
+        return "\n".join(map(str, self.issues))
 
 # Run Scanner
 with st.spinner("🔍 Running Scanner Agent..."):
-    scanner_agent = Agent(
+    scanner_agent = cached_agent(
         role="Scanner",
         goal="Detect project issues from logs, emails, and inspections.",
         backstory="You identify problems early from project data.",
-        tools=[ScannerTool()],
-        verbose=True
     )
     scanner_task = Task(
         description="Scan project data for issues.",
         expected_output="List of tagged issues.",
         agent=scanner_agent,
+        tools=[ScannerTool(issues=pipeline.result("scan"))],
         tool_choice="required"
     )
     scanner_crew = Crew(agents=[scanner_agent], tasks=[scanner_task], verbose=True)
-    scanner_output = scanner_crew.kickoff()
+    scanner_output = crew_output("noflow.scanner", pipeline.fingerprint("scan"), scanner_crew)
     scanner_output_str = str(scanner_output)
     st.success("✅ Scanner Agent completed.")
     st.code(scanner_output_str, language='text')
 
-# Dispatcher Logic
-class DispatcherLogic:
-    def __init__(self, issues_str):
-        self.issues = [line.strip() for line in issues_str.split("\n") if line.strip()]
-        self.routes = []
-
-    def route(self):
-        for issue in self.issues:
-            if issue.startswith("[type_delay]"):
-                self.routes.append({"issue_type": "type_delay", "agent": "SchedulerAgent", "details": issue})
-            elif issue.startswith("[type_safety]"):
-                self.routes.append({"issue_type": "type_safety", "agent": "SafetyAgent", "details": issue})
-            elif issue.startswith("[type_inspection]"):
-                self.routes.append({"issue_type": "type_inspection", "agent": "QAQCAgent", "details": issue})
-        return self.routes
+# Routes come from the scanner's structured issues, not the LLM's echo of them
+routes = pipeline.result("routes")
 
 # Dispatcher Tool
 class DispatcherTool(BaseTool):
     name: str = Field(default="DispatchIssues")
     description: str = Field(default="Dispatches issues to correct agents")
+    routes: list = Field(default_factory=list)
 
     def _run(self, **kwargs):
-        return json.dumps({"routing": DispatcherLogic(scanner_output_str).route()}, indent=2)
+        return json.dumps({"routing": self.routes}, indent=2)
 
 with st.spinner("📦 Running Dispatcher Agent..."):
-    dispatcher_agent = Agent(
+    dispatcher_agent = cached_agent(
         role="Dispatcher",
         goal="Distribute issues from scanner to responsible agents.",
         backstory="You triage output based on tags.",
-        tools=[DispatcherTool()],
-        verbose=True
     )
     dispatcher_task = Task(
         description="Route issues to correct agents.",
         expected_output="Routing dictionary.",
         agent=dispatcher_agent,
+        tools=[DispatcherTool(routes=routes)],
         tool_choice="required"
     )
     dispatcher_crew = Crew(agents=[dispatcher_agent], tasks=[dispatcher_task], verbose=True)
-    dispatcher_output = dispatcher_crew.kickoff()
+    dispatcher_output = crew_output("noflow.dispatcher", pipeline.fingerprint("routes"), dispatcher_crew)
     st.success("✅ Dispatcher Agent completed.")
-    st.code(dispatcher_output, language='json')
+    render_counts(issue_counts(routes))
+    issue_table(routes, key="noflow_issues")
 
-parsed_dispatch = json.loads(str(dispatcher_output))
 final_outputs = {}
 
+def mitigation_for(route):
+    issue_type, detail = route["issue_type"], route["details"]
+    if issue_type == "type_delay":
+        return f"Mitigation plan for delay: {detail}\nSteps: Contact vendor, adjust schedule, explore alternatives."
+    elif issue_type == "type_safety":
+        return f"Mitigation plan for safety: {detail}\nActions: Safety briefings, assign officers, enforce PPE."
+    elif issue_type == "type_inspection":
+        return f"Mitigation plan for inspection: {detail}\nSteps: Rework, bonding, schedule reinspection."
+    return f"Unhandled issue type: {issue_type}"
+
+# One tool class per role; each task gets an instance bound to its batch
+class BatchMitigationTool(BaseTool):
+    name: str = Field(default="HandleIssueBatch")
+    description: str = Field(default="Returns a mitigation plan for every issue in the batch")
+    routes: list = Field(default_factory=list)
+
+    def _run(self, **kwargs):
+        return "\n\n".join(mitigation_for(route) for route in self.routes)
+
 st.subheader("🚧 Agent Mitigation Handling")
-for route in parsed_dispatch.get("routing", []):
-    issue_type = route["issue_type"]
-    agent_name = route["agent"]
-    detail = route["details"]
-
-    class CustomTool(BaseTool):
-        name: str = Field(default=f"Handle{issue_type}")
-        description: str = Field(default=f"Handles {issue_type} issues")
-
-        def _run(self, **kwargs):
-            if issue_type == "type_delay":
-                return f"Mitigation plan for delay: {detail}\nSteps: Contact vendor, adjust schedule, explore alternatives."
-            elif issue_type == "type_safety":
-                return f"Mitigation plan for safety: {detail}\nActions: Safety briefings, assign officers, enforce PPE."
-            elif issue_type == "type_inspection":
-                return f"Mitigation plan for inspection: {detail}\nSteps: Rework, bonding, schedule reinspection."
-            return f"Unhandled issue type: {issue_type}"
-
-    issue_agent = Agent(
+issue_crews = []
+batches = batch_routes(routes)
+for agent_name, batch in batches:
+    # Batches run concurrently and crewai mutates an agent while it runs,
+    # so every batch gets its own agent rather than sharing one per role
+    issue_agent = cached_agent(
         role=agent_name,
-        goal=f"Resolve {issue_type} issues.",
-        backstory=f"You handle {issue_type} in the project.",
-        tools=[CustomTool()],
-        verbose=True
+        goal=f"Resolve the issues routed to {agent_name}.",
+        backstory=f"You handle every issue the dispatcher routes to {agent_name}.",
     )
+    issue_list = "\n".join(f"- {route['details']}" for route in batch)
     issue_task = Task(
-        description=f"Resolve: {detail}",
-        expected_output=f"Mitigation plan for: {detail}",
+        description=f"Resolve each of these {len(batch)} issues:\n{issue_list}",
+        expected_output="One mitigation plan per issue, in the same order.",
         agent=issue_agent,
+        tools=[BatchMitigationTool(routes=batch)],
         tool_choice="required"
     )
-    issue_crew = Crew(agents=[issue_agent], tasks=[issue_task], verbose=True)
-    output = issue_crew.kickoff()
-
-    final_outputs.setdefault(agent_name, []).append(str(output).strip())
-    st.success(f"✅ {agent_name} completed task.")
-    st.code(str(output).strip())
+    issue_crews.append(Crew(agents=[issue_agent], tasks=[issue_task], verbose=True))
+
+# Issue crews are independent: run them in parallel and join before planning.
+# Streamlit calls stay on the script thread, after the join.
+with st.spinner(f"🛠️ Running {len(issue_crews)} issue batch(es) concurrently..."):
+    outputs = stage_output("noflow.issue_batches", pipeline.fingerprint("routes"), lambda: run_concurrently(
+        lambda crew=crew: str(cached_kickoff(crew)) for crew in issue_crews
+    ), persist=False)
+
+for (agent_name, batch), output in zip(batches, outputs):
+    final_outputs.setdefault(agent_name, []).append({
+        "action": str(output).strip(),
+        "issue_types": sorted({route["issue_type"] for route in batch}),
+        "record_ids": [route["record_id"] for route in batch],
+    })
+st.success(f"✅ {len(batches)} issue batch(es) completed.")
+paged_outputs(
+    ((f"🛠️ {agent_name}: {len(batch)} issue(s)", str(output).strip()) for (agent_name, batch), output in zip(batches, outputs)),
+    key="noflow_batches",
+)
 
 class PlannerTool(BaseTool):
     name: str = Field(default="AggregateMitigationPlans")
     description: str = Field(default="Aggregates mitigation plans.")
+    outputs: dict = Field(default_factory=dict)
 
     def _run(self, **kwargs):
         plan = []
-        for agent, actions in final_outputs.items():
+        for agent, actions in self.outputs.items():
             for act in actions:
-                plan.append({"agent": agent, "action": act})
+                plan.append({"agent": agent, **act})
         return json.dumps({"summary": "Unified Project Mitigation Plan", "actions": plan}, indent=2)
 
 with st.spinner("🧩 Creating Final Mitigation Plan..."):
-    planner_agent = Agent(
+    planner_agent = cached_agent(
         role="Planner",
         goal="Unify project mitigation efforts into one actionable plan.",
         backstory="You aggregate actions from Scheduler, Safety, and QAQC agents.",
-        tools=[PlannerTool()],
-        verbose=True
     )
     planner_task = Task(
         description="Create a unified plan.",
         expected_output="Plan summary.",
         agent=planner_agent,
+        tools=[PlannerTool(outputs=final_outputs)],
         tool_choice="required"
     )
     planner_crew = Crew(agents=[planner_agent], tasks=[planner_task], verbose=True)
-    planner_output = planner_crew.kickoff()
+    planner_output = crew_output("noflow.planner", fingerprint([pipeline.fingerprint("routes"), outputs]), planner_crew)
     st.success("📘 Planner Agent created the plan.")
     st.code(str(planner_output), language='json')
 
@@ -190,20 +187,19 @@ class EvaluationTool(BaseTool):
         }, indent=2)
 
 with st.spinner("🧪 Evaluating Plan for SOP compliance..."):
-    evaluation_agent = Agent(
+    evaluation_agent = cached_agent(
         role="Evaluator",
         goal="Evaluate the mitigation plan.",
         backstory="You ensure SOP compliance and quality.",
-        tools=[EvaluationTool()],
-        verbose=True
     )
     evaluation_task = Task(
         description="Evaluate the plan.",
         expected_output="SOP compliance and feedback.",
         agent=evaluation_agent,
+        tools=[EvaluationTool()],
         tool_choice="required"
     )
     evaluation_crew = Crew(agents=[evaluation_agent], tasks=[evaluation_task], verbose=True)
-    evaluation_output = evaluation_crew.kickoff()
+    evaluation_output = crew_output("noflow.evaluation", fingerprint(str(planner_output)), evaluation_crew)
     st.success("🔍 Evaluation Completed")
     st.code(str(evaluation_output), language='json')
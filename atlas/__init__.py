@@ -0,0 +1,5 @@
+"""Shared logic for the Project Atlas agent scripts.
+
+Scripts outside the repo root (``Seperate Agents/``, ``codes/``, ``tests/``)
+put the repo root on ``sys.path`` before importing it.
+"""
@@ -0,0 +1,93 @@
+import functools
+import glob
+import hashlib
+import json
+import os
+
+from atlas.llm_cache import cached_kickoff
+from atlas.result_store import export
+from atlas.stage_store import fingerprint
+
+ATLAS_DIR = os.path.dirname(os.path.abspath(__file__))
+SOP_DIR = os.path.join(os.path.dirname(ATLAS_DIR), "knowledge", "sops")
+
+
+@functools.lru_cache(maxsize=256)
+def _digest(path, mtime_ns, size):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def file_digest(path):
+    """sha256 of a file's bytes (None if it doesn't exist), re-hashed only when it changes."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return _digest(os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+
+
+def code_version(script):
+    """Hash of a stage script together with the atlas package it runs on."""
+    paths = [script] + sorted(glob.glob(os.path.join(ATLAS_DIR, "*.py")))
+    return fingerprint([[os.path.basename(path), file_digest(path)] for path in paths])
+
+
+# --- Stage checkpoints ---
+def stage_key(stage, script, inputs):
+    """Content address of one stage execution: its inputs, code version and SOP file.
+
+    Two executions with the same key produce the same rows, so a stage whose
+    key already has a checkpoint (in this run or any other) can be restored
+    instead of rerun. Any upstream change alters the upstream rows and hence
+    every downstream key, so a pipeline resumes at the first stale stage.
+    """
+    return fingerprint({
+        "stage": stage,
+        "code": code_version(script),
+        "sop": file_digest(os.path.join(SOP_DIR, f"{stage}_sop.md")),
+        "inputs": inputs,
+    })
+
+
+def restore_stage(store, stage, run_id, key):
+    """``store.restore`` for a stage script: its checkpointed output, or None when it must run."""
+    output = store.restore(stage, run_id, key)
+    if output is not None:
+        print(f"\n--- {stage}: inputs unchanged, restored checkpoint {key[:12]} (run {run_id}) ---\n")
+    return output
+
+
+# --- Stage runs ---
+def run_stage(store, stage, run_id, script, inputs, build_task, save, tool_inputs=None):
+    """Run one pipeline stage script's task, or restore it from a checkpoint.
+
+    The stage is skipped when ``inputs`` (everything it reads from the store
+    or disk), the script's code and the stage's SOP match a checkpoint;
+    ``inputs=None`` always runs. Otherwise the task from ``build_task()``
+    runs in a one-agent crew through the response cache. ``tool_inputs`` covers what the task's tools
+    read besides their fields, such as a digest of the project file.
+    ``save(results)`` turns the crew output into ``(rows, export, output)``:
+    the stage's rows, the data exported for Ask Atlas and the printed output,
+    which is also what this returns.
+    """
+    key = stage_key(stage, script, inputs) if inputs is not None else None
+    if key is not None:
+        restored = restore_stage(store, stage, run_id, key)
+        if restored is not None:
+            return restored
+
+    from crewai import Crew
+
+    task = build_task()
+    crew = Crew(agents=[task.agent], tasks=[task], verbose=True)
+    rows, data, output = save(cached_kickoff(crew, inputs=tool_inputs))
+    store.write(stage, run_id, rows, input_key=key, output=output)
+    export(run_id, stage, data)
+
+    print(f"\n--- {stage} output (run {run_id}) ---\n")
+    print(data if isinstance(data, str) else json.dumps(data, indent=2, ensure_ascii=False))
+    return output
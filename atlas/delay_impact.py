@@ -0,0 +1,204 @@
+import re
+
+import numpy as np
+
+from atlas.schedule import ScheduleNetwork, load_activities, to_date
+
+# --- Delay durations ---
+_NUMBER_WORDS = {
+    "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6,
+    "seven": 7, "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12,
+}
+_UNIT_DAYS = {"day": 1, "week": 7, "month": 30}
+
+
+def _duration(count):
+    return (
+        rf"\b(?P<amount>\d+(?:\.\d+)?|{count})[\s-]+"
+        r"(?P<working>business |working )?(?P<unit>day|week|month)s?\b"
+    )
+
+
+_COUNT = "|".join(_NUMBER_WORDS)
+# "a"/"an" only count inside a delay phrase: "delayed by a week", but not "in a week".
+_PHRASE_COUNT = _COUNT + "|an?"
+_DELAY_PHRASES = (
+    re.compile(
+        r"\b(?:delay(?:ed|s)?|slip(?:ped|s)?|push(?:ed)? back|postponed|behind)\s+"
+        r"(?:by\s+|of\s+)?(?:about\s+|around\s+|approximately\s+|roughly\s+|another\s+)?" + _duration(_PHRASE_COUNT),
+        re.IGNORECASE,
+    ),
+    re.compile(_duration(_PHRASE_COUNT) + r"\s+(?:of\s+)?(?:delay|slip|late|behind)", re.IGNORECASE),
+)
+_ANY_DURATION = re.compile(_duration(_COUNT), re.IGNORECASE)
+
+
+def _days(match):
+    amount, working, unit = match.group("amount", "working", "unit")
+    amount = {"a": 1, "an": 1, **_NUMBER_WORDS}.get(amount.lower()) or float(amount)
+    days = amount * _UNIT_DAYS[unit.lower()]
+    if working and unit.lower() == "day":
+        days = days * 7 / 5
+    return int(np.ceil(days))
+
+
+def parse_delay_days(text):
+    """The delay mentioned in ``text`` in calendar days, or None.
+
+    Durations attached to a delay phrase win ("delayed by 3 weeks" -> 21,
+    "a two-week delay" -> 14); other durations in the text, like "vendor
+    will confirm within a month", are only used when there is no such
+    phrase. "two business days" -> 3 (5 working days to 7); weeks and months
+    are already calendar spans: "two business weeks" -> 14. The longest
+    qualifying duration is returned.
+    """
+    matches = [m for phrase in _DELAY_PHRASES for m in phrase.finditer(text)]
+    matches = matches or list(_ANY_DURATION.finditer(text))
+    return max((_days(m) for m in matches), default=None)
+
+
+# --- Activity index ---
+_TOKEN = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset("a an and by for from in of on or the to with is was are be delayed delay".split())
+# Words carried by more than this share of activities ("activity", "work")
+# say nothing about which one an email is about.
+MAX_TERM_SHARE = 0.5
+
+
+def _tokens(text):
+    return _TOKEN.findall(str(text).lower())
+
+
+class ActivityIndex:
+    """Inverted index from words and phrases to activity positions.
+
+    ``task_id`` and ``assigned_to`` are indexed as whole phrases ("T004",
+    "Subcontractor 8"); ``description`` and an optional ``keywords`` list are
+    indexed word by word. Positions follow the order of ``activities``, the
+    same order ``ScheduleNetwork.from_activities`` uses.
+    """
+
+    def __init__(self, activities):
+        postings = {}
+        count = 0
+        for i, activity in enumerate(activities):
+            count += 1
+            keys = {tuple(_tokens(activity.get("task_id", ""))), tuple(_tokens(activity.get("assigned_to", "")))}
+            words = _tokens(activity.get("description", ""))
+            for keyword in activity.get("keywords") or ():
+                words.extend(_tokens(keyword))
+            keys.update((word,) for word in words if word not in _STOPWORDS and not word.isdigit())
+            for key in keys:
+                if key:
+                    postings.setdefault(key, []).append(i)
+
+        limit = max(1, MAX_TERM_SHARE * count)
+        self.postings = {
+            key: np.asarray(positions, dtype=np.int64)
+            for key, positions in postings.items()
+            if len(key) > 1 or len(positions) <= limit
+        }
+        self.max_phrase = max((len(key) for key in self.postings), default=1)
+
+    def match(self, text):
+        """Positions of activities referenced anywhere in ``text``."""
+        tokens = _tokens(text)
+        hits = []
+        for size in range(1, self.max_phrase + 1):
+            for start in range(len(tokens) - size + 1):
+                positions = self.postings.get(tuple(tokens[start:start + size]))
+                if positions is not None:
+                    hits.append(positions)
+        if not hits:
+            return np.empty(0, dtype=np.int64)
+        return np.unique(np.concatenate(hits))
+
+
+# --- Delay impact ---
+class DelayImpactLogic:
+    """Turn delay issues into activity slips and push them through the network.
+
+    All issues are applied together as one scenario: each matched activity
+    starts its delay later than its current early start (the longest delay
+    wins when several issues hit the same activity), then a single forward
+    pass carries the slip to every successor.
+    """
+
+    def __init__(self, network, index):
+        self.network = network
+        self.index = index
+
+    @classmethod
+    def from_activities(cls, activities):
+        activities = list(activities)
+        return cls(ScheduleNetwork.from_activities(activities), ActivityIndex(activities))
+
+    @classmethod
+    def from_project(cls, source):
+        return cls.from_activities(load_activities(source))
+
+    def delayed(self, shift):
+        """A copy of the network with activities pushed back by ``shift`` days."""
+        scenario = self.network.copy()
+        scenario.start = self.network.shifted_start(shift)
+        return scenario.compute()
+
+    def shifts(self, issues):
+        """Per-activity delay in days across ``issues``, plus what each issue matched."""
+        network = self.network
+        shift = np.zeros(len(network), dtype=np.int64)
+        matched = []
+        for issue in issues:
+            text = getattr(issue, "text", None) or str(issue)
+            days = parse_delay_days(text)
+            positions = self.index.match(text)
+            if days and positions.size:
+                np.maximum.at(shift, positions, days)
+            matched.append({
+                "issue": str(issue),
+                "delay_days": days,
+                "activities": [network.task_ids[i] for i in positions],
+            })
+        return shift, matched
+
+    def assess(self, issues):
+        base = self.network
+        shift, matched = self.shifts(issues)
+        after = self.delayed(shift)
+        slip = after.ef - base.ef
+        slipped = np.flatnonzero(slip > 0)
+        slipped = slipped[np.argsort(-slip[slipped], kind="stable")]
+        was_critical = base.total_float <= 0
+        now_critical = after.total_float <= 0
+        return {
+            "issues": matched,
+            "slipped": [
+                {"task_id": base.task_ids[i], "slip_days": int(slip[i]), "new_finish": to_date(after.ef[i])}
+                for i in slipped
+            ],
+            "project_finish": to_date(base.finish),
+            "new_project_finish": to_date(after.finish),
+            "newly_critical": [base.task_ids[i] for i in np.flatnonzero(now_critical & ~was_critical)],
+            "no_longer_critical": [base.task_ids[i] for i in np.flatnonzero(was_critical & ~now_critical)],
+        }
+
+    def report(self, issues, limit=10):
+        impact = self.assess(issues)
+        lines = []
+        for item in impact["issues"]:
+            if not item["delay_days"]:
+                lines.append(f"- {item['issue']}: no delay duration found in the text.")
+            elif not item["activities"]:
+                lines.append(f"- {item['issue']}: {item['delay_days']} days, no matching activity in the schedule.")
+            else:
+                lines.append(f"- {item['issue']}: {item['delay_days']} days on {', '.join(item['activities'][:limit])}")
+        slipped = impact["slipped"]
+        lines.append(f"Activities slipping: {len(slipped)}")
+        lines.extend(
+            f"- {s['task_id']}: +{s['slip_days']} days, new finish {s['new_finish']}" for s in slipped[:limit]
+        )
+        lines.append(f"Project finish: {impact['project_finish']} -> {impact['new_project_finish']}")
+        for key, label in (("newly_critical", "Newly critical"), ("no_longer_critical", "No longer critical")):
+            if impact[key]:
+                lines.append(f"{label}: {', '.join(impact[key][:limit])}" + (" ..." if len(impact[key]) > limit else ""))
+        return "\n".join(lines)
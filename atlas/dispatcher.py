@@ -0,0 +1,59 @@
+import os
+
+from atlas.issues import Issue
+
+AGENT_MAP = {
+    "type_delay": "SchedulerAgent",
+    "type_safety": "SafetyAgent",
+    "type_inspection": "QAQCAgent",
+}
+
+
+# --- Dispatcher Logic ---
+class DispatcherLogic:
+    def __init__(self, issues):
+        # Accepts Issue records (e.g. the lazy ScannerLogic.stream generator).
+        # Plain text from an LLM or an old results file is parsed line by line.
+        if isinstance(issues, str):
+            issues = issues.split("\n")
+        self.issues = issues
+        self.routes = []
+        self.agent_map = AGENT_MAP
+
+    def iter_routes(self):
+        for issue in self.issues:
+            if isinstance(issue, str):
+                issue = Issue.parse(issue)
+                if issue is None:
+                    continue
+            yield {
+                "issue_type": issue.tag,
+                "agent": self.agent_map.get(issue.tag, "UnknownAgent"),
+                "details": issue.details,
+                "date": issue.date,
+                "section": issue.section,
+                "record_id": issue.record_id,
+            }
+
+    def route(self):
+        self.routes.extend(self.iter_routes())
+        return self.routes
+
+
+# --- Batching ---
+def batch_routes(routes, batch_size=None):
+    """Group routes by assigned agent and split each group into batches.
+
+    Returns ``[(agent, [route, ...]), ...]`` so each role's agent can handle
+    a whole batch in one invocation. The size defaults to the
+    ``ATLAS_ISSUE_BATCH_SIZE`` environment variable, or 25.
+    """
+    batch_size = batch_size or int(os.getenv("ATLAS_ISSUE_BATCH_SIZE", "25"))
+    by_agent = {}
+    for route in routes:
+        by_agent.setdefault(route["agent"], []).append(route)
+    return [
+        (agent, group[start:start + batch_size])
+        for agent, group in by_agent.items()
+        for start in range(0, len(group), batch_size)
+    ]
@@ -0,0 +1,23 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+
+def max_concurrency():
+    return int(os.getenv("ATLAS_MAX_CONCURRENCY", "4"))
+
+
+# --- Concurrent executor ---
+def run_concurrently(jobs, max_workers=None):
+    """Run independent zero-argument callables on a bounded thread pool.
+
+    Results come back in the order the jobs were given. Once every job has
+    finished, the earliest failing job's exception is re-raised. The limit
+    defaults to ``ATLAS_MAX_CONCURRENCY`` (4).
+    """
+    jobs = list(jobs)
+    max_workers = min(max_workers or max_concurrency(), len(jobs))
+    if max_workers <= 1:
+        return [job() for job in jobs]
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="atlas") as pool:
+        futures = [pool.submit(job) for job in jobs]
+    return [future.result() for future in futures]
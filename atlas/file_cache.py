@@ -0,0 +1,60 @@
+import collections
+import json
+import os
+import threading
+
+MAX_ENTRIES = 64
+
+
+# --- Result file cache ---
+class FileCache:
+    """Parsed file contents, re-read only when the file changes on disk.
+
+    Entries are keyed by absolute path and validated against the file's
+    (mtime, size) on every lookup, so a hit costs one ``stat`` regardless of
+    file size. Cached values are shared between callers and must not be
+    mutated. The least recently used entry is dropped past ``max_entries``.
+    """
+
+    def __init__(self, max_entries=MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def load(self, path, is_json=False):
+        """The file's text (or parsed JSON), or None when it does not exist."""
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        key = (os.path.abspath(path), is_json)
+        version = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                return entry[1]
+
+        with open(path, "r", encoding="utf-8") as f:
+            if is_json:
+                try:
+                    value = json.load(f)
+                except ValueError:
+                    value = {"error": "Invalid JSON"}
+            else:
+                value = f.read()
+
+        with self._lock:
+            self._entries[key] = (version, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+
+_default_cache = FileCache()
+
+
+def load_file(path, is_json=False):
+    """``FileCache.load`` on the process-wide cache shared by every session."""
+    return _default_cache.load(path, is_json)
@@ -0,0 +1,109 @@
+import functools
+import os
+import re
+
+import numpy as np
+
+from atlas.schedule import load_activities, to_days
+
+_DATE = re.compile(r"\b\d{4}-\d{2}-\d{2}\b")
+
+
+def dates_in(text):
+    """ISO dates (``YYYY-MM-DD``) mentioned in ``text``, in order."""
+    return _DATE.findall(str(text))
+
+
+# --- Interval index ---
+class IntervalIndex:
+    """Augmented interval tree over the days each activity occupies.
+
+    Activities occupy ``[start_date, end_date)`` (see ``atlas.schedule``);
+    the tree stores each one as the closed range of its first and last
+    occupied day. Milestones occupy no day and never overlap a query.
+
+    Intervals are sorted by start and laid out as an implicit balanced BST
+    over that array (node = midpoint of its range), each node carrying the
+    largest end in its subtree. Overlap queries prune subtrees that end too
+    early or start too late, so they cost O(log n + k) for k hits.
+    """
+
+    def __init__(self, starts, ends, items=None):
+        starts, ends = to_days(starts), to_days(ends)
+        order = np.argsort(starts, kind="stable")
+        self.starts = starts[order]
+        self.ends = np.maximum(ends[order], self.starts) - 1
+        items = list(items) if items is not None else list(range(len(order)))
+        self.items = [items[i] for i in order]
+        self.max_end = self._augment()
+
+    @classmethod
+    def from_activities(cls, activities):
+        activities = list(activities)
+        return cls(
+            [a["start_date"] for a in activities],
+            [a["end_date"] for a in activities],
+            activities,
+        )
+
+    def __len__(self):
+        return len(self.items)
+
+    def _augment(self):
+        # Build the subtree maxima one tree level at a time: the ranges at a
+        # level are disjoint, so a single reduceat covers them all.
+        n = len(self.starts)
+        max_end = np.empty(n, dtype=np.int64)
+        padded = np.append(self.ends, 0)
+        lo, hi = np.array([0]), np.array([n])
+        while n and lo.size:
+            mid = (lo + hi) // 2
+            bounds = np.column_stack((lo, hi)).ravel()
+            max_end[mid] = np.maximum.reduceat(padded, bounds)[::2]
+            left, right = lo < mid, mid + 1 < hi
+            lo = np.concatenate((lo[left], mid[right] + 1))
+            hi = np.concatenate((mid[left], hi[right]))
+        return max_end
+
+    def overlapping(self, start, end=None):
+        """Items whose range overlaps ``[start, end]``, in start order."""
+        start = int(to_days(start))
+        end = start if end is None else int(to_days(end))
+        hits = []
+        stack = [(0, len(self.starts))]
+        while stack:
+            lo, hi = stack.pop()
+            if lo >= hi:
+                continue
+            mid = (lo + hi) // 2
+            if self.max_end[mid] < start:
+                continue
+            if self.starts[mid] <= end:
+                # Right subtree starts no earlier than mid, so only worth a look if mid does.
+                stack.append((mid + 1, hi))
+                if self.ends[mid] >= max(start, self.starts[mid]):
+                    hits.append(mid)
+            stack.append((lo, mid))
+        return [self.items[i] for i in sorted(hits)]
+
+    def at(self, day):
+        """Items active on ``day``."""
+        return self.overlapping(day, day)
+
+
+@functools.lru_cache(maxsize=4)
+def _project_intervals(path, mtime_ns):
+    return IntervalIndex.from_activities(load_activities(path))
+
+
+def project_intervals(path):
+    """``IntervalIndex`` over a project file's activities, rebuilt only when the file changes."""
+    return _project_intervals(os.path.abspath(path), os.stat(path).st_mtime_ns)
+
+
+def describe_activities(activities, limit=10):
+    """One-line summary like ``T001 (Subcontractor 4), T002 (...)``."""
+    if not activities:
+        return "none"
+    names = [f"{a['task_id']} ({a.get('assigned_to', 'unassigned')})" for a in activities[:limit]]
+    return ", ".join(names) + (f" and {len(activities) - limit} more" if len(activities) > limit else "")
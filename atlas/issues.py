@@ -0,0 +1,34 @@
+import re
+from typing import NamedTuple
+
+_LEGACY_LINE = re.compile(r"\[([^\]]+)\]\s*(?:(\d{4}-\d{2}-\d{2}) - )?(.*)", re.DOTALL)
+
+
+# --- Issue record ---
+class Issue(NamedTuple):
+    """One scanner finding, passed as-is from scanner to planner."""
+
+    tag: str
+    date: str
+    section: str
+    record_id: str
+    text: str
+
+    @property
+    def details(self):
+        return f"{self.date} - {self.text}" if self.date else self.text
+
+    def __str__(self):
+        return f"[{self.tag}] {self.details}"
+
+    @classmethod
+    def parse(cls, line):
+        """Rebuild an issue from a legacy ``[tag] date - text`` line, or None.
+
+        Only the leading tag is treated as markup, so brackets in the text survive.
+        """
+        m = _LEGACY_LINE.match(line.strip())
+        if not m:
+            return None
+        tag, date, text = m.groups()
+        return cls(tag.strip(), date or "", "", "", text.strip())
@@ -0,0 +1,150 @@
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_JOB_DIR = os.path.join(".atlas_cache", "jobs")
+FINISHED = ("done", "failed", "interrupted")
+
+
+def max_jobs():
+    return int(os.getenv("ATLAS_MAX_JOBS", "2"))
+
+
+# --- Background jobs ---
+class JobManager:
+    """Pipeline runs on a local worker pool, with progress persisted per stage.
+
+    ``submit(run)`` returns a job id immediately. ``run`` is called on a
+    worker thread with a ``progress(stage, output)`` callback; every call
+    appends the stage to the job's JSON record under ``ATLAS_JOB_DIR``
+    (``.atlas_cache/jobs``), so any session (or a refreshed browser) can
+    poll ``status(job_id)`` and show stages as they finish. Submitting an id
+    that already has a record returns it unchanged, whatever its state, so
+    a page that resubmits on every rerun never restarts a finished job. A
+    failed job, or a record left queued or running by an earlier process
+    (read as ``interrupted``), only runs again with ``retry=True``.
+
+    Records not updated for ``ATLAS_JOB_TTL`` seconds (7 days, the response
+    cache's default TTL) are removed on the next submit, so a done job is
+    rerun once the outputs it was built from may have expired.
+    """
+
+    def __init__(self, directory=None, max_workers=None, ttl=None):
+        self.directory = directory or os.getenv("ATLAS_JOB_DIR", DEFAULT_JOB_DIR)
+        self.ttl = ttl or float(os.getenv("ATLAS_JOB_TTL", str(7 * 24 * 3600)))
+        self._pool = ThreadPoolExecutor(max_workers=max_workers or max_jobs(), thread_name_prefix="atlas-job")
+        self._active = {}
+        self._lock = threading.Lock()
+
+    def _path(self, job_id):
+        if not re.fullmatch(r"[\w-]+", job_id or ""):
+            raise ValueError(f"Invalid job id: {job_id!r}")
+        return os.path.join(self.directory, f"{job_id}.json")
+
+    def _write(self, job):
+        path = self._path(job["id"])
+        os.makedirs(self.directory, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(job, f, default=str)
+        os.replace(tmp, path)
+
+    def _read(self, job_id):
+        try:
+            with open(self._path(job_id), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _update(self, job_id, stage=None, **fields):
+        with self._lock:
+            job = self._read(job_id)
+            if stage is not None:
+                job["stages"].append(stage)
+            job.update(fields, updated_at=time.time())
+            self._write(job)
+
+    def _prune(self):
+        # Called with the lock held; a record's mtime is its last update.
+        now = time.time()
+        try:
+            filenames = os.listdir(self.directory)
+        except FileNotFoundError:
+            return
+        for filename in filenames:
+            job_id, ext = os.path.splitext(filename)
+            future = self._active.get(job_id)
+            if ext != ".json" or (future is not None and not future.done()):
+                continue
+            path = os.path.join(self.directory, filename)
+            try:
+                if now - os.stat(path).st_mtime > self.ttl:
+                    os.remove(path)
+                    self._active.pop(job_id, None)
+            except FileNotFoundError:
+                pass
+
+    def status(self, job_id):
+        """The job's record, or None for an unknown (or malformed) id."""
+        try:
+            job = self._read(job_id)
+        except ValueError:
+            return None
+        if job and job["state"] not in FINISHED:
+            with self._lock:
+                future = self._active.get(job_id)
+            if future is None or future.done():
+                job["state"] = "interrupted"
+        return job
+
+    def submit(self, run, job_id=None, meta=None, retry=False):
+        job_id = job_id or uuid.uuid4().hex[:16]
+        with self._lock:
+            future = self._active.get(job_id)
+            if future is not None and not future.done():
+                return job_id
+            self._prune()
+            existing = self._read(job_id)
+            if existing and (not retry or existing["state"] == "done"):
+                return job_id
+            now = time.time()
+            self._write({
+                "id": job_id,
+                "state": "queued",
+                "submitted_at": now,
+                "updated_at": now,
+                "meta": meta or {},
+                "stages": [],
+                "error": None,
+            })
+            self._active[job_id] = self._pool.submit(self._execute, job_id, run)
+        return job_id
+
+    def _execute(self, job_id, run):
+        self._update(job_id, state="running")
+
+        def progress(stage, output):
+            self._update(job_id, stage={"name": stage, "output": output, "finished_at": time.time()})
+
+        try:
+            run(progress)
+        except Exception as exc:
+            self._update(job_id, state="failed", error=f"{type(exc).__name__}: {exc}")
+        else:
+            self._update(job_id, state="done")
+
+
+_default_manager = None
+_default_manager_lock = threading.Lock()
+
+
+def default_manager():
+    global _default_manager
+    with _default_manager_lock:
+        if _default_manager is None:
+            _default_manager = JobManager()
+        return _default_manager
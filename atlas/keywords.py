@@ -0,0 +1,54 @@
+import functools
+import json
+import os
+import re
+
+# --- Keyword vocabulary ---
+# Trigger terms per issue tag. Matching is case-insensitive substring
+# matching, same as the old `"delay" in body.lower()` checks.
+DEFAULT_VOCABULARY = {
+    "type_delay": ("delay",),
+    "type_safety": ("violation",),
+    "type_inspection": ("fail",),
+}
+
+
+def load_vocabulary(path=None):
+    """Load a ``{tag: [terms]}`` JSON file, falling back to the defaults.
+
+    The path defaults to the ``ATLAS_SCAN_VOCABULARY`` environment variable.
+    """
+    path = path or os.getenv("ATLAS_SCAN_VOCABULARY")
+    if not path:
+        return DEFAULT_VOCABULARY
+    with open(path, "r", encoding="utf-8") as f:
+        return {tag: tuple(terms) for tag, terms in json.load(f).items()}
+
+
+# --- Keyword Matcher ---
+class KeywordMatcher:
+    """Each tag's terms compiled into one case-insensitive alternation.
+
+    A tag is reported when any of its terms occurs in the text, exactly like
+    the old ``term in text.lower()`` checks, without lowercasing the text.
+    Tags are matched independently, so a term of one tag can never hide an
+    overlapping term of another ("plate" does not mask "late"). Only the
+    ``allowed`` tags are searched.
+    """
+
+    def __init__(self, vocabulary=None):
+        vocabulary = vocabulary or DEFAULT_VOCABULARY
+        self.tags = tuple(tag for tag, terms in vocabulary.items() if terms)
+        self._regexes = {tag: _compile(tuple(vocabulary[tag])) for tag in self.tags}
+
+    def match(self, text, allowed=None):
+        """Return the set of tags whose terms occur in ``text``."""
+        tags = self.tags if allowed is None else [tag for tag in self.tags if tag in allowed]
+        return {tag for tag in tags if self._regexes[tag].search(text)}
+
+
+@functools.lru_cache(maxsize=64)
+def _compile(terms):
+    # Longest first so "delayed" is preferred over "delay".
+    ordered = sorted({re.escape(term) for term in terms}, key=len, reverse=True)
+    return re.compile("|".join(ordered), re.IGNORECASE)
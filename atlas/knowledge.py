@@ -0,0 +1,86 @@
+import hashlib
+import os
+import threading
+
+from crewai.knowledge.source.string_knowledge_source import StringKnowledgeSource
+
+SOP_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "knowledge", "sops")
+DEFAULT_CACHE_DIR = os.path.join(".atlas_cache", "sops")
+
+# Built sources are shared by every agent in the process, keyed by file content.
+_SOURCES = {}
+_lock = threading.Lock()
+
+
+class IndexedSopSource(StringKnowledgeSource):
+    """An SOP source that is only chunked and embedded once per content.
+
+    crewai's knowledge storage is a persistent Chroma collection whose
+    document ids are the sha256 of each chunk. When every chunk of this SOP
+    is already in the collection (from an earlier process), ``add`` skips
+    re-embedding it; any failure to check falls back to a normal add.
+    """
+
+    def add(self):
+        chunks = self._chunk_text(self.content)
+        try:
+            ids = sorted({hashlib.sha256(chunk.encode("utf-8")).hexdigest() for chunk in chunks})
+            if ids and len(self.storage.collection.get(ids=ids)["ids"]) == len(ids):
+                self.chunks = chunks
+                return
+        except Exception:
+            pass
+        super().add()
+
+
+def _convert(path):
+    """Docling's markdown export of an SOP, or the file as-is when docling isn't installed."""
+    try:
+        from docling.document_converter import DocumentConverter
+    except ImportError:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+    return DocumentConverter().convert(path).document.export_to_markdown()
+
+
+def _processed(path, digest, cache_dir):
+    cached = os.path.join(cache_dir, f"{digest}.md")
+    if os.path.exists(cached):
+        with open(cached, "r", encoding="utf-8") as f:
+            return f.read()
+    text = _convert(path)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp = f"{cached}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, cached)
+    return text
+
+
+# --- SOP knowledge ---
+def load_sops(directory=None, cache_dir=None):
+    """Knowledge sources for every SOP, keyed by name (``scanner_sop.md`` -> ``"scanner"``).
+
+    Each file is converted once per content hash and the result kept under
+    ``ATLAS_SOP_CACHE`` (``.atlas_cache/sops``), so a start with unchanged SOPs
+    only hashes the files. Sources are reused across calls in the process,
+    and chunks already embedded in crewai's knowledge store are not re-embedded.
+    """
+    directory = directory or SOP_DIR
+    cache_dir = cache_dir or os.getenv("ATLAS_SOP_CACHE", DEFAULT_CACHE_DIR)
+    sops = {}
+    for filename in sorted(os.listdir(directory)):
+        if not filename.endswith(".md"):
+            continue
+        path = os.path.join(directory, filename)
+        with open(path, "rb") as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+        name = filename[:-len(".md")].removesuffix("_sop")
+        with _lock:
+            if digest not in _SOURCES:
+                _SOURCES[digest] = IndexedSopSource(
+                    content=_processed(path, digest, cache_dir),
+                    metadata={"source": f"sops/{filename}"},
+                )
+            sops[name] = _SOURCES[digest]
+    return sops
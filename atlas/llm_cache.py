@@ -0,0 +1,189 @@
+import contextlib
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_CACHE_PATH = os.path.join(".atlas_cache", "llm_responses.sqlite")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed);
+"""
+
+
+# --- Response cache ---
+class ResponseCache:
+    """Persistent crew output cache with a size-bounded LRU and a TTL.
+
+    Defaults come from ``ATLAS_LLM_CACHE`` (path), ``ATLAS_LLM_CACHE_MAX_MB``
+    (64) and ``ATLAS_LLM_CACHE_TTL`` (seconds, 7 days).
+    """
+
+    def __init__(self, path=None, max_bytes=None, ttl=None):
+        self.path = path or os.getenv("ATLAS_LLM_CACHE", DEFAULT_CACHE_PATH)
+        self.max_bytes = max_bytes or int(float(os.getenv("ATLAS_LLM_CACHE_MAX_MB", "64")) * 1024 * 1024)
+        self.ttl = ttl or float(os.getenv("ATLAS_LLM_CACHE_TTL", str(7 * 24 * 3600)))
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    @contextlib.contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, key):
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            row = conn.execute("SELECT value, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if now - row[1] > self.ttl:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            return row[0]
+
+    def put(self, key, value):
+        now = time.time()
+        size = len(value.encode("utf-8"))
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now),
+            )
+            conn.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl,))
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            if total > self.max_bytes:
+                # Drop least recently used entries until back under the limit.
+                for old_key, old_size in conn.execute("SELECT key, size FROM responses ORDER BY accessed").fetchall():
+                    if total <= self.max_bytes:
+                        break
+                    conn.execute("DELETE FROM responses WHERE key = ?", (old_key,))
+                    total -= old_size
+
+
+# --- Prompt fingerprint ---
+def _model_name(agent):
+    llm = getattr(agent, "llm", None)
+    return (
+        getattr(llm, "model", None)
+        or getattr(llm, "model_name", None)
+        or os.getenv("MODEL")
+        or os.getenv("OPENAI_MODEL_NAME")
+        or ""
+    )
+
+
+def _knowledge_fingerprint(sources):
+    parts = []
+    for source in sources or []:
+        for path in getattr(source, "file_paths", None) or []:
+            full_path = os.path.join("knowledge", str(path))
+            if os.path.exists(full_path):
+                with open(full_path, "rb") as f:
+                    parts.append([str(path), hashlib.sha256(f.read()).hexdigest()])
+            else:
+                parts.append([str(path), None])
+        content = getattr(source, "content", None)
+        if isinstance(content, str):
+            parts.append(["content", hashlib.sha256(content.encode("utf-8")).hexdigest()])
+    return parts
+
+
+def _tool_inputs(tool):
+    # Fields the tool class declares beyond crewai's BaseTool (e.g. ``routes``,
+    # ``issues``) are its inputs; base fields such as ``cache_function`` hold
+    # callables whose repr changes between processes.
+    base = next((cls for cls in type(tool).__mro__ if cls.__module__.startswith("crewai")), None)
+    declared = set(getattr(type(tool), "model_fields", {})) - set(getattr(base, "model_fields", {}))
+    return tool.model_dump(include=declared) if declared else {}
+
+
+def _tool_fingerprint(tools):
+    # Tools are keyed by what they are given, never by running them: a tool may
+    # read upstream task outputs that only exist once the crew is kicked off.
+    return [[tool.name, tool.description, _tool_inputs(tool)] for tool in tools or []]
+
+
+def crew_cache_key(crew, inputs=None):
+    """Hash everything that shapes the prompts: agents, tasks, tool inputs, SOPs and model.
+
+    ``inputs`` covers anything else a tool reads, e.g. a digest of the project file.
+    """
+    payload = {
+        "agents": [
+            {
+                "role": agent.role,
+                "goal": agent.goal,
+                "backstory": agent.backstory,
+                "model": _model_name(agent),
+                "tools": _tool_fingerprint(agent.tools),
+                "knowledge": _knowledge_fingerprint(getattr(agent, "knowledge_sources", None)),
+            }
+            for agent in crew.agents
+        ],
+        "tasks": [
+            {
+                "description": task.description,
+                "expected_output": task.expected_output,
+                "agent": task.agent.role if task.agent else None,
+                "tools": _tool_fingerprint(task.tools),
+            }
+            for task in crew.tasks
+        ],
+        "inputs": inputs,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def default_cache():
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ResponseCache()
+        return _default_cache
+
+
+def cached_kickoff(crew, cache=None, inputs=None):
+    """``crew.kickoff()`` backed by the response cache.
+
+    On a hit no model is called: the stored final output is returned as a
+    string and each task's ``output`` is restored to its stored text. Set
+    ``ATLAS_LLM_CACHE=off`` to always call the model. ``inputs`` is passed to
+    ``crew_cache_key`` for state the tools read that is not one of their fields.
+    """
+    if os.getenv("ATLAS_LLM_CACHE", "").lower() == "off":
+        return crew.kickoff()
+    cache = cache or default_cache()
+    key = crew_cache_key(crew, inputs)
+    hit = cache.get(key)
+    if hit is not None:
+        stored = json.loads(hit)
+        for task, output in zip(crew.tasks, stored["tasks"]):
+            task.output = output
+        return stored["result"]
+    result = crew.kickoff()
+    cache.put(key, json.dumps({
+        "result": str(result),
+        "tasks": [str(task.output) if task.output is not None else None for task in crew.tasks],
+    }))
+    return result
@@ -0,0 +1,138 @@
+import collections
+import hashlib
+import os
+import threading
+
+from atlas import dispatcher, issues, keywords, scanner
+from atlas.checkpoints import file_digest
+from atlas.dispatcher import DispatcherLogic
+from atlas.keywords import load_vocabulary
+from atlas.scanner import ScannerLogic
+from atlas.stage_store import fingerprint
+
+# Modules whose code decides what the scan and routes stages produce
+_STAGE_MODULES = (scanner, keywords, dispatcher, issues)
+
+
+def source_key(source):
+    """Identify a project input by a hash of its content (files are re-hashed only when they change)."""
+    if isinstance(source, (str, os.PathLike)):
+        if not os.path.exists(source):
+            raise FileNotFoundError(source)
+        return file_digest(source)
+    digest = hashlib.sha256()
+    source.seek(0)
+    while True:
+        chunk = source.read(1 << 20)
+        if not chunk:
+            break
+        digest.update(chunk.encode("utf-8") if isinstance(chunk, str) else chunk)
+    source.seek(0)
+    return digest.hexdigest()
+
+
+# --- Pipeline ---
+class Pipeline:
+    """A small DAG of named stages, each computed at most once.
+
+    A stage's function receives its dependencies' results as positional
+    arguments. Every consumer asking for a stage gets the same memoized
+    result, so e.g. the scanner tool, the dispatcher tool and the issue
+    agent builder all share a single scan.
+
+    With a ``StageStore``, results also persist by input hash: a root
+    stage's input is the pipeline key, any other stage's input is the
+    content of its dependencies' results. A stage whose inputs are unchanged
+    is loaded rather than rerun, even for a different source.
+    """
+
+    def __init__(self, key=None, store=None):
+        self.key = key
+        self.store = store
+        self._stages = {}
+        self._results = {}
+        self._fingerprints = {}
+        self._locks = collections.defaultdict(threading.Lock)
+
+    def add(self, name, func, deps=()):
+        self._stages[name] = (func, tuple(deps))
+        return self
+
+    def stage(self, name, deps=()):
+        def register(func):
+            self.add(name, func, deps)
+            return func
+        return register
+
+    def result(self, name):
+        if name in self._results:
+            return self._results[name]
+        func, deps = self._stages[name]
+        with self._locks[name]:
+            if name not in self._results:
+                compute = lambda: func(*(self.result(dep) for dep in deps))
+                if self.store is None:
+                    self._results[name] = compute()
+                else:
+                    self._results[name] = self.store.get_or_compute(name, self.input_key(name), compute)
+        return self._results[name]
+
+    def fingerprint(self, name):
+        """Content hash of a stage's result, computing the stage if needed."""
+        if name not in self._fingerprints:
+            self._fingerprints[name] = fingerprint(self.result(name))
+        return self._fingerprints[name]
+
+    def input_key(self, name):
+        _, deps = self._stages[name]
+        return fingerprint([name] + ([self.fingerprint(dep) for dep in deps] if deps else [self.key]))
+
+    def done(self, name):
+        return name in self._results
+
+
+# --- Project pipelines ---
+_PIPELINES = collections.OrderedDict()
+_MAX_PIPELINES = 8
+_registry_lock = threading.Lock()
+
+
+def project_key(source, vocabulary):
+    """Root input key of a project pipeline: the input's content, the scan vocabulary and the stage code."""
+    return fingerprint({
+        "source": source_key(source),
+        "vocabulary": vocabulary,
+        "code": [file_digest(module.__file__) for module in _STAGE_MODULES],
+    })
+
+
+def project_pipeline(source, watermark=None, store=None):
+    """Scan and dispatch stages for one project input.
+
+    Pipelines are reused for identical inputs within the process, so
+    Streamlit reruns over an unchanged file do not rescan it. With a
+    ``store``, stage results also persist on disk by input hash: the
+    input's content, the scan vocabulary and the scanner/dispatcher code,
+    so editing any of them invalidates stored results. Watermarked
+    (incremental) runs are never shared or stored.
+    """
+    vocabulary = load_vocabulary()
+    key = project_key(source, vocabulary)
+    if watermark is None:
+        with _registry_lock:
+            if key in _PIPELINES:
+                _PIPELINES.move_to_end(key)
+                pipeline = _PIPELINES[key]
+                pipeline.store = pipeline.store or store
+                return pipeline
+
+    pipeline = Pipeline(key, store=store if watermark is None else None)
+    pipeline.add("scan", lambda: list(ScannerLogic.stream(source, vocabulary=vocabulary, watermark=watermark)))
+    pipeline.add("routes", lambda issues: DispatcherLogic(issues).route(), deps=("scan",))
+
+    if watermark is None:
+        with _registry_lock:
+            _PIPELINES[key] = pipeline
+            while len(_PIPELINES) > _MAX_PIPELINES:
+                _PIPELINES.popitem(last=False)
+    return pipeline
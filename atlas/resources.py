@@ -0,0 +1,113 @@
+import numpy as np
+
+from atlas.schedule import to_date, to_days
+
+
+# --- Resource loading ---
+class ResourceLoading:
+    """Concurrent commitments per subcontractor, from one sorted sweep.
+
+    Each activity contributes a +1 event on its start day and a -1 event on
+    its end day (activities occupy ``[start_date, end_date)``, see
+    ``atlas.schedule``). All subcontractors' events are sorted
+    together by (resource, day, delta); because every resource's events sum
+    to zero, a single cumulative sum gives the running load of each resource
+    without resetting between groups. A resource is over-allocated while its
+    load exceeds ``capacity`` concurrent activities.
+    """
+
+    def __init__(self, resources, starts, ends, task_ids, capacity=1):
+        self.names, self.resource = np.unique(np.asarray(resources, dtype=object).astype(str), return_inverse=True)
+        self.starts = to_days(starts)
+        self.ends = np.maximum(to_days(ends), self.starts)
+        self.task_ids = np.asarray(task_ids, dtype=object)
+        self.capacity = capacity
+
+    @classmethod
+    def from_activities(cls, activities, capacity=1):
+        activities = [a for a in activities if a.get("assigned_to")]
+        return cls(
+            [a["assigned_to"] for a in activities],
+            [a["start_date"] for a in activities],
+            [a["end_date"] for a in activities],
+            [a["task_id"] for a in activities],
+            capacity,
+        )
+
+    def _capacities(self):
+        if isinstance(self.capacity, dict):
+            return np.array([self.capacity.get(name, 1) for name in self.names], dtype=np.int64)
+        return np.full(len(self.names), self.capacity, dtype=np.int64)
+
+    def analyze(self):
+        """Per-resource peak load, over-allocated days and overload windows."""
+        n = len(self.starts)
+        if not n:
+            return []
+        resource = np.concatenate((self.resource, self.resource))
+        day = np.concatenate((self.starts, self.ends))
+        delta = np.concatenate((np.ones(n, dtype=np.int64), -np.ones(n, dtype=np.int64)))
+        # Ends sort before starts on the same day: back-to-back work is not an overlap.
+        order = np.lexsort((delta, day, resource))
+        resource, day, delta = resource[order], day[order], delta[order]
+        load = np.cumsum(delta)
+
+        # Load holds from each event until the resource's next event.
+        same = np.r_[resource[1:] == resource[:-1], False]
+        span = np.where(same, np.r_[day[1:], 0] - day, 0)
+        over = (load > self._capacities()[resource]) & (span > 0)
+
+        group_starts = np.flatnonzero(np.r_[True, resource[1:] != resource[:-1]])
+        groups = resource[group_starts]
+        peaks = np.maximum.reduceat(load, group_starts)
+        over_days = np.add.reduceat(np.where(over, span, 0), group_starts)
+
+        # Merge touching overloaded segments into windows.
+        segments = np.flatnonzero(over)
+        seg_end = day[segments] + span[segments]
+        breaks = np.r_[True, (resource[segments][1:] != resource[segments][:-1]) | (day[segments][1:] != seg_end[:-1])]
+        window_starts = np.flatnonzero(breaks)
+        window_ends = np.r_[window_starts[1:], segments.size] - 1
+        window_peaks = np.maximum.reduceat(load[segments], window_starts) if segments.size else np.empty(0, dtype=np.int64)
+
+        # Activities grouped by resource, to name the ones inside each window.
+        by_resource = np.argsort(self.resource, kind="stable")
+        ptr = np.concatenate(([0], np.cumsum(np.bincount(self.resource, minlength=len(self.names)))))
+        windows = {}
+        for first, last, peak in zip(window_starts, window_ends, window_peaks):
+            r = resource[segments[first]]
+            lo, hi = day[segments[first]], seg_end[last] - 1
+            mine = by_resource[ptr[r]:ptr[r + 1]]
+            mine = mine[(self.starts[mine] <= hi) & (self.ends[mine] > lo)]
+            windows.setdefault(r, []).append({
+                "start": to_date(lo),
+                "end": to_date(hi),
+                "peak": int(peak),
+                "task_ids": list(self.task_ids[mine]),
+            })
+
+        report = [
+            {
+                "resource": str(self.names[r]),
+                "peak": int(peak),
+                "over_allocated_days": int(days),
+                "windows": windows.get(r, []),
+            }
+            for r, peak, days in zip(groups, peaks, over_days)
+        ]
+        report.sort(key=lambda item: (-item["over_allocated_days"], -item["peak"], item["resource"]))
+        return report
+
+    def summary(self, limit=10):
+        report = self.analyze()
+        overloaded = [item for item in report if item["over_allocated_days"]]
+        if not overloaded:
+            peak = max((item["peak"] for item in report), default=0)
+            return f"No subcontractor is over-allocated (highest concurrent load: {peak})."
+        lines = [f"Over-allocated subcontractors: {len(overloaded)} of {len(report)}"]
+        for item in overloaded[:limit]:
+            lines.append(f"- {item['resource']}: peak {item['peak']} concurrent activities, "
+                         f"{item['over_allocated_days']} over-allocated days")
+            for window in item["windows"][:3]:
+                lines.append(f"  {window['start']} to {window['end']}: {', '.join(window['task_ids'])}")
+        return "\n".join(lines)
@@ -0,0 +1,204 @@
+import contextlib
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+
+DEFAULT_STORE_PATH = "atlas_results.sqlite"
+STAGES = ("scanner", "dispatcher", "scheduler", "safety", "qaqc", "planner", "evaluation")
+DEFAULT_EXPORT_DIR = "atlas_exports"
+EXPORT_FILES = {
+    "scanner": "scanner_results.txt",
+    "dispatcher": "dispatcher_results.json",
+    "scheduler": "scheduler_results.txt",
+    "safety": "safety_results.json",
+    "qaqc": "qaqc_results.json",
+    "planner": "planner_results.json",
+    "evaluation": "evaluation_results.json",
+}
+
+_RUNS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    source TEXT,
+    created REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_created ON runs (created);
+CREATE TABLE IF NOT EXISTS checkpoints (
+    run_id TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    input_key TEXT NOT NULL,
+    output TEXT,
+    finished REAL NOT NULL,
+    PRIMARY KEY (run_id, stage)
+);
+CREATE INDEX IF NOT EXISTS checkpoints_key ON checkpoints (stage, input_key, finished);
+"""
+_STAGE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS {stage} (
+    run_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    agent TEXT,
+    payload TEXT NOT NULL,
+    PRIMARY KEY (run_id, seq)
+);
+CREATE INDEX IF NOT EXISTS {stage}_run_agent ON {stage} (run_id, agent);
+"""
+
+
+# --- Result store ---
+class ResultStore:
+    """Stage results of the Seperate Agents pipeline in one SQLite file.
+
+    Each stage has its own table of JSON rows keyed by run id, with an index
+    on (run_id, agent) so a downstream agent reads only the rows routed to
+    it. ``write`` replaces a stage's rows for one run inside a single
+    transaction; concurrent runs use different run ids and never touch each
+    other's rows. The file defaults to ``ATLAS_RESULT_STORE``
+    (``atlas_results.sqlite``).
+
+    A write may carry a checkpoint: the stage's input key (see
+    ``atlas.checkpoints.stage_key``) and its printed output, committed with
+    the rows. ``restore`` finds a checkpoint with the same key and, when it
+    belongs to another run, copies that run's rows (and export) over.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.getenv("ATLAS_RESULT_STORE", DEFAULT_STORE_PATH)
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_RUNS_SCHEMA + "".join(_STAGE_SCHEMA.format(stage=stage) for stage in STAGES))
+
+    @contextlib.contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _table(stage):
+        if stage not in STAGES:
+            raise ValueError(f"Unknown stage: {stage!r}")
+        return stage
+
+    # --- Runs ---
+    def new_run(self, source=None, run_id=None):
+        run_id = run_id or f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO runs (run_id, source, created) VALUES (?, ?, ?)",
+                (run_id, source, time.time()),
+            )
+        return run_id
+
+    def latest_run(self):
+        with self._connect() as conn:
+            row = conn.execute("SELECT run_id FROM runs ORDER BY created DESC LIMIT 1").fetchone()
+        return row[0] if row else None
+
+    # --- Stage rows ---
+    def write(self, stage, run_id, rows, input_key=None, output=None):
+        """Replace ``stage``'s rows for ``run_id``; each row's ``agent`` key is indexed."""
+        table = self._table(stage)
+        records = [(run_id, seq, row.get("agent"), json.dumps(row, default=str)) for seq, row in enumerate(rows)]
+        with self._lock, self._connect() as conn:
+            conn.execute(f"DELETE FROM {table} WHERE run_id = ?", (run_id,))
+            conn.executemany(f"INSERT INTO {table} (run_id, seq, agent, payload) VALUES (?, ?, ?, ?)", records)
+            conn.execute("DELETE FROM checkpoints WHERE run_id = ? AND stage = ?", (run_id, stage))
+            if input_key is not None:
+                conn.execute(
+                    "INSERT INTO checkpoints (run_id, stage, input_key, output, finished) VALUES (?, ?, ?, ?, ?)",
+                    (run_id, stage, input_key, output, time.time()),
+                )
+
+    def restore(self, stage, run_id, input_key):
+        """The checkpointed output of ``stage`` for ``input_key``, or None if it must run.
+
+        This run's own checkpoint wins; otherwise the newest matching
+        checkpoint's rows are copied into this run in one transaction.
+        """
+        table = self._table(stage)
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT run_id, output FROM checkpoints WHERE stage = ? AND input_key = ? "
+                "ORDER BY run_id = ? DESC, finished DESC LIMIT 1",
+                (stage, input_key, run_id),
+            ).fetchone()
+            if row is None:
+                return None
+            source, output = row
+            if source != run_id:
+                conn.execute(f"DELETE FROM {table} WHERE run_id = ?", (run_id,))
+                conn.execute(
+                    f"INSERT INTO {table} (run_id, seq, agent, payload) "
+                    f"SELECT ?, seq, agent, payload FROM {table} WHERE run_id = ?",
+                    (run_id, source),
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO checkpoints (run_id, stage, input_key, output, finished) VALUES (?, ?, ?, ?, ?)",
+                    (run_id, stage, input_key, output, time.time()),
+                )
+                _copy_export(stage, source, run_id)
+            return output or ""
+
+    def read(self, stage, run_id, agent=None):
+        """Rows of ``stage`` for ``run_id`` (optionally only ``agent``'s), in write order."""
+        table = self._table(stage)
+        query = f"SELECT payload FROM {table} WHERE run_id = ?"
+        params = [run_id]
+        if agent is not None:
+            query += " AND agent = ?"
+            params.append(agent)
+        with self._connect() as conn:
+            return [json.loads(payload) for (payload,) in conn.execute(query + " ORDER BY seq", params)]
+
+
+def current_run(store):
+    """The run this process belongs to: ``ATLAS_RUN_ID``, else the newest run."""
+    run_id = os.getenv("ATLAS_RUN_ID") or store.latest_run()
+    if run_id is None:
+        raise LookupError("No pipeline run found. Run scanner_agent.py first.")
+    return run_id
+
+
+def export_path(run_id, stage):
+    """Where ``stage``'s export for ``run_id`` lives: ``ATLAS_EXPORT_DIR/<run_id>/<file>``."""
+    if os.path.basename(run_id) != run_id or run_id in ("", ".", ".."):
+        raise ValueError(f"Invalid run id: {run_id!r}")
+    return os.path.join(os.getenv("ATLAS_EXPORT_DIR", DEFAULT_EXPORT_DIR), run_id, EXPORT_FILES[stage])
+
+
+def export(run_id, stage, data):
+    """Atomically write a text or JSON export of one run's stage (read by Ask Atlas).
+
+    Every run writes under its own directory, so concurrent runs never
+    overwrite each other's files.
+    """
+    path = export_path(run_id, stage)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        if isinstance(data, str):
+            f.write(data)
+        else:
+            json.dump(data, f, indent=2)
+    os.replace(tmp, path)
+
+
+def _copy_export(stage, source, run_id):
+    path = export_path(run_id, stage)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        shutil.copyfile(export_path(source, stage), tmp)
+    except FileNotFoundError:
+        return
+    os.replace(tmp, path)
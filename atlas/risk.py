@@ -0,0 +1,99 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from atlas.schedule import to_date
+
+# --- Duration distributions ---
+# Without per-activity estimates, durations range from 10% shorter to 30%
+# longer than planned, most likely as planned.
+DEFAULT_OPTIMISTIC = 0.1
+DEFAULT_PESSIMISTIC = 0.3
+PERCENTILES = (50, 80, 95)
+# Upper bound on iterations x activities held in memory per sampling chunk.
+CHUNK_CELLS = 1 << 22
+
+
+def _triangular(rng, low, mode, high, size):
+    """Inverse-CDF triangular samples; ``low == high`` collapses to a constant."""
+    u = rng.random((size, low.size))
+    width = high - low
+    split = np.divide(mode - low, width, out=np.zeros_like(width), where=width > 0)
+    left = low + np.sqrt(u * width * (mode - low))
+    right = high - np.sqrt((1 - u) * width * (high - mode))
+    return np.where(u < split, left, right)
+
+
+def _simulate(risk, start, iterations, seed):
+    rng = np.random.default_rng(seed)
+    chunk = max(1, CHUNK_CELLS // max(1, len(risk.network)))
+    finishes = []
+    for done in range(0, iterations, chunk):
+        size = min(chunk, iterations - done)
+        durations = _triangular(rng, risk.low, risk.mode, risk.high, size)
+        _, ef = risk.network.forward(start, durations)
+        finishes.append(ef.max(axis=1))
+    return np.concatenate(finishes) if finishes else np.empty(0)
+
+
+# --- Monte Carlo schedule risk ---
+class ScheduleRisk:
+    """Monte Carlo finish-date risk over a ``ScheduleNetwork``.
+
+    Each activity's duration is drawn from a triangular distribution
+    (``duration_low`` / ``duration_high`` days on the activity record, or the
+    default spread around the planned duration). Iterations are sampled as a
+    matrix and pushed through the network's level-wise forward pass together,
+    in chunks bounded by ``CHUNK_CELLS``.
+    """
+
+    def __init__(self, network, low=None, high=None):
+        self.network = network
+        self.mode = network.duration.astype(float)
+        self.low = self.mode * (1 - DEFAULT_OPTIMISTIC) if low is None else np.minimum(low, self.mode)
+        self.high = self.mode * (1 + DEFAULT_PESSIMISTIC) if high is None else np.maximum(high, self.mode)
+
+    @classmethod
+    def from_activities(cls, network, activities):
+        mode = network.duration.astype(float)
+        low = mode * (1 - DEFAULT_OPTIMISTIC)
+        high = mode * (1 + DEFAULT_PESSIMISTIC)
+        for i, activity in enumerate(activities):
+            if activity.get("duration_low") is not None:
+                low[i] = activity["duration_low"]
+            if activity.get("duration_high") is not None:
+                high[i] = activity["duration_high"]
+        return cls(network, low, high)
+
+    def simulate(self, iterations=None, shift=None, seed=None, processes=None):
+        """Sampled project finish day numbers.
+
+        ``shift`` holds known delays per activity (see
+        ``DelayImpactLogic.shifts``). With ``processes`` > 1 the iterations are
+        split across a process pool, each worker seeded from its own
+        ``SeedSequence`` child. Defaults come from ``ATLAS_MONTE_CARLO_ITERATIONS``
+        (2000) and ``ATLAS_MONTE_CARLO_PROCESSES`` (1).
+        """
+        iterations = iterations or int(os.getenv("ATLAS_MONTE_CARLO_ITERATIONS", "2000"))
+        processes = processes or int(os.getenv("ATLAS_MONTE_CARLO_PROCESSES", "1"))
+        start = self.network.start if shift is None else self.network.shifted_start(shift)
+        seeds = np.random.SeedSequence(seed).spawn(max(1, processes))
+        if processes <= 1:
+            return _simulate(self, start, iterations, seeds[0])
+        counts = [len(part) for part in np.array_split(np.arange(iterations), processes)]
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            parts = pool.map(_simulate, [self] * len(seeds), [start] * len(seeds), counts, seeds)
+            return np.concatenate(list(parts))
+
+    def percentiles(self, finishes, percentiles=PERCENTILES):
+        days = np.ceil(np.percentile(finishes, percentiles)).astype(np.int64)
+        return {f"P{p}": to_date(day) for p, day in zip(percentiles, days)}
+
+    def summary(self, iterations=None, shift=None, seed=None, processes=None):
+        finishes = self.simulate(iterations, shift, seed, processes)
+        planned = self.network.finish
+        lines = [f"Monte Carlo finish over {len(finishes)} iterations (planned {to_date(planned)}):"]
+        lines.extend(f"- {label}: {date}" for label, date in self.percentiles(finishes).items())
+        lines.append(f"- Chance of finishing by {to_date(planned)}: {np.mean(finishes <= planned):.0%}")
+        return "\n".join(lines)
@@ -0,0 +1,129 @@
+import contextlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+DEFAULT_HISTORY_PATH = os.path.join(".atlas_cache", "run_history.sqlite")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    project TEXT NOT NULL,
+    day TEXT NOT NULL,
+    started REAL NOT NULL,
+    finished REAL NOT NULL,
+    input_hash TEXT,
+    size INTEGER NOT NULL,
+    stages BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_project_day ON runs (project, day);
+CREATE INDEX IF NOT EXISTS runs_day ON runs (day);
+CREATE INDEX IF NOT EXISTS runs_input_hash ON runs (input_hash);
+CREATE TABLE IF NOT EXISTS run_tags (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    tag TEXT NOT NULL,
+    issues INTEGER NOT NULL,
+    PRIMARY KEY (tag, run_id)
+);
+CREATE INDEX IF NOT EXISTS run_tags_run ON run_tags (run_id);
+"""
+_COLUMNS = ("id", "project", "day", "started", "finished", "input_hash", "size")
+
+
+# --- Run history ---
+class RunHistory:
+    """Append-only log of pipeline runs in one SQLite file.
+
+    A run's stage outputs are stored as one zlib-compressed JSON blob;
+    project, day (UTC ``YYYY-MM-DD``), timestamps, input hash and per-tag
+    issue counts are plain indexed columns. Listing runs and tag trends
+    only touches the indexes and summary columns, so months of history are
+    queried without decompressing (or loading) any stage outputs. The file
+    defaults to ``ATLAS_RUN_HISTORY`` (``.atlas_cache/run_history.sqlite``).
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.getenv("ATLAS_RUN_HISTORY", DEFAULT_HISTORY_PATH)
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    @contextlib.contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def append(self, project, stages, input_hash=None, tags=None, started=None):
+        """Record one finished run; ``tags`` maps issue tag -> issue count. Returns the run id."""
+        finished = time.time()
+        started = started or finished
+        blob = zlib.compress(json.dumps(stages, default=str).encode("utf-8"))
+        with self._lock, self._connect() as conn:
+            run_id = conn.execute(
+                "INSERT INTO runs (project, day, started, finished, input_hash, size, stages) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (project, time.strftime("%Y-%m-%d", time.gmtime(started)), started, finished, input_hash, len(blob), blob),
+            ).lastrowid
+            conn.executemany(
+                "INSERT INTO run_tags (run_id, tag, issues) VALUES (?, ?, ?)",
+                [(run_id, tag, count) for tag, count in (tags or {}).items()],
+            )
+        return run_id
+
+    @staticmethod
+    def _filters(project=None, since=None, until=None, tag=None):
+        clauses, params = [], []
+        if project is not None:
+            clauses.append("project = ?")
+            params.append(project)
+        if since is not None:
+            clauses.append("day >= ?")
+            params.append(str(since))
+        if until is not None:
+            clauses.append("day <= ?")
+            params.append(str(until))
+        if tag is not None:
+            clauses.append("id IN (SELECT run_id FROM run_tags WHERE tag = ?)")
+            params.append(tag)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def runs(self, project=None, since=None, until=None, tag=None, limit=None):
+        """Run summaries (no stage outputs), newest first, streamed from the database."""
+        where, params = self._filters(project, since, until, tag)
+        query = f"SELECT {', '.join(_COLUMNS)} FROM runs{where} ORDER BY started DESC"
+        if limit is not None:
+            query += f" LIMIT {int(limit)}"
+        with self._connect() as conn:
+            for row in conn.execute(query, params):
+                yield dict(zip(_COLUMNS, row))
+
+    def load(self, run_id):
+        """One run with its decompressed stage outputs and tag counts, or None."""
+        with self._connect() as conn:
+            row = conn.execute(f"SELECT {', '.join(_COLUMNS)}, stages FROM runs WHERE id = ?", (run_id,)).fetchone()
+            if row is None:
+                return None
+            tags = dict(conn.execute("SELECT tag, issues FROM run_tags WHERE run_id = ?", (run_id,)))
+        record = dict(zip(_COLUMNS, row[:-1]))
+        record["tags"] = tags
+        record["stages"] = json.loads(zlib.decompress(row[-1]))
+        return record
+
+    def tag_trend(self, project=None, since=None, until=None):
+        """``(day, tag, runs, issues)`` per day and tag, aggregated in SQL."""
+        where, params = self._filters(project, since, until)
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT runs.day, run_tags.tag, COUNT(*), SUM(run_tags.issues) "
+                f"FROM run_tags JOIN (SELECT id, day FROM runs{where}) AS runs ON runs.id = run_tags.run_id "
+                "GROUP BY runs.day, run_tags.tag ORDER BY runs.day, run_tags.tag",
+                params,
+            ).fetchall()
@@ -0,0 +1,191 @@
+import codecs
+import contextlib
+import json
+import os
+from typing import Callable, NamedTuple
+
+from atlas.issues import Issue
+from atlas.keywords import KeywordMatcher, load_vocabulary
+
+# --- Streaming JSON reader ---
+# Walks the top-level project object and decodes the wanted arrays one
+# element at a time, so memory is bounded by the largest single record.
+
+_DECODER = json.JSONDecoder()
+_WHITESPACE = " \t\r\n"
+_DELIMITERS = _WHITESPACE + ",:]}"
+DEFAULT_CHUNK_SIZE = 1 << 16
+
+
+class _JsonStream:
+    def __init__(self, fp, chunk_size):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+
+    def _read(self, size):
+        chunk = self.fp.read(size)
+        if isinstance(chunk, bytes):
+            chunk = self._utf8.decode(chunk, final=not chunk)
+        if not chunk:
+            self.eof = True
+            return False
+        if self.pos >= self.chunk_size:
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+        self.buf += chunk
+        return True
+
+    def peek(self):
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._read(self.chunk_size):
+                return ""
+
+    def take(self, expected):
+        ch = self.peek()
+        if ch not in expected:
+            raise ValueError(f"Malformed project file: expected one of {expected!r}, got {ch!r}")
+        self.pos += 1
+        return ch
+
+    def value(self):
+        self.peek()
+        size = self.chunk_size
+        while True:
+            try:
+                obj, end = _DECODER.raw_decode(self.buf, self.pos)
+                # A number cut off by the buffer edge decodes "successfully", so only
+                # accept a value once the character after it is visible.
+                if self.eof or (end < len(self.buf) and self.buf[end] in _DELIMITERS):
+                    self.pos = end
+                    return obj
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._read(size)
+            size *= 2
+
+    def items(self):
+        self.take("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            if self.take(",]") == "]":
+                return
+
+
+@contextlib.contextmanager
+def _open_source(source):
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as fp:
+            yield fp
+    else:
+        if hasattr(source, "seekable") and source.seekable():
+            source.seek(0)
+        yield source
+
+
+def iter_sections(source, sections, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield ``(section, index, record)`` for every element of the wanted top-level arrays.
+
+    ``source`` is a path or a readable (text or binary) file object.
+    """
+    with _open_source(source) as fp:
+        stream = _JsonStream(fp, chunk_size)
+        stream.take("{")
+        if stream.peek() == "}":
+            return
+        while True:
+            key = stream.value()
+            stream.take(":")
+            if stream.peek() == "[":
+                items = stream.items()
+                if key in sections:
+                    for index, record in enumerate(items):
+                        yield key, index, record
+                else:
+                    for _ in items:
+                        pass
+            else:
+                stream.value()
+            if stream.take(",}") == "}":
+                return
+
+
+# --- Scanner Logic ---
+class ScanRule(NamedTuple):
+    fields: tuple  # text fields run through the keyword matcher
+    tags: tuple  # tags this section may raise
+    date_field: str
+    id_field: str  # None when records carry no id; the array index is used
+    render: Callable  # record -> issue text (without the date)
+
+
+SCAN_RULES = {
+    "emails": ScanRule(
+        ("body",), ("type_delay",), "date", None,
+        lambda r: f"{r['subject']}: {r['body']}",
+    ),
+    "site_logs": ScanRule(
+        ("description",), ("type_safety",), "log_date", None,
+        lambda r: r["description"],
+    ),
+    "inspection_reports": ScanRule(
+        ("status",), ("type_inspection",), "date", "report_id",
+        lambda r: f"{r['area']}: {r['comments']}",
+    ),
+}
+SCAN_SECTIONS = tuple(SCAN_RULES)
+
+
+class ScannerLogic:
+    def __init__(self, data=None, vocabulary=None):
+        self.data = data
+        self.issues = []
+        self.matcher = KeywordMatcher(vocabulary or load_vocabulary())
+
+    def scan_records(self, records):
+        match = self.matcher.match
+        for section, index, record in records:
+            rule = SCAN_RULES[section]
+            tags = set()
+            for field in rule.fields:
+                tags |= match(record[field], rule.tags)
+            if not tags:
+                continue
+            record_id = record.get(rule.id_field) if rule.id_field else None
+            if record_id is None:
+                record_id = f"{section}[{index}]"
+            text = rule.render(record)
+            for tag in rule.tags:
+                if tag in tags:
+                    yield Issue(tag, record[rule.date_field], section, str(record_id), text)
+
+    def scan(self):
+        records = (
+            (section, index, record)
+            for section in SCAN_SECTIONS
+            for index, record in enumerate(self.data.get(section, []))
+        )
+        self.issues.extend(self.scan_records(records))
+        return self.issues
+
+    @classmethod
+    def stream(cls, source, vocabulary=None, watermark=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Lazily scan a project file, yielding ``Issue`` records while it is still being read.
+
+        With a ``Watermark`` only records added since its last save are scanned.
+        """
+        records = iter_sections(source, SCAN_SECTIONS, chunk_size)
+        if watermark is not None:
+            records = watermark.filter(records, source)
+        return cls(vocabulary=vocabulary).scan_records(records)
@@ -0,0 +1,346 @@
+import copy
+import heapq
+
+import numpy as np
+
+from atlas.scanner import iter_sections
+
+# --- Date helpers ---
+# Dates are held as int64 day numbers (days since 1970-01-01) so every pass
+# is plain integer array arithmetic.
+#
+# An activity occupies the half-open day range [start_date, end_date): its
+# end_date is the first day it no longer holds the crew, which is also the
+# earliest day a successor may start. An activity whose end_date is on or
+# before its start_date is a zero-length milestone. The CPM passes, resource
+# loading and the interval index all follow this convention.
+
+
+def to_days(dates):
+    return np.asarray(dates, dtype="datetime64[D]").astype(np.int64)
+
+
+def to_date(day):
+    return str(np.datetime64(int(day), "D"))
+
+
+def load_activities(source):
+    """The ``activities`` records of a project file path or file object, streamed."""
+    return [record for _, _, record in iter_sections(source, ("activities",))]
+
+
+def _csr(keys, n):
+    """Offsets for edges sorted by ``keys``: node i owns ``ptr[i]:ptr[i + 1]``."""
+    return np.concatenate(([0], np.cumsum(np.bincount(keys, minlength=n))))
+
+
+def _gather(ptr, nodes):
+    """Edge positions owned by ``nodes`` in a CSR layout, without a Python loop."""
+    starts = ptr[nodes]
+    counts = ptr[nodes + 1] - starts
+    offsets = np.cumsum(counts) - counts
+    return np.repeat(starts - offsets, counts) + np.arange(counts.sum())
+
+
+def _segments(keys):
+    """Start positions of runs of equal values in a sorted key array."""
+    return np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+
+
+# --- Schedule network ---
+class ScheduleNetwork:
+    """Critical Path Method over the project ``activities`` table.
+
+    Activities are finish-to-start linked through an optional ``predecessors``
+    list of task ids. An activity starts no earlier than its scheduled
+    ``start_date`` and no earlier than all of its predecessors finish; its
+    duration is ``end_date - start_date`` in days.
+
+    Both passes run level by level over a topological layering, so the
+    Python loop is bounded by the depth of the network and each level is a
+    handful of array operations regardless of its width.
+    """
+
+    def __init__(self, task_ids, start, finish, predecessors=None):
+        self.task_ids = list(task_ids)
+        self.index = {task_id: i for i, task_id in enumerate(self.task_ids)}
+        if len(self.index) != len(self.task_ids):
+            raise ValueError("Duplicate task_id in activities.")
+        self.start = to_days(start)
+        self.duration = np.maximum(to_days(finish) - self.start, 0)
+        n = len(self.task_ids)
+
+        src, dst = [], []
+        for i, preds in enumerate(predecessors or []):
+            for pred in preds or ():
+                if pred not in self.index:
+                    raise ValueError(f"Activity {self.task_ids[i]} has unknown predecessor {pred!r}.")
+                src.append(self.index[pred])
+                dst.append(i)
+        self.src = np.asarray(src, dtype=np.int64)
+        self.dst = np.asarray(dst, dtype=np.int64)
+
+        # Successor and predecessor adjacency (CSR)
+        by_src = np.argsort(self.src, kind="stable")
+        by_dst = np.argsort(self.dst, kind="stable")
+        self.succ_ptr, self.succ = _csr(self.src, n), self.dst[by_src]
+        self.pred_ptr, self.pred = _csr(self.dst, n), self.src[by_dst]
+
+        self.level = self._levels()
+        self.order = np.argsort(self.level, kind="stable")
+        self.depth = int(self.level.max()) + 1 if n else 0
+        self.level_ptr = _csr(self.level, self.depth)
+
+        # Edges grouped by successor level (forward pass) and by
+        # predecessor level (backward pass), each sorted by the node reduced into.
+        self._fwd = np.lexsort((self.dst, self.level[self.dst]))
+        self._fwd_ptr = _csr(self.level[self.dst], self.depth)
+        self._bwd = np.lexsort((self.src, self.level[self.src]))
+        self._bwd_ptr = _csr(self.level[self.src], self.depth)
+        self.compute()
+
+    @classmethod
+    def from_activities(cls, activities):
+        activities = list(activities)
+        return cls(
+            [a["task_id"] for a in activities],
+            [a["start_date"] for a in activities],
+            [a["end_date"] for a in activities],
+            [a.get("predecessors") for a in activities],
+        )
+
+    @classmethod
+    def from_project(cls, source):
+        return cls.from_activities(load_activities(source))
+
+    def __len__(self):
+        return len(self.task_ids)
+
+    def copy(self):
+        """Independent dates over the same (shared, read-only) network structure."""
+        other = copy.copy(self)
+        for name in ("start", "duration", "es", "ef", "tail", "lf", "ls", "total_float", "free_float"):
+            setattr(other, name, getattr(self, name).copy())
+        return other
+
+    def _levels(self):
+        # Kahn's algorithm, one whole frontier at a time.
+        n = len(self.task_ids)
+        indegree = np.diff(self.pred_ptr).copy()
+        level = np.full(n, -1, dtype=np.int64)
+        frontier = np.flatnonzero(indegree == 0)
+        depth = 0
+        while frontier.size:
+            level[frontier] = depth
+            targets = self.succ[_gather(self.succ_ptr, frontier)]
+            np.subtract.at(indegree, targets, 1)
+            targets = np.unique(targets)
+            frontier = targets[indegree[targets] == 0]
+            depth += 1
+        if (level < 0).any():
+            stuck = [self.task_ids[i] for i in np.flatnonzero(level < 0)[:10]]
+            raise ValueError(f"Dependency cycle among activities: {', '.join(stuck)}")
+        return level
+
+    # --- Passes ---
+    def forward(self, start=None, duration=None):
+        """Early start/finish: ES = max(scheduled start, latest predecessor EF).
+
+        ``start`` and ``duration`` default to the network's own and may carry
+        a leading batch axis (e.g. Monte Carlo iterations); every batch row is
+        reduced in the same array operations.
+        """
+        start = self.start if start is None else np.asarray(start)
+        duration = self.duration if duration is None else np.asarray(duration)
+        shape = np.broadcast_shapes(start.shape, duration.shape)
+        es = np.array(np.broadcast_to(start, shape), dtype=np.result_type(start, duration))
+        ef = np.empty_like(es)
+        for lvl in range(self.depth):
+            edges = self._fwd[self._fwd_ptr[lvl]:self._fwd_ptr[lvl + 1]]
+            if edges.size:
+                nodes = self.dst[edges]
+                starts = _segments(nodes)
+                latest = np.maximum.reduceat(ef[..., self.src[edges]], starts, axis=-1)
+                nodes = nodes[starts]
+                es[..., nodes] = np.maximum(es[..., nodes], latest)
+            members = self.order[self.level_ptr[lvl]:self.level_ptr[lvl + 1]]
+            ef[..., members] = es[..., members] + duration[..., members]
+        return es, ef
+
+    def tails(self):
+        """Longest remaining duration after each activity finishes, via its successors."""
+        tail = np.zeros(len(self.task_ids), dtype=np.int64)
+        for lvl in range(self.depth - 1, -1, -1):
+            edges = self._bwd[self._bwd_ptr[lvl]:self._bwd_ptr[lvl + 1]]
+            if edges.size:
+                nodes = self.src[edges]
+                starts = _segments(nodes)
+                succ = self.dst[edges]
+                tail[nodes[starts]] = np.maximum.reduceat(self.duration[succ] + tail[succ], starts)
+        return tail
+
+    def compute(self):
+        self.es, self.ef = self.forward()
+        self.tail = self.tails()
+        self.finish = int(self.ef.max()) if len(self) else 0
+        # Late dates hang off the project finish, so a changed finish only
+        # shifts them and never needs the tails recomputed.
+        self.lf = self.finish - self.tail
+        self.ls = self.lf - self.duration
+        self.total_float = self.ls - self.es
+        self.free_float = self._free_float(np.arange(len(self)))
+        return self
+
+    def _free_float(self, nodes):
+        # Slack before the earliest successor would be pushed; sinks measure to the project finish.
+        free = self.finish - self.ef[nodes]
+        counts = self.succ_ptr[nodes + 1] - self.succ_ptr[nodes]
+        inner = counts > 0
+        if inner.any():
+            succ = self.succ[_gather(self.succ_ptr, nodes[inner])]
+            starts = np.cumsum(counts[inner]) - counts[inner]
+            free[inner] = np.minimum.reduceat(self.es[succ], starts) - self.ef[nodes[inner]]
+        return free
+
+    def shifted_start(self, shift):
+        """Start constraints with activities held back ``shift`` days past their current early start."""
+        return np.where(shift > 0, self.es + shift, self.start)
+
+    # --- Incremental updates ---
+    def update_activity(self, task_id, start_date=None, end_date=None, duration=None):
+        """Change one activity's dates and re-evaluate only what it reaches.
+
+        A new start keeps the duration unless ``end_date`` or ``duration``
+        is given too. Returns the task ids whose early dates moved.
+        """
+        return self.update_activities({task_id: {"start_date": start_date, "end_date": end_date, "duration": duration}})
+
+    def update_activities(self, changes):
+        """Apply ``{task_id: {"start_date", "end_date", "duration"}}`` incrementally.
+
+        The forward pass walks the downstream cone of the changed activities
+        in cached topological (level) order and stops wherever an activity's
+        early dates come out unchanged. Tails are only revisited upstream of
+        activities whose duration changed. Late dates and floats are then
+        refreshed for the touched activities alone, unless the project finish
+        moved, which shifts every late date.
+        """
+        seeds, resized = [], []
+        for task_id, change in changes.items():
+            i = self.index[task_id]
+            if change.get("start_date") is not None:
+                self.start[i] = to_days(change["start_date"])
+            if change.get("duration") is not None:
+                duration = int(change["duration"])
+            elif change.get("end_date") is not None:
+                duration = int(to_days(change["end_date"])) - int(self.start[i])
+            else:
+                duration = int(self.duration[i])
+            if max(duration, 0) != self.duration[i]:
+                self.duration[i] = max(duration, 0)
+                resized.append(i)
+            seeds.append(i)
+
+        moved, old_finishes = self._forward_from(seeds)
+        retailed = self._tails_from(resized)
+
+        finish = self.finish
+        if moved:
+            top = int(self.ef[moved].max())
+            if top > finish or (top < finish and finish in old_finishes):
+                finish = int(self.ef.max())
+        if finish != self.finish:
+            self.finish = finish
+            touched = np.arange(len(self))
+        else:
+            touched = np.unique(np.asarray(moved + retailed + resized, dtype=np.int64))
+        self.lf[touched] = self.finish - self.tail[touched]
+        self.ls[touched] = self.lf[touched] - self.duration[touched]
+        self.total_float[touched] = self.ls[touched] - self.es[touched]
+
+        # Free float also depends on the successors' early starts.
+        if moved and touched.size < len(self):
+            moved_idx = np.asarray(moved, dtype=np.int64)
+            touched = np.unique(np.concatenate((touched, self.pred[_gather(self.pred_ptr, moved_idx)])))
+        self.free_float[touched] = self._free_float(touched)
+        return [self.task_ids[i] for i in moved]
+
+    def _forward_from(self, seeds):
+        heap = [(int(self.level[i]), int(i)) for i in set(seeds)]
+        heapq.heapify(heap)
+        queued = {i for _, i in heap}
+        moved, old_finishes = [], set()
+        while heap:
+            _, i = heapq.heappop(heap)
+            preds = self.pred[self.pred_ptr[i]:self.pred_ptr[i + 1]]
+            es = int(self.start[i])
+            if preds.size:
+                es = max(es, int(self.ef[preds].max()))
+            ef = es + int(self.duration[i])
+            if es == self.es[i] and ef == self.ef[i]:
+                continue
+            old_finishes.add(int(self.ef[i]))
+            self.es[i], self.ef[i] = es, ef
+            moved.append(i)
+            for succ in self.succ[self.succ_ptr[i]:self.succ_ptr[i + 1]]:
+                if succ not in queued:
+                    queued.add(succ)
+                    heapq.heappush(heap, (int(self.level[succ]), int(succ)))
+        return moved, old_finishes
+
+    def _tails_from(self, resized):
+        heap = []
+        for i in resized:
+            heap.extend((-int(self.level[p]), int(p)) for p in self.pred[self.pred_ptr[i]:self.pred_ptr[i + 1]])
+        heapq.heapify(heap)
+        queued = {p for _, p in heap}
+        changed = []
+        while heap:
+            _, p = heapq.heappop(heap)
+            succ = self.succ[self.succ_ptr[p]:self.succ_ptr[p + 1]]
+            tail = int((self.duration[succ] + self.tail[succ]).max())
+            if tail == self.tail[p]:
+                continue
+            self.tail[p] = tail
+            changed.append(p)
+            for pred in self.pred[self.pred_ptr[p]:self.pred_ptr[p + 1]]:
+                if pred not in queued:
+                    queued.add(pred)
+                    heapq.heappush(heap, (-int(self.level[pred]), int(pred)))
+        return changed
+
+    # --- Reporting ---
+    def critical(self):
+        """Indices of zero-float activities, in early-start order."""
+        idx = np.flatnonzero(self.total_float <= 0)
+        return idx[np.argsort(self.es[idx], kind="stable")]
+
+    def activity(self, task_id):
+        i = self.index[task_id]
+        return {
+            "task_id": task_id,
+            "early_start": to_date(self.es[i]),
+            "early_finish": to_date(self.ef[i]),
+            "late_start": to_date(self.ls[i]),
+            "late_finish": to_date(self.lf[i]),
+            "total_float": int(self.total_float[i]),
+            "free_float": int(self.free_float[i]),
+        }
+
+    def summary(self, limit=10):
+        critical = self.critical()
+        lines = [
+            f"Project finish (CPM): {to_date(self.finish)}",
+            f"Activities: {len(self)}, critical (zero float): {len(critical)}",
+        ]
+        if critical.size:
+            lines.append("Critical path: " + ", ".join(self.task_ids[i] for i in critical[:limit])
+                         + (" ..." if critical.size > limit else ""))
+        slack = np.flatnonzero(self.total_float > 0)
+        slack = slack[np.argsort(-self.total_float[slack], kind="stable")][:limit]
+        for i in slack:
+            lines.append(
+                f"- {self.task_ids[i]}: total float {int(self.total_float[i])} days, "
+                f"free float {int(self.free_float[i])} days (late finish {to_date(self.lf[i])})"
+            )
+        return "\n".join(lines)
@@ -0,0 +1,165 @@
+import json
+import math
+import os
+import re
+import threading
+from collections import Counter
+
+from atlas.scanner import iter_sections
+
+PROJECT_SECTIONS = ("activities", "emails", "rfis", "site_logs", "inspection_reports")
+SNIPPET_CHARS = 160
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a about an and any anything are at be by can do does for from has have how in is it of on or "
+    "show tell that the there this to was what when where which with".split()
+)
+
+
+def _tokens(text):
+    return [word for word in _TOKEN.findall(str(text).lower()) if word not in _STOPWORDS]
+
+
+# --- Documents ---
+def _records(value, label):
+    """``(title, text)`` per JSON object, joining its scalar fields."""
+    if isinstance(value, list):
+        for i, item in enumerate(value):
+            yield from _records(item, f"{label} {i + 1}")
+    elif isinstance(value, dict):
+        scalars = [str(v) for v in value.values() if v is not None and not isinstance(v, (dict, list))]
+        if scalars:
+            yield label, " - ".join(scalars)
+        for key, v in value.items():
+            if isinstance(v, (dict, list)):
+                yield from _records(v, f"{label} › {key}")
+    elif value is not None:
+        yield label, str(value)
+
+
+def result_documents(path):
+    """One document per line of a text result, one per record of a JSON result."""
+    name = os.path.basename(path)
+    with open(path, "r", encoding="utf-8") as f:
+        if not path.endswith(".json"):
+            for number, line in enumerate(f, 1):
+                if line.strip():
+                    yield f"{name} line {number}", line.strip()
+            return
+        try:
+            data = json.load(f)
+        except ValueError:
+            return
+    yield from _records(data, name)
+
+
+def project_documents(path):
+    """One document per activity, email, RFI, site log and inspection report, streamed."""
+    for section, index, record in iter_sections(path, PROJECT_SECTIONS):
+        for title, text in _records(record, f"{section} {index + 1}"):
+            yield title, text
+
+
+# --- Search index ---
+class SearchIndex:
+    """BM25-ranked inverted index over result files and project records.
+
+    Documents are grouped by source file. ``sync`` re-stats every source and
+    re-indexes only files whose (mtime, size) changed, removing the postings
+    of their previous documents first, so an unchanged tree costs one
+    ``stat`` per file and a rewritten result file costs its own size.
+    """
+
+    k1 = 1.5
+    b = 0.75
+
+    def __init__(self):
+        self.postings = {}  # term -> {doc_id: term frequency}
+        self.docs = {}  # doc_id -> (source, title, text, length)
+        self.sources = {}  # path -> (version, [doc_id])
+        self.total_length = 0
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def _remove(self, path):
+        _, doc_ids = self.sources.pop(path, (None, ()))
+        for doc_id in doc_ids:
+            _, _, text, length = self.docs.pop(doc_id)
+            self.total_length -= length
+            for term in set(_tokens(text)):
+                postings = self.postings[term]
+                del postings[doc_id]
+                if not postings:
+                    del self.postings[term]
+
+    def _add(self, path, version, documents):
+        # Tokenize everything first: if reading the file fails partway, the
+        # index is left exactly as it was.
+        parsed = [(title, text, Counter(_tokens(text))) for title, text in documents]
+        self._remove(path)
+        doc_ids = []
+        for title, text, terms in parsed:
+            doc_id = self._next_id
+            self._next_id += 1
+            length = sum(terms.values())
+            self.docs[doc_id] = (path, title, text, length)
+            self.total_length += length
+            for term, count in terms.items():
+                self.postings.setdefault(term, {})[doc_id] = count
+            doc_ids.append(doc_id)
+        self.sources[path] = (version, doc_ids)
+
+    def sync(self, sources):
+        """Bring the index up to date with ``{path: documents(path)}``; returns re-indexed paths."""
+        changed = []
+        with self._lock:
+            for path in set(self.sources) - set(sources):
+                self._remove(path)
+            for path, documents in sources.items():
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    self._remove(path)
+                    continue
+                version = (stat.st_mtime_ns, stat.st_size)
+                if path in self.sources and self.sources[path][0] == version:
+                    continue
+                self._add(path, version, documents(path))
+                changed.append(path)
+        return changed
+
+    def search(self, query, limit=10):
+        """Top ``limit`` documents for ``query`` as dicts with score, source, title and snippet."""
+        terms = set(_tokens(query))
+        with self._lock:
+            n = len(self.docs)
+            if not n or not terms:
+                return []
+            average = self.total_length / n
+            scores = Counter()
+            for term in terms:
+                postings = self.postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, tf in postings.items():
+                    norm = self.k1 * (1 - self.b + self.b * self.docs[doc_id][3] / average)
+                    scores[doc_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+            return [
+                {
+                    "score": round(score, 3),
+                    "source": self.docs[doc_id][0],
+                    "title": self.docs[doc_id][1],
+                    "snippet": _snippet(self.docs[doc_id][2], terms),
+                }
+                for doc_id, score in scores.most_common(limit)
+            ]
+
+
+def _snippet(text, terms):
+    match = re.search(r"\b(" + "|".join(map(re.escape, terms)) + r")\b", text, re.IGNORECASE)
+    if len(text) <= SNIPPET_CHARS or match is None:
+        return text[:SNIPPET_CHARS]
+    start = max(0, match.start() - SNIPPET_CHARS // 2)
+    return ("…" if start else "") + text[start:start + SNIPPET_CHARS] + ("…" if start + SNIPPET_CHARS < len(text) else "")
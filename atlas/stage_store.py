@@ -0,0 +1,106 @@
+import hashlib
+import json
+import os
+import pickle
+import re
+import threading
+import time
+
+DEFAULT_STORE_DIR = os.path.join(".atlas_cache", "stages")
+_MISSING = object()
+
+
+def fingerprint(value):
+    """Content hash of a stage input or result (JSON-like values, NamedTuples, strings)."""
+    return hashlib.sha256(json.dumps(value, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+# --- Stage store ---
+class StageStore:
+    """Completed stage results on disk, one pickle per (stage, input hash).
+
+    A stage whose inputs hash the same as a previous run's is loaded instead
+    of recomputed, across processes and restarts. Like the response cache,
+    the store is bounded by a TTL and a size-based LRU (a file's mtime is its
+    last use). Defaults come from ``ATLAS_STAGE_STORE`` (directory,
+    ``.atlas_cache/stages``), ``ATLAS_STAGE_STORE_MAX_MB`` (256) and
+    ``ATLAS_STAGE_STORE_TTL`` (seconds, 7 days).
+    """
+
+    def __init__(self, directory=None, max_bytes=None, ttl=None):
+        self.directory = directory or os.getenv("ATLAS_STAGE_STORE", DEFAULT_STORE_DIR)
+        self.max_bytes = max_bytes or int(float(os.getenv("ATLAS_STAGE_STORE_MAX_MB", "256")) * 1024 * 1024)
+        self.ttl = ttl or float(os.getenv("ATLAS_STAGE_STORE_TTL", str(7 * 24 * 3600)))
+        self._lock = threading.Lock()
+
+    def _path(self, stage, key):
+        return os.path.join(self.directory, re.sub(r"[^\w.-]", "_", stage), f"{key}.pkl")
+
+    def get(self, stage, key, default=None):
+        path = self._path(stage, key)
+        try:
+            if time.time() - os.stat(path).st_mtime > self.ttl:
+                os.remove(path)
+                return default
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+            os.utime(path)
+            return value
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            return default
+
+    def put(self, stage, key, value):
+        path = self._path(stage, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+        self._evict()
+
+    def _evict(self):
+        now = time.time()
+        entries, total = [], 0
+        with self._lock:
+            for root, _, files in os.walk(self.directory):
+                for filename in files:
+                    if not filename.endswith(".pkl"):
+                        continue
+                    path = os.path.join(root, filename)
+                    try:
+                        stat = os.stat(path)
+                        if now - stat.st_mtime > self.ttl:
+                            os.remove(path)
+                            continue
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, path))
+                    total += stat.st_size
+            # Drop least recently used results until back under the limit.
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+
+    def get_or_compute(self, stage, key, compute):
+        value = self.get(stage, key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.put(stage, key, value)
+        return value
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def default_store():
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = StageStore()
+        return _default_store
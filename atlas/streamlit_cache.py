@@ -0,0 +1,75 @@
+import os
+
+import streamlit as st
+from crewai import Agent
+
+from atlas.knowledge import SOP_DIR, load_sops
+from atlas.llm_cache import cached_kickoff
+from atlas.stage_store import default_store
+
+# --- Streamlit caching for the agent pages ---
+# SOP sources are resources shared across reruns and sessions. Agents are
+# not: crewai mutates an agent while it runs, so every caller gets its own.
+# Stage outputs are data keyed by the hash of the stage's inputs (e.g.
+# ``pipeline.fingerprint("routes")``): after the first run, widget
+# interactions only re-render, and the on-disk stage store carries completed
+# stages over to repeat uploads and restarts. Crew outputs stay in memory;
+# across restarts they come from the LLM response cache, which has its own
+# TTL and size limit.
+
+
+def _sop_fingerprint():
+    return tuple(
+        (entry.name, entry.stat().st_size, entry.stat().st_mtime_ns)
+        for entry in sorted(os.scandir(SOP_DIR), key=lambda entry: entry.name)
+    )
+
+
+@st.cache_resource(show_spinner=False)
+def _sops(fingerprint):
+    return load_sops()
+
+
+def cached_sops():
+    """``load_sops()``, rebuilt only when a file under knowledge/sops changes."""
+    return _sops(_sop_fingerprint())
+
+
+def cached_agent(role, goal, backstory, sop=None):
+    """A new tool-less agent on the cached SOP sources; agents are never shared."""
+    knowledge = {"knowledge_sources": [cached_sops()[sop]]} if sop else {}
+    return Agent(role=role, goal=goal, backstory=backstory, verbose=True, **knowledge)
+
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def _stage(stage, input_key, _run):
+    return default_store().get_or_compute(stage, input_key, _run)
+
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def _memo(stage, input_key, _run):
+    return _run()
+
+
+def stage_output(stage, input_key, run, persist=True):
+    """``run()`` computed once per (stage, input hash); the result must be picklable.
+
+    ``persist=False`` keeps the result in memory only, for crew outputs that
+    the LLM response cache already persists.
+    """
+    return (_stage if persist else _memo)(stage, input_key, run)
+
+
+def crew_output(stage, input_key, crew):
+    """Kick off ``crew`` once per (stage, input hash), restoring task outputs on reruns."""
+    def run():
+        result = cached_kickoff(crew)
+        return {
+            "result": str(result),
+            "tasks": [str(task.output) if task.output is not None else None for task in crew.tasks],
+        }
+
+    stored = stage_output(stage, input_key, run, persist=False)
+    for task, output in zip(crew.tasks, stored["tasks"]):
+        task.output = output
+    return stored["result"]
@@ -0,0 +1,124 @@
+import datetime
+import math
+from collections import Counter
+
+import streamlit as st
+
+from atlas.jobs import FINISHED
+
+SORT_FIELDS = {"Date": "date", "Tag": "issue_type", "Agent": "agent", "Record": "record_id"}
+TAG_ICONS = {"type_delay": "🚚", "type_safety": "⚠️", "type_inspection": "🧪"}
+
+
+# --- Summary counts ---
+def issue_counts(routes):
+    """Issues per tag and per agent, counted once from the structured routes."""
+    return {
+        "total": len(routes),
+        "by_tag": Counter(route["issue_type"] for route in routes),
+        "by_agent": Counter(route["agent"] for route in routes),
+    }
+
+
+def render_counts(counts):
+    columns = st.columns(len(counts["by_tag"]) + 1)
+    columns[0].metric("Issues", counts["total"])
+    for column, (tag, count) in zip(columns[1:], sorted(counts["by_tag"].items())):
+        column.metric(f"{TAG_ICONS.get(tag, '📌')} {tag.replace('_', ' ').title()}", count)
+
+
+# --- Paging ---
+def _page(total, page_size, key):
+    pages = max(1, math.ceil(total / page_size))
+    page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1, step=1, key=f"{key}_page")
+    start = (int(page) - 1) * page_size
+    return start, min(start + page_size, total)
+
+
+def _date(value):
+    try:
+        return datetime.date.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+
+# --- Issue table ---
+def issue_table(routes, key="issues", page_size=50):
+    """Filterable, sortable issue table that sends only the visible page to the browser.
+
+    Filtering (tag, agent, date range) and sorting happen here on the server;
+    the browser receives at most ``page_size`` rows.
+    """
+    counts = issue_counts(routes)
+    columns = st.columns(4)
+    tags = columns[0].multiselect("Tag", sorted(counts["by_tag"]), key=f"{key}_tags")
+    agents = columns[1].multiselect("Agent", sorted(counts["by_agent"]), key=f"{key}_agents")
+    dates = sorted(d for d in (_date(route.get("date")) for route in routes) if d)
+    window = columns[2].date_input("Date range", value=(dates[0], dates[-1]), key=f"{key}_dates") if dates else ()
+    sort_label = columns[3].selectbox("Sort by", list(SORT_FIELDS), key=f"{key}_sort")
+    descending = st.checkbox("Descending", key=f"{key}_desc")
+
+    low, high = (window[0], window[-1]) if len(window) else (None, None)
+    rows = [
+        route for route in routes
+        if (not tags or route["issue_type"] in tags)
+        and (not agents or route["agent"] in agents)
+        and (low is None or (_date(route.get("date")) is not None and low <= _date(route["date"]) <= high))
+    ]
+    field = SORT_FIELDS[sort_label]
+    rows.sort(key=lambda route: route.get(field) or "", reverse=descending)
+
+    start, end = _page(len(rows), page_size, key)
+    st.dataframe(
+        [
+            {
+                "Tag": route["issue_type"],
+                "Agent": route["agent"],
+                "Date": route.get("date") or "",
+                "Record": route.get("record_id") or "",
+                "Details": route["details"],
+            }
+            for route in rows[start:end]
+        ],
+        hide_index=True,
+        use_container_width=True,
+    )
+    st.caption(f"Showing {start + 1 if rows else 0}-{end} of {len(rows)} matching issues ({len(routes)} total)")
+
+
+# --- Paged outputs ---
+def paged_outputs(items, key, page_size=10, expanded=True, language=None):
+    """Render ``(title, text)`` pairs a page at a time instead of one block per item."""
+    items = list(items)
+    start, end = _page(len(items), page_size, key)
+    for title, text in items[start:end]:
+        with st.expander(title, expanded=expanded):
+            st.code(text or "No output generated", language=language)
+    st.caption(f"Showing {start + 1 if items else 0}-{end} of {len(items)}")
+
+
+# --- Background jobs ---
+def job_progress(manager, job_id, interval=2):
+    """Stream a background job's stages as they finish; returns the job record.
+
+    While the job is queued or running only this fragment re-polls, every
+    ``interval`` seconds; once it finishes the whole page reruns so the
+    caller can render the final result.
+    """
+    job = manager.status(job_id)
+    if job is None or job["state"] in FINISHED:
+        return job
+
+    @st.fragment(run_every=interval)
+    def poll():
+        current = manager.status(job_id)
+        if current["state"] in FINISHED:
+            st.rerun()
+        st.info(f"⏳ Job `{job_id}` is {current['state']}: {len(current['stages'])} stage(s) finished")
+        paged_outputs(
+            ((f"✅ {stage['name']}", stage["output"]) for stage in current["stages"]),
+            key=f"job_{job_id}", expanded=False, language="markdown",
+        )
+
+    poll()
+    return job
@@ -0,0 +1,89 @@
+import copy
+import hashlib
+import json
+import os
+
+from atlas.scanner import SCAN_RULES
+
+
+# Sections without an id field fall back to the record's position plus a hash
+# of its content (only computed for records on the watermark date), so an
+# identical record appended later is still new.
+def _record_key(section, index, record):
+    id_field = SCAN_RULES[section].id_field
+    if id_field and record.get(id_field) is not None:
+        return str(record[id_field])
+    digest = hashlib.sha1(json.dumps(record, sort_keys=True).encode("utf-8")).hexdigest()
+    return f"{index}:{digest}"
+
+
+def _fingerprint(source):
+    if not isinstance(source, (str, os.PathLike)):
+        return None
+    stat = os.stat(source)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+# --- Watermark ---
+class Watermark:
+    """Per-section high-water mark of scanned records, persisted as JSON.
+
+    A section's mark is the latest record date seen plus the keys of the
+    records on that date, so late additions on the same day still count as
+    new. The keys are a set in memory and a sorted list on disk. Newness is
+    always judged against the state loaded from disk; advances are held
+    back until ``save`` so repeated scans within one run return the same
+    issues.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.state = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.state = json.load(f)
+            for key, mark in self.state.items():
+                if key != "_source":
+                    mark["seen"] = set(mark["seen"])
+        self.pending = copy.deepcopy(self.state)
+
+    def source_unchanged(self, source):
+        fingerprint = _fingerprint(source)
+        return fingerprint is not None and fingerprint == self.state.get("_source")
+
+    def is_new(self, section, index, record):
+        mark = self.state.get(section)
+        if not mark:
+            return True
+        date = record.get(SCAN_RULES[section].date_field) or ""
+        if date != mark["date"]:
+            return date > mark["date"]
+        return _record_key(section, index, record) not in mark["seen"]
+
+    def _advance(self, section, index, record):
+        date = record.get(SCAN_RULES[section].date_field) or ""
+        mark = self.pending.setdefault(section, {"date": "", "seen": set()})
+        if date > mark["date"]:
+            mark["date"] = date
+            mark["seen"] = {_record_key(section, index, record)}
+        elif date == mark["date"]:
+            mark["seen"].add(_record_key(section, index, record))
+
+    def filter(self, records, source=None):
+        """Pass through only records added since the saved watermark."""
+        if source is not None:
+            if self.source_unchanged(source):
+                return
+            self.pending["_source"] = _fingerprint(source)
+        for section, index, record in records:
+            self._advance(section, index, record)
+            if self.is_new(section, index, record):
+                yield section, index, record
+
+    def save(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            # Key sets are written as sorted lists
+            json.dump(self.pending, f, indent=2, default=sorted)
+        os.replace(tmp_path, self.path)
+        self.state = copy.deepcopy(self.pending)
@@ -1,56 +1,54 @@
 from crewai import Agent, Task, Flow, Process
 from crewai.tools import BaseTool
-from crewai.knowledge.source.crew_docling_source import CrewDoclingSource
-import json, os
+import collections, json, os, sys, time
 from dotenv import load_dotenv
 from pydantic import Field
 from colorama import Fore, Style, init
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from atlas.dispatcher import batch_routes
+from atlas.executor import run_concurrently
+from atlas.knowledge import load_sops
+from atlas.pipeline import project_pipeline
+from atlas.run_history import RunHistory
+from atlas.watermark import Watermark
+
 load_dotenv()
 
 # -----------------------------------------
 # Load Project Data
 # -----------------------------------------
-with open("project_atlas.json", "r") as f:
-    project_data = json.load(f)
+PROJECT_FILE = "project_atlas.json"
+started = time.time()
+
+# Incremental mode: only scan records added since the last saved watermark
+WATERMARK_PATH = os.getenv("ATLAS_SCAN_WATERMARK")
+watermark = Watermark(WATERMARK_PATH) if WATERMARK_PATH else None
+
+# Scan and dispatch run once; every consumer reads the memoized result
+pipeline = project_pipeline(PROJECT_FILE, watermark=watermark)
 
 # -----------------------------------------
 # SOP Knowledge Sources
 # -----------------------------------------
-scanner_sop = CrewDoclingSource(file_paths=["sops/scanner_sop.md"])
-dispatcher_sop = CrewDoclingSource(file_paths=["sops/dispatcher_sop.md"])
-scheduler_sop = CrewDoclingSource(file_paths=["sops/scheduler_sop.md"])
-safety_sop = CrewDoclingSource(file_paths=["sops/safety_sop.md"])
-qaqc_sop = CrewDoclingSource(file_paths=["sops/qaqc_sop.md"])
-planner_sop = CrewDoclingSource(file_paths=["sops/planner_sop.md"])
-evaluator_sop = CrewDoclingSource(file_paths=["sops/evaluation_sop.md"])
+sops = load_sops()
+scanner_sop = sops["scanner"]
+dispatcher_sop = sops["dispatcher"]
+scheduler_sop = sops["scheduler"]
+safety_sop = sops["safety"]
+qaqc_sop = sops["qaqc"]
+planner_sop = sops["planner"]
+evaluator_sop = sops["evaluation"]
 
 # -----------------------------------------
 # SCANNER AGENT
 # -----------------------------------------
-class ScannerLogic:
-    def __init__(self, data):
-        self.data = data
-        self.issues = []
-
-    def scan(self):
-        for email in self.data.get("emails", []):
-            if "delay" in email["body"].lower():
-                self.issues.append(f"[type_delay] {email['date']} - {email['subject']}: {email['body']}")
-        for log in self.data.get("site_logs", []):
-            if "violation" in log["description"].lower():
-                self.issues.append(f"[type_safety] {log['log_date']} - {log['description']}")
-        for report in self.data.get("inspection_reports", []):
-            if "fail" in report["status"].lower():
-                self.issues.append(f"[type_inspection] {report['date']} - {report['area']}: {report['comments']}")
-        return self.issues
-
 class ScannerTool(BaseTool):
     name: str = Field(default="ScanProjectData")
     description: str = Field(default="Scans project data for delays, safety violations, and inspection issues.")
 
     def _run(self, **kwargs):
-        return "\n".join(ScannerLogic(project_data).scan())
+        return "\n".join(map(str, pipeline.result("scan")))
 
 scanner_agent = Agent(
     role="Scanner",
@@ -71,36 +69,12 @@ scanner_task = Task(
 # -----------------------------------------
 # DISPATCHER AGENT
 # -----------------------------------------
-class DispatcherLogic:
-    def __init__(self, issues_str):
-        self.issues = [line.strip() for line in issues_str.split("\n") if line.strip()]
-        self.routes = []
-        self.agent_map = {
-            "type_delay": "SchedulerAgent",
-            "type_safety": "SafetyAgent",
-            "type_inspection": "QAQCAgent"
-        }
-
-    def route(self):
-        for issue in self.issues:
-            if issue.startswith("[") and "]" in issue:
-                tag = issue.split("]")[0][1:].strip()
-                details = issue.split("]", 1)[1].strip()
-                assigned_agent = self.agent_map.get(tag, "UnknownAgent")
-                self.routes.append({
-                    "issue_type": tag,
-                    "agent": assigned_agent,
-                    "details": details
-                })
-        return self.routes
-
 class DispatcherTool(BaseTool):
     name: str = Field(default="DispatchIssues")
     description: str = Field(default="Routes tagged issues to respective agents based on type.")
 
     def _run(self, **kwargs):
-        output = ScannerLogic(project_data).scan()
-        return json.dumps({"routing": DispatcherLogic("\n".join(output)).route()}, indent=2)
+        return json.dumps({"routing": pipeline.result("routes")}, indent=2)
 
 dispatcher_agent = Agent(
     role="Dispatcher",
@@ -121,50 +95,51 @@ dispatcher_task = Task(
 # -----------------------------------------
 # ISSUE AGENTS
 # -----------------------------------------
-def make_tool(issue_type, detail):
-    class CustomTool(BaseTool):
-        name: str = Field(default=f"Handle{issue_type}")
-        description: str = Field(default=f"Handles {issue_type} issues")
-
-        def _run(self, **kwargs):
-            if issue_type == "type_delay":
-                return f"Mitigation plan for delay: HVAC shipment delayed. Steps include contacting vendor, adjusting schedule, exploring alternatives, etc."
-            elif issue_type == "type_safety":
-                return f"Mitigation plan for safety issue: {detail}\nConduct safety briefings, assign officers, implement PPE audits, etc."
-            elif issue_type == "type_inspection":
-                return f"Mitigation plan for inspection issue: {detail}\nRework area, ensure bonding, schedule reinspection."
-            return f"Unhandled issue type: {issue_type}"
-
-    return CustomTool()
-
-issue_agents = []
+def mitigation_for(route):
+    issue_type, detail = route["issue_type"], route["details"]
+    if issue_type == "type_delay":
+        return f"Mitigation plan for delay: {detail}\nSteps include contacting vendor, adjusting schedule, exploring alternatives, etc."
+    elif issue_type == "type_safety":
+        return f"Mitigation plan for safety issue: {detail}\nConduct safety briefings, assign officers, implement PPE audits, etc."
+    elif issue_type == "type_inspection":
+        return f"Mitigation plan for inspection issue: {detail}\nRework area, ensure bonding, schedule reinspection."
+    return f"Unhandled issue type: {issue_type}"
+
+class BatchMitigationTool(BaseTool):
+    name: str = Field(default="HandleIssueBatch")
+    description: str = Field(default="Handles every issue in a routed batch")
+    routes: list = Field(default_factory=list)
+
+    def _run(self, **kwargs):
+        return "\n\n".join(mitigation_for(route) for route in self.routes)
+
+# One agent per role, one task per batch of routed issues
+issue_agents = {}
 issue_tasks = []
+issue_batches = []
 final_outputs = {}
 
-for route in DispatcherLogic("\n".join(ScannerLogic(project_data).scan())).route():
-    issue_type = route["issue_type"]
-    agent_name = route["agent"]
-    detail = route["details"]
-    sop = scheduler_sop if agent_name == "SchedulerAgent" else safety_sop if agent_name == "SafetyAgent" else qaqc_sop
-
-    tool_instance = make_tool(issue_type, detail)
-    issue_agent = Agent(
-        role=agent_name,
-        goal=f"Resolve {issue_type} issues effectively.",
-        backstory=f"You handle all {issue_type} situations in the project.",
-        tools=[tool_instance],
-        knowledge_sources=[sop],
-        verbose=True
-    )
+for agent_name, batch in batch_routes(pipeline.result("routes")):
+    if agent_name not in issue_agents:
+        sop = scheduler_sop if agent_name == "SchedulerAgent" else safety_sop if agent_name == "SafetyAgent" else qaqc_sop
+        issue_agents[agent_name] = Agent(
+            role=agent_name,
+            goal=f"Resolve issues routed to {agent_name} effectively.",
+            backstory=f"You handle every issue the dispatcher routes to {agent_name}.",
+            knowledge_sources=[sop],
+            verbose=True
+        )
+    issue_list = "\n".join(f"- {route['details']}" for route in batch)
     issue_task = Task(
-        description=f"Resolve the following issue: {detail}",
-        expected_output=f"Mitigation plan for: {detail}",
-        agent=issue_agent,
+        description=f"Resolve each of the following issues:\n{issue_list}",
+        expected_output="One mitigation plan per issue.",
+        agent=issue_agents[agent_name],
+        tools=[BatchMitigationTool(routes=batch)],
         tool_choice="required"
     )
 
-    issue_agents.append(issue_agent)
     issue_tasks.append(issue_task)
+    issue_batches.append(batch)
 
 # -----------------------------------------
 # PLANNER AGENT
@@ -174,7 +149,11 @@ class PlannerTool(BaseTool):
     description: str = Field(default="Aggregates mitigation plans from all agents into a unified plan.")
 
     def _run(self, **kwargs):
-        actions = [task.output for task in issue_tasks if task.output]
+        actions = [
+            {"agent": task.agent.role, "issue_types": sorted({route["issue_type"] for route in batch}),
+             "record_ids": [route["record_id"] for route in batch], "action": task.output}
+            for task, batch in zip(issue_tasks, issue_batches) if task.output
+        ]
         return json.dumps({"summary": "Unified Project Mitigation Plan", "actions": actions}, indent=2)
 
 planner_agent = Agent(
@@ -238,10 +217,10 @@ print(Fore.YELLOW + "\n🚦 [Dispatcher Agent] Routing issues to responsible age
 dispatcher_task.output = dispatcher_agent.tools[0]._run()
 print(Fore.GREEN + "✅ Dispatcher Output:\n" + dispatcher_task.output)
 
-# Issue Agents
-for task in issue_tasks:
-    print(Fore.BLUE + f"\n🛠️ [{task.agent.role}] Resolving issue...")
-    task.output = task.agent.tools[0]._run()
+# Issue Agents: independent batches run in parallel; the planner waits on the join
+print(Fore.BLUE + f"\n🛠️ [Issue Agents] Resolving {len(issue_tasks)} issue batch(es) concurrently...")
+for task, output in zip(issue_tasks, run_concurrently(task.tools[0]._run for task in issue_tasks)):
+    task.output = output
     print(Fore.GREEN + f"✅ {task.agent.role} Output:\n{task.output}")
 
 # Planner
@@ -258,14 +237,23 @@ print(Fore.GREEN + "✅ Evaluation Output:\n" + evaluation_task.output)
 flow_output = {
     "Scanner": scanner_task.output,
     "Dispatcher": json.loads(dispatcher_task.output),
-    **{task.agent.role: task.output for task in issue_tasks},
+    **{role: "\n\n".join(task.output for task in issue_tasks if task.agent.role == role) for role in issue_agents},
     "Planner": json.loads(planner_task.output),
     "Evaluator": json.loads(evaluation_task.output)
 }
 
-with open("flow_output.json", "w", encoding="utf-8") as f:
-    json.dump(flow_output, f, indent=2)
+# Every run is appended to the history; earlier runs are never overwritten
+run_id = RunHistory().append(
+    os.path.basename(PROJECT_FILE),
+    flow_output,
+    input_hash=pipeline.input_key("scan"),
+    tags=collections.Counter(route["issue_type"] for route in pipeline.result("routes")),
+    started=started,
+)
+
+if watermark:
+    watermark.save()
 
-print(Fore.LIGHTGREEN_EX + "\n✅ Flow completed and saved to flow_output.json")
+print(Fore.LIGHTGREEN_EX + f"\n✅ Flow completed and recorded as run {run_id} in run history")
 
 
@@ -1,47 +1,36 @@
 # run_all_agents.py
 from crewai import Agent, Task, Crew
 from crewai.tools import BaseTool
-import json, os
+import json, os, sys
 from dotenv import load_dotenv
 from pydantic import Field
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from atlas.scanner import ScannerLogic
+from atlas.dispatcher import DispatcherLogic as TagDispatcherLogic
+from atlas.llm_cache import cached_kickoff
+
 load_dotenv()
 
 # -----------------------------------------
 # SCANNER AGENT
 # -----------------------------------------
-with open("project_atlas.json", "r") as f:
-    project_data = json.load(f)
-
-class ScannerLogic:
-    def __init__(self, data):
-        self.data = data
-        self.issues = []
-
-    def scan(self):
-        for email in self.data.get("emails", []):
-            if "delay" in email["body"].lower():
-                self.issues.append(f"[type_delay] {email['date']} - {email['subject']}: {email['body']} | agent: SchedulerAgent")
-        for log in self.data.get("site_logs", []):
-            if "violation" in log["description"].lower():
-                self.issues.append(f"[type_safety] {log['log_date']} - {log['description']} | agent: SafetyAgent")
-        for report in self.data.get("inspection_reports", []):
-            if "fail" in report["status"].lower():
-                self.issues.append(f"[type_inspection] {report['date']} - {report['area']}: {report['comments']} | agent: QAQCAgent")
-        return self.issues
+PROJECT_FILE = "project_atlas.json"
 
 class ScannerTool(BaseTool):
     name: str = Field(default="ScanProjectData")
     description: str = Field(default="Scans project data for delays, safety violations, and inspection issues.")
+    routes: list = Field(default_factory=list)
 
     def _run(self, **kwargs):
-        return "\n".join(ScannerLogic(project_data).scan())
+        # Pre-assign the owning agent so the dispatcher below can route on labels
+        return "\n".join(f"[{r['issue_type']}] {r['details']} | agent: {r['agent']}" for r in self.routes)
 
 scanner_agent = Agent(
     role="Scanner",
     goal="Detect project issues from logs, emails, and inspections.",
     backstory="You identify problems early from project data.",
-    tools=[ScannerTool()],
+    tools=[ScannerTool(routes=list(TagDispatcherLogic(ScannerLogic.stream(PROJECT_FILE)).iter_routes()))],
     verbose=True
 )
 
@@ -53,7 +42,7 @@ scanner_task = Task(
 )
 
 crew = Crew(agents=[scanner_agent], tasks=[scanner_task], verbose=True)
-scanner_output = crew.kickoff()
+scanner_output = cached_kickoff(crew)
 
 with open("scanner_results.txt", "w") as f:
     f.write(str(scanner_output))
@@ -82,15 +71,16 @@ class DispatcherLogic:
 class DispatcherTool(BaseTool):
     name: str = Field(default="DispatchIssues")
     description: str = Field(default="Routes tagged issues to respective agents based on pre-assigned labels from scanner.")
+    scanner_output: str = ""
 
     def _run(self, **kwargs):
-        return json.dumps({"routing": DispatcherLogic(str(scanner_output)).route()}, indent=2)
+        return json.dumps({"routing": DispatcherLogic(self.scanner_output).route()}, indent=2)
 
 dispatcher_agent = Agent(
     role="Dispatcher",
     goal="Distribute issues from scanner to responsible agents.",
     backstory="You triage the output into agent responsibilities based on tags provided by scanner.",
-    tools=[DispatcherTool()],
+    tools=[DispatcherTool(scanner_output=str(scanner_output))],
     verbose=True
 )
 
@@ -102,7 +92,7 @@ dispatcher_task = Task(
 )
 
 crew = Crew(agents=[dispatcher_agent], tasks=[dispatcher_task], verbose=True)
-dispatcher_output = crew.kickoff()
+dispatcher_output = cached_kickoff(crew)
 
 with open("dispatcher_results.json", "w") as f:
     f.write(str(dispatcher_output))
@@ -159,7 +149,7 @@ for route in routes:
     )
 
     crew = Crew(agents=[issue_agent], tasks=[issue_task], verbose=True)
-    output = crew.kickoff()
+    output = cached_kickoff(crew)
     final_outputs.setdefault(agent, []).append(str(output).strip())
 
 # Save outputs in JSON
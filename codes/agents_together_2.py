@@ -1,46 +1,35 @@
 from crewai import Agent, Task, Crew
 from crewai.tools import BaseTool
-import json, os
+import json, os, sys
 from dotenv import load_dotenv
 from pydantic import Field
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from atlas.scanner import ScannerLogic
+from atlas.dispatcher import DispatcherLogic as TagDispatcherLogic
+from atlas.llm_cache import cached_kickoff
+
 load_dotenv()
 
 # -----------------------------------------
 # SCANNER AGENT
 # -----------------------------------------
-with open("project_atlas.json", "r") as f:
-    project_data = json.load(f)
-
-class ScannerLogic:
-    def __init__(self, data):
-        self.data = data
-        self.issues = []
-
-    def scan(self):
-        for email in self.data.get("emails", []):
-            if "delay" in email["body"].lower():
-                self.issues.append(f"[type_delay] {email['date']} - {email['subject']}: {email['body']} | agent: SchedulerAgent")
-        for log in self.data.get("site_logs", []):
-            if "violation" in log["description"].lower():
-                self.issues.append(f"[type_safety] {log['log_date']} - {log['description']} | agent: SafetyAgent")
-        for report in self.data.get("inspection_reports", []):
-            if "fail" in report["status"].lower():
-                self.issues.append(f"[type_inspection] {report['date']} - {report['area']}: {report['comments']} | agent: QAQCAgent")
-        return self.issues
+PROJECT_FILE = "project_atlas.json"
 
 class ScannerTool(BaseTool):
     name: str = Field(default="ScanProjectData")
     description: str = Field(default="Scans project data for delays, safety violations, and inspection issues.")
+    routes: list = Field(default_factory=list)
 
     def _run(self, **kwargs):
-        return "\n".join(ScannerLogic(project_data).scan())
+        # Pre-assign the owning agent so the dispatcher below can route on labels
+        return "\n".join(f"[{r['issue_type']}] {r['details']} | agent: {r['agent']}" for r in self.routes)
 
 scanner_agent = Agent(
     role="Scanner",
     goal="Detect project issues from logs, emails, and inspections.",
     backstory="You identify problems early from project data.",
-    tools=[ScannerTool()],
+    tools=[ScannerTool(routes=list(TagDispatcherLogic(ScannerLogic.stream(PROJECT_FILE)).iter_routes()))],
     verbose=True
 )
 
@@ -52,7 +41,7 @@ scanner_task = Task(
 )
 
 crew = Crew(agents=[scanner_agent], tasks=[scanner_task], verbose=True)
-scanner_output = crew.kickoff()
+scanner_output = cached_kickoff(crew)
 
 scanner_output_str = str(scanner_output)
 with open("scanner_results.json", "w") as f:
@@ -82,15 +71,16 @@ class DispatcherLogic:
 class DispatcherTool(BaseTool):
     name: str = Field(default="DispatchIssues")
     description: str = Field(default="Routes tagged issues to respective agents based on pre-assigned labels from scanner.")
+    scanner_output: str = ""
 
     def _run(self, **kwargs):
-        return json.dumps({"routing": DispatcherLogic(scanner_output_str).route()}, indent=2)
+        return json.dumps({"routing": DispatcherLogic(self.scanner_output).route()}, indent=2)
 
 dispatcher_agent = Agent(
     role="Dispatcher",
     goal="Distribute issues from scanner to responsible agents.",
     backstory="You triage the output into agent responsibilities based on tags provided by scanner.",
-    tools=[DispatcherTool()],
+    tools=[DispatcherTool(scanner_output=str(scanner_output))],
     verbose=True
 )
 
@@ -102,7 +92,7 @@ dispatcher_task = Task(
 )
 
 crew = Crew(agents=[dispatcher_agent], tasks=[dispatcher_task], verbose=True)
-dispatcher_output = crew.kickoff()
+dispatcher_output = cached_kickoff(crew)
 
 with open("dispatcher_results.json", "w") as f:
     f.write(str(dispatcher_output))
@@ -156,7 +146,7 @@ for route in parsed_dispatch.get("routing", []):
     )
 
     crew = Crew(agents=[issue_agent], tasks=[issue_task], verbose=True)
-    output = crew.kickoff()
+    output = cached_kickoff(crew)
 
     agent_output_filename = f"{agent_name.lower()}_output.json"
     with open(agent_output_filename, "w", encoding="utf-8") as f:
@@ -170,10 +160,11 @@ for route in parsed_dispatch.get("routing", []):
 class PlannerTool(BaseTool):
     name: str = Field(default="AggregateMitigationPlans")
     description: str = Field(default="Aggregates mitigation plans from all agents into a unified plan.")
+    outputs: dict = Field(default_factory=dict)
 
     def _run(self, **kwargs):
         plan = []
-        for agent, actions in final_outputs.items():
+        for agent, actions in self.outputs.items():
             for act in actions:
                 plan.append({"agent": agent, "action": act})
         return json.dumps({"summary": "Unified Project Mitigation Plan", "actions": plan}, indent=2)
@@ -182,7 +173,7 @@ planner_agent = Agent(
     role="Planner",
     goal="Unify project mitigation efforts into one actionable plan.",
     backstory="You aggregate actions from Scheduler, Safety, and QAQC agents to produce a final strategic project plan.",
-    tools=[PlannerTool()],
+    tools=[PlannerTool(outputs=final_outputs)],
     verbose=True
 )
 
@@ -194,7 +185,7 @@ planner_task = Task(
 )
 
 crew = Crew(agents=[planner_agent], tasks=[planner_task], verbose=True)
-planner_output = crew.kickoff()
+planner_output = cached_kickoff(crew)
 
 with open("planner_output.json", "w", encoding="utf-8") as f:
     f.write(str(planner_output))
@@ -229,7 +220,7 @@ evaluation_task = Task(
 )
 
 crew = Crew(agents=[evaluation_agent], tasks=[evaluation_task], verbose=True)
-evaluation_output = crew.kickoff()
+evaluation_output = cached_kickoff(crew)
 
 with open("evaluation_output.json", "w", encoding="utf-8") as f:
     f.write(str(evaluation_output))
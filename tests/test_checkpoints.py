@@ -0,0 +1,25 @@
+import pytest
+
+from atlas.checkpoints import run_stage, stage_key
+from atlas.result_store import ResultStore
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setenv("ATLAS_EXPORT_DIR", str(tmp_path / "exports"))
+    return ResultStore(str(tmp_path / "results.sqlite"))
+
+
+def _unused(*args):
+    raise AssertionError("a restored stage must not build or run its task")
+
+
+def test_matching_checkpoint_is_restored_without_running(store):
+    inputs = [["2025-01-02 - crane delayed by 3 days"], "project-digest"]
+    key = stage_key("scheduler", __file__, inputs)
+    rows = [{"agent": "SchedulerAgent", "action": "Resequence T004"}]
+    store.write("scheduler", "run-1", rows, input_key=key, output="Resequence T004")
+
+    assert run_stage(store, "scheduler", "run-2", __file__, inputs, _unused, _unused) == "Resequence T004"
+    assert store.read("scheduler", "run-2", agent="SchedulerAgent") == rows
+    assert stage_key("scheduler", __file__, inputs[:1]) != key
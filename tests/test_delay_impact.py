@@ -0,0 +1,46 @@
+import pytest
+
+from atlas.delay_impact import ActivityIndex, DelayImpactLogic, parse_delay_days
+
+
+@pytest.mark.parametrize("text, days", [
+    ("HVAC shipment delayed by 3 weeks.", 21),
+    ("Crane delayed by a week", 7),
+    ("Expect a two-week delay on steel", 14),
+    ("Pour slipped two business days", 3),
+    ("Framing pushed back two business weeks", 14),
+    ("HVAC shipment delayed by 3 days; vendor will confirm within a month", 3),
+    ("Paint crew is running 4 days late", 4),
+    ("Inspection moved out 5 days", 5),
+    ("Meeting in a week to review the drawings", None),
+    ("Shipment delayed, no date yet", None),
+])
+def test_parse_delay_days(text, days):
+    assert parse_delay_days(text) == days
+
+
+ACTIVITIES = [
+    {"task_id": "T001", "description": "Excavation", "start_date": "2025-01-01", "end_date": "2025-01-05",
+     "assigned_to": "Subcontractor 1", "predecessors": []},
+    {"task_id": "T002", "description": "HVAC rough-in", "start_date": "2025-01-05", "end_date": "2025-01-10",
+     "assigned_to": "Subcontractor 2", "predecessors": ["T001"]},
+    {"task_id": "T003", "description": "HVAC commissioning", "start_date": "2025-01-10", "end_date": "2025-01-12",
+     "assigned_to": "Subcontractor 2", "predecessors": ["T002"]},
+    {"task_id": "T004", "description": "Site cleanup", "start_date": "2025-01-12", "end_date": "2025-01-13",
+     "assigned_to": "Subcontractor 1", "predecessors": ["T003"]},
+]
+
+
+def test_activity_index_matches_words_and_phrases():
+    index = ActivityIndex(ACTIVITIES)
+    assert index.match("Excavation is late").tolist() == [0]
+    assert index.match("Subcontractor 2 called").tolist() == [1, 2]
+    assert index.match("see t004").tolist() == [3]
+    assert index.match("nothing relevant").tolist() == []
+
+
+def test_delay_pushes_successors():
+    impact = DelayImpactLogic.from_activities(ACTIVITIES).assess(["Excavation delayed by 3 days"])
+    assert impact["issues"][0]["activities"] == ["T001"]
+    assert [item["task_id"] for item in impact["slipped"]] == ["T001", "T002", "T003", "T004"]
+    assert impact["new_project_finish"] == "2025-01-16"
@@ -0,0 +1,74 @@
+import random
+
+from atlas.intervals import IntervalIndex
+from atlas.resources import ResourceLoading
+from atlas.schedule import to_date
+
+BASE = 20000
+
+
+def test_interval_tree_matches_brute_force():
+    rng = random.Random(5)
+    for _ in range(500):
+        n = rng.randrange(0, 60)
+        starts = [BASE + rng.randrange(100) for _ in range(n)]
+        # Some ends are on or before their start: milestones occupy no day.
+        ends = [s + rng.randrange(-2, 20) for s in starts]
+        index = IntervalIndex([to_date(s) for s in starts], [to_date(e) for e in ends])
+        for _ in range(10):
+            lo = BASE + rng.randrange(-5, 125)
+            hi = lo + rng.randrange(0, 15)
+            expected = sorted(
+                (i for i in range(n) if starts[i] <= hi and ends[i] > max(lo, starts[i])),
+                key=lambda i: (starts[i], i),
+            )
+            assert index.overlapping(to_date(lo), to_date(hi)) == expected
+            assert index.at(to_date(lo)) == [i for i in expected if starts[i] <= lo]
+
+
+def _naive_loading(resources, starts, ends, capacity):
+    report = {}
+    for name in set(resources):
+        load = {}
+        for r, s, e in zip(resources, starts, ends):
+            if r == name:
+                for day in range(s, e):
+                    load[day] = load.get(day, 0) + 1
+        over = sorted(day for day, count in load.items() if count > capacity)
+        windows = []
+        for day in over:
+            if windows and windows[-1][1] == day - 1:
+                windows[-1][1] = day
+            else:
+                windows.append([day, day])
+        report[name] = (max(load.values(), default=0), len(over), [(to_date(a), to_date(b)) for a, b in windows])
+    return report
+
+
+def test_sweep_line_matches_per_day_counts():
+    rng = random.Random(7)
+    for _ in range(500):
+        n = rng.randrange(1, 30)
+        resources = [rng.choice("ABC") for _ in range(n)]
+        starts = [BASE + rng.randrange(40) for _ in range(n)]
+        ends = [s + rng.randrange(-1, 8) for s in starts]
+        capacity = rng.randrange(1, 3)
+        loading = ResourceLoading(
+            resources, [to_date(s) for s in starts], [to_date(e) for e in ends],
+            [f"T{i}" for i in range(n)], capacity,
+        )
+        report = {
+            item["resource"]: (
+                item["peak"], item["over_allocated_days"],
+                [(w["start"], w["end"]) for w in item["windows"]],
+            )
+            for item in loading.analyze()
+        }
+        assert report == _naive_loading(resources, starts, ends, capacity)
+
+
+def test_back_to_back_handoff_is_not_an_overlap():
+    loading = ResourceLoading(["A", "A"], ["2025-01-01", "2025-01-05"], ["2025-01-05", "2025-01-08"], ["T1", "T2"])
+    assert loading.analyze()[0]["over_allocated_days"] == 0
+    index = IntervalIndex(["2025-01-01", "2025-01-05"], ["2025-01-05", "2025-01-08"])
+    assert index.at("2025-01-05") == [1]
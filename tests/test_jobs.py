@@ -0,0 +1,71 @@
+import os
+import time
+
+from atlas.jobs import FINISHED, JobManager
+
+
+def _wait(manager, job_id, timeout=5):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = manager.status(job_id)
+        if job["state"] in FINISHED:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def _counting(calls, fail=False):
+    def run(progress):
+        calls.append(1)
+        progress("scan", "ok")
+        if fail:
+            raise RuntimeError("boom")
+    return run
+
+
+def test_done_job_is_never_rerun(tmp_path):
+    manager, calls = JobManager(str(tmp_path), max_workers=1), []
+    job_id = manager.submit(_counting(calls), job_id="crew-a")
+    job = _wait(manager, job_id)
+    assert job["state"] == "done" and job["stages"][0]["name"] == "scan"
+    manager.submit(_counting(calls), job_id="crew-a")
+    manager.submit(_counting(calls), job_id="crew-a", retry=True)
+    assert _wait(manager, job_id)["state"] == "done" and len(calls) == 1
+
+
+def test_failed_job_reruns_only_on_retry(tmp_path):
+    manager, calls = JobManager(str(tmp_path), max_workers=1), []
+    job_id = manager.submit(_counting(calls, fail=True), job_id="crew-b")
+    assert _wait(manager, job_id)["error"] == "RuntimeError: boom"
+    manager.submit(_counting(calls), job_id=job_id)
+    assert _wait(manager, job_id)["state"] == "failed" and len(calls) == 1
+    manager.submit(_counting(calls), job_id=job_id, retry=True)
+    assert _wait(manager, job_id)["state"] == "done" and len(calls) == 2
+
+
+def test_record_left_by_another_process_is_interrupted(tmp_path):
+    first = JobManager(str(tmp_path), max_workers=1)
+    job_id = first.submit(lambda progress: None, job_id="crew-c")
+    _wait(first, job_id)
+    first._update(job_id, state="running")  # as if the process died mid-run
+
+    manager, calls = JobManager(str(tmp_path), max_workers=1), []
+    assert manager.status(job_id)["state"] == "interrupted"
+    manager.submit(_counting(calls), job_id=job_id)
+    assert manager.status(job_id)["state"] == "interrupted" and not calls
+    manager.submit(_counting(calls), job_id=job_id, retry=True)
+    assert _wait(manager, job_id)["state"] == "done" and calls == [1]
+
+
+def test_expired_records_are_pruned_and_rerun(tmp_path):
+    manager, calls = JobManager(str(tmp_path), max_workers=1, ttl=60), []
+    job_id = manager.submit(_counting(calls), job_id="crew-d")
+    _wait(manager, job_id)
+    other = manager.submit(lambda progress: None, job_id="crew-e")
+    _wait(manager, other)
+    old = time.time() - 120
+    for name in ("crew-d", "crew-e"):
+        os.utime(tmp_path / f"{name}.json", (old, old))
+    manager.submit(_counting(calls), job_id=job_id)
+    assert _wait(manager, job_id)["state"] == "done" and len(calls) == 2
+    assert manager.status(other) is None
@@ -0,0 +1,26 @@
+import random
+
+from atlas.keywords import DEFAULT_VOCABULARY, KeywordMatcher
+
+
+def test_overlapping_terms_of_other_tags_do_not_hide_a_match():
+    matcher = KeywordMatcher({"type_delay": ["late"], "type_safety": ["plate"]})
+    assert matcher.match("unplated delivery", {"type_delay"}) == {"type_delay"}
+    assert matcher.match("unplated delivery") == {"type_delay", "type_safety"}
+    assert matcher.match("unplated delivery", {"type_safety"}) == {"type_safety"}
+
+
+def test_matches_substring_checks():
+    rng = random.Random(19)
+    vocabulary = {"a": ["ab", "bca"], "b": ["cab", "b"], "c": ["aaa"], "empty": []}
+    matcher = KeywordMatcher(vocabulary)
+    for _ in range(2000):
+        text = "".join(rng.choices("abcAB ", k=rng.randrange(12)))
+        allowed = set(rng.sample(list(vocabulary), rng.randrange(len(vocabulary) + 1)))
+        expected = {tag for tag in allowed if any(term in text.lower() for term in vocabulary[tag])}
+        assert matcher.match(text, allowed) == expected
+
+
+def test_default_vocabulary_is_case_insensitive():
+    matcher = KeywordMatcher(DEFAULT_VOCABULARY)
+    assert matcher.match("Inspection FAILED; shipment Delayed") == {"type_inspection", "type_delay"}
@@ -0,0 +1,65 @@
+from types import SimpleNamespace
+
+from atlas import llm_cache
+from atlas.llm_cache import ResponseCache, crew_cache_key
+
+
+class BaseTool:
+    """Stand-in with the pydantic surface crew_cache_key reads from crewai's BaseTool."""
+
+    model_fields = {"name": None, "description": None, "cache_function": None}
+    cache_function = staticmethod(lambda *args: True)
+
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+    def model_dump(self, include=()):
+        return {field: getattr(self, field) for field in include}
+
+
+BaseTool.__module__ = "crewai.tools.base_tool"
+
+
+class RoutesTool(BaseTool):
+    model_fields = {**BaseTool.model_fields, "routes": None}
+    name = "DispatchIssues"
+    description = "Routes issues."
+
+    def _run(self):
+        raise AssertionError("building a cache key must not run tools")
+
+
+def _crew(routes, backstory="Triage lead."):
+    agent = SimpleNamespace(role="Dispatcher", goal="Route", backstory=backstory, llm=None, tools=[])
+    task = SimpleNamespace(description="Route issues.", expected_output="Routes", agent=agent,
+                           tools=[RoutesTool(routes=routes)])
+    return SimpleNamespace(agents=[agent], tasks=[task])
+
+
+def test_crew_key_covers_tool_inputs_without_running_tools():
+    key = crew_cache_key(_crew([{"issue_type": "type_delay"}]))
+    assert key == crew_cache_key(_crew([{"issue_type": "type_delay"}]))
+    assert key != crew_cache_key(_crew([{"issue_type": "type_safety"}]))
+    assert key != crew_cache_key(_crew([{"issue_type": "type_delay"}], backstory="Other."))
+    assert key != crew_cache_key(_crew([{"issue_type": "type_delay"}]), inputs="project-digest")
+
+
+def test_response_cache_evicts_least_recently_used(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.sqlite"), max_bytes=25, ttl=3600)
+    cache.put("a", "x" * 10)
+    cache.put("b", "y" * 10)
+    assert cache.get("a") == "x" * 10  # a is now more recent than b
+    cache.put("c", "z" * 10)
+    assert cache.get("b") is None
+    assert cache.get("a") == "x" * 10 and cache.get("c") == "z" * 10
+
+
+def test_response_cache_expires_entries(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(llm_cache.time, "time", lambda: now[0])
+    cache = ResponseCache(str(tmp_path / "cache.sqlite"), ttl=60)
+    cache.put("a", "x")
+    now[0] += 59
+    assert cache.get("a") == "x"
+    now[0] += 2
+    assert cache.get("a") is None
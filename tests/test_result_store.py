@@ -0,0 +1,46 @@
+import json
+
+import pytest
+
+from atlas.result_store import ResultStore, export, export_path
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setenv("ATLAS_EXPORT_DIR", str(tmp_path / "exports"))
+    return ResultStore(str(tmp_path / "results.sqlite"))
+
+
+def _read(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_concurrent_runs_export_to_their_own_files(store):
+    first, second = store.new_run("a.json"), store.new_run("b.json")
+    export(first, "safety", {"violations": [1]})
+    export(second, "safety", {"violations": [2]})
+    assert _read(export_path(first, "safety")) == {"violations": [1]}
+    assert _read(export_path(second, "safety")) == {"violations": [2]}
+    with pytest.raises(ValueError):
+        export_path("../elsewhere", "safety")
+
+
+def test_restore_copies_rows_and_export_from_the_matching_run(store):
+    first = store.new_run("a.json", run_id="run-1")
+    rows = [{"agent": "SafetyAgent", "violation": "No harness"}, {"agent": "SafetyAgent", "violation": "Open trench"}]
+    store.write("safety", first, rows, input_key="key-1", output="two violations")
+    export(first, "safety", {"violations": rows})
+
+    second = store.new_run("a.json", run_id="run-2")
+    store.write("safety", second, [{"agent": "SafetyAgent", "violation": "stale"}])
+    assert store.restore("safety", second, "key-2") is None
+    assert store.restore("safety", second, "key-1") == "two violations"
+    assert store.read("safety", second) == rows
+    assert store.read("safety", second, agent="SafetyAgent") == rows
+    assert _read(export_path(second, "safety")) == {"violations": rows}
+
+    # The run's own checkpoint wins over a newer one from another run.
+    store.write("safety", "run-3", rows[:1], input_key="key-1", output="one violation")
+    assert store.restore("safety", second, "key-1") == "two violations"
+    assert store.read("safety", first) == rows
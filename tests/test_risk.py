@@ -0,0 +1,47 @@
+import numpy as np
+
+from atlas.risk import ScheduleRisk
+from atlas.schedule import ScheduleNetwork, to_date, to_days
+
+
+def _chain(durations):
+    """Activities back to back from 2025-01-01."""
+    ids = [f"T{i}" for i in range(len(durations))]
+    starts = to_days("2025-01-01") + np.concatenate([[0], np.cumsum(durations)[:-1]])
+    return ScheduleNetwork(
+        ids,
+        [to_date(s) for s in starts],
+        [to_date(s + d) for s, d in zip(starts, durations)],
+        [[]] + [[task_id] for task_id in ids[:-1]],
+    )
+
+
+def test_fixed_durations_finish_as_planned():
+    network = _chain([3, 4, 5])
+    risk = ScheduleRisk(network, low=network.duration, high=network.duration)
+    finishes = risk.simulate(iterations=50, seed=1)
+    assert (finishes == network.finish).all()
+    assert set(risk.percentiles(finishes).values()) == {to_date(network.finish)}
+    shift = np.array([0, 2, 0])
+    assert (risk.simulate(iterations=5, shift=shift, seed=1) == network.finish + 2).all()
+
+
+def test_percentiles_follow_the_triangular_distribution():
+    network = _chain([10])
+    risk = ScheduleRisk(network, low=np.array([0.0]), high=np.array([20.0]))
+    finishes = risk.simulate(iterations=200_000, seed=7) - network.start[0]
+    # Symmetric triangular(0, 10, 20): P50 = 10, P80 = 20 - sqrt(0.2 * 200).
+    assert abs(np.median(finishes) - 10) < 0.1
+    assert abs(np.percentile(finishes, 80) - (20 - np.sqrt(40))) < 0.1
+    assert finishes.min() >= 0 and finishes.max() <= 20
+
+
+def test_process_pool_is_seeded_and_matches_the_serial_distribution():
+    network = _chain([5, 8, 3, 6])
+    risk = ScheduleRisk(network)
+    pooled = risk.simulate(iterations=4000, seed=3, processes=2)
+    assert len(pooled) == 4000
+    assert (pooled == risk.simulate(iterations=4000, seed=3, processes=2)).all()
+    serial = risk.simulate(iterations=4000, seed=3)
+    assert abs(pooled.mean() - serial.mean()) < 0.2
+    assert risk.percentiles(pooled).keys() == {"P50", "P80", "P95"}
@@ -0,0 +1,39 @@
+import calendar
+import time
+
+from atlas.run_history import RunHistory
+
+
+def _at(day, hour=12):
+    """UTC timestamp of ``hour`` o'clock on ``day``."""
+    return calendar.timegm(time.strptime(day, "%Y-%m-%d")) + hour * 3600
+
+
+def test_tag_trend_aggregates_per_day_and_tag(tmp_path):
+    history = RunHistory(str(tmp_path / "history.sqlite"))
+    history.append("atlas", {}, tags={"type_delay": 2, "type_safety": 1}, started=_at("2025-03-01"))
+    history.append("atlas", {}, tags={"type_delay": 3}, started=_at("2025-03-01", 18))
+    history.append("atlas", {}, tags={"type_delay": 1}, started=_at("2025-03-02"))
+    history.append("other", {}, tags={"type_delay": 9}, started=_at("2025-03-01"))
+
+    assert history.tag_trend("atlas") == [
+        ("2025-03-01", "type_delay", 2, 5),
+        ("2025-03-01", "type_safety", 1, 1),
+        ("2025-03-02", "type_delay", 1, 1),
+    ]
+    assert history.tag_trend("atlas", since="2025-03-02") == [("2025-03-02", "type_delay", 1, 1)]
+    assert history.tag_trend(until="2025-03-01") == [
+        ("2025-03-01", "type_delay", 3, 14),
+        ("2025-03-01", "type_safety", 1, 1),
+    ]
+
+
+def test_runs_list_summaries_and_load_restores_stages(tmp_path):
+    history = RunHistory(str(tmp_path / "history.sqlite"))
+    first = history.append("atlas", {"scan": ["a"]}, input_hash="h1", tags={"type_delay": 1}, started=_at("2025-03-01"))
+    second = history.append("atlas", {"scan": ["b"]}, input_hash="h2", started=_at("2025-03-02"))
+    assert [run["id"] for run in history.runs("atlas")] == [second, first]
+    assert [run["id"] for run in history.runs(tag="type_delay")] == [first]
+    record = history.load(first)
+    assert record["stages"] == {"scan": ["a"]} and record["tags"] == {"type_delay": 1}
+    assert history.load(999) is None
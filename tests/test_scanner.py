@@ -0,0 +1,67 @@
+import io
+import json
+import random
+
+from atlas.scanner import SCAN_SECTIONS, ScannerLogic, iter_sections
+
+
+def _value(rng, depth=0):
+    kind = rng.randrange(7 if depth < 3 else 4)
+    if kind == 0:
+        return rng.choice([None, True, False])
+    if kind == 1:
+        return rng.choice([0, -7, 3.25, 1e-3, 12345678901234])
+    if kind == 2:
+        return rng.choice(["", "delay", "a \"quoted\" ] } , :", "ünïcode ✓", "back\\slash\nline"])
+    if kind == 3:
+        return "x" * rng.randrange(200)
+    if kind == 4:
+        return [_value(rng, depth + 1) for _ in range(rng.randrange(4))]
+    return {f"k{i}": _value(rng, depth + 1) for i in range(rng.randrange(4))}
+
+
+def _project(rng):
+    return {
+        "project": {"name": "Atlas", "phases": [_value(rng) for _ in range(3)]},
+        "activities": [{"task_id": f"T{i}", "notes": _value(rng)} for i in range(rng.randrange(5))],
+        "emails": [
+            {"subject": f"S{i}", "body": rng.choice(["Shipment delay", "all good"]), "date": "2025-01-02"}
+            for i in range(rng.randrange(6))
+        ],
+        "site_logs": [
+            {"description": rng.choice(["PPE violation", "clean"]), "log_date": "2025-01-03"}
+            for _ in range(rng.randrange(6))
+        ],
+        "inspection_reports": [
+            {"report_id": f"R{i}", "status": rng.choice(["Fail", "Pass"]), "area": "L2",
+             "comments": "membrane", "date": "2025-01-04"}
+            for i in range(rng.randrange(6))
+        ],
+        "empty": [],
+    }
+
+
+def test_iter_sections_matches_json_load():
+    rng = random.Random(1)
+    for _ in range(200):
+        data = _project(rng)
+        text = json.dumps(data, indent=rng.choice([None, 2]), ensure_ascii=rng.random() < 0.5)
+        sections = ("activities", "emails", "empty", "missing")
+        expected = [(s, i, r) for s in data if s in sections for i, r in enumerate(data[s])]
+        # Tiny chunks split tokens, strings and escapes across reads.
+        for chunk_size in (1, 7, 1 << 16):
+            assert list(iter_sections(io.StringIO(text), sections, chunk_size)) == expected
+            assert list(iter_sections(io.BytesIO(text.encode("utf-8")), sections, chunk_size)) == expected
+
+
+def test_stream_matches_in_memory_scan(tmp_path):
+    rng = random.Random(2)
+    path = tmp_path / "project.json"
+    for _ in range(50):
+        data = _project(rng)
+        path.write_text(json.dumps(data), encoding="utf-8")
+        assert list(ScannerLogic.stream(str(path), chunk_size=5)) == ScannerLogic(data).scan()
+
+
+def test_empty_project():
+    assert list(iter_sections(io.StringIO("{}"), SCAN_SECTIONS)) == []
@@ -0,0 +1,113 @@
+import random
+
+import numpy as np
+import pytest
+
+from atlas.schedule import ScheduleNetwork, to_date
+
+BASE = 20000  # day number (2024-10-04)
+
+
+def _network(rng, n):
+    """A random DAG in shuffled order: ids, start days, durations, predecessor ids."""
+    ids = [f"T{i}" for i in range(n)]
+    preds = [[ids[j] for j in range(i) if rng.random() < 3 / max(i, 1)] for i in range(n)]
+    order = rng.sample(range(n), n)
+    return (
+        [ids[i] for i in order],
+        [BASE + rng.randrange(30) for _ in order],
+        [rng.randrange(0, 11) for _ in order],
+        [preds[i] for i in order],
+    )
+
+
+def _build(ids, starts, durations, preds):
+    return ScheduleNetwork(
+        ids, [to_date(s) for s in starts], [to_date(s + d) for s, d in zip(starts, durations)], preds
+    )
+
+
+def _naive(ids, starts, durations, preds):
+    index = {task_id: i for i, task_id in enumerate(ids)}
+    succs = [[] for _ in ids]
+    for i, ps in enumerate(preds):
+        for p in ps:
+            succs[index[p]].append(i)
+    es, ef, done = {}, {}, set()
+    while len(done) < len(ids):
+        for i in range(len(ids)):
+            if i not in done and all(index[p] in done for p in preds[i]):
+                es[i] = max([starts[i]] + [ef[index[p]] for p in preds[i]])
+                ef[i] = es[i] + durations[i]
+                done.add(i)
+    finish = max(ef.values())
+    tail = {}
+
+    def tail_of(i):
+        if i not in tail:
+            tail[i] = max([durations[s] + tail_of(s) for s in succs[i]], default=0)
+        return tail[i]
+
+    result = {}
+    for i in range(len(ids)):
+        lf = finish - tail_of(i)
+        free = min((es[s] for s in succs[i]), default=finish) - ef[i]
+        result[ids[i]] = (es[i], ef[i], lf, lf - durations[i], lf - durations[i] - es[i], free)
+    return finish, result
+
+
+def _dates(network):
+    return network.finish, {
+        task_id: (
+            int(network.es[i]), int(network.ef[i]), int(network.lf[i]),
+            int(network.ls[i]), int(network.total_float[i]), int(network.free_float[i]),
+        )
+        for task_id, i in network.index.items()
+    }
+
+
+def test_cpm_matches_naive_passes():
+    rng = random.Random(9)
+    for _ in range(300):
+        spec = _network(rng, rng.randrange(1, 40))
+        assert _dates(_build(*spec)) == _naive(*spec)
+
+
+def test_incremental_updates_match_a_rebuild():
+    rng = random.Random(11)
+    for _ in range(300):
+        ids, starts, durations, preds = _network(rng, rng.randrange(1, 40))
+        network = _build(ids, starts, durations, preds)
+        for _ in range(5):
+            changes = {}
+            for i in rng.sample(range(len(ids)), rng.randrange(1, min(4, len(ids)) + 1)):
+                kind = rng.randrange(3)
+                if kind == 0:
+                    starts[i] = BASE + rng.randrange(40)
+                    changes[ids[i]] = {"start_date": to_date(starts[i])}
+                elif kind == 1:
+                    durations[i] = rng.randrange(0, 15)
+                    changes[ids[i]] = {"duration": durations[i]}
+                else:
+                    end = starts[i] + rng.randrange(-3, 15)
+                    durations[i] = max(end - starts[i], 0)
+                    changes[ids[i]] = {"end_date": to_date(end)}
+            network.update_activities(changes)
+            assert _dates(network) == _dates(_build(ids, starts, durations, preds))
+
+
+def test_forward_accepts_a_batch_axis():
+    rng = random.Random(3)
+    network = _build(*_network(rng, 25))
+    durations = network.duration + np.arange(4)[:, None]
+    es, ef = network.forward(duration=durations)
+    for row in range(4):
+        other = network.copy()
+        other.duration = durations[row]
+        row_es, row_ef = other.forward()
+        assert (es[row] == row_es).all() and (ef[row] == row_ef).all()
+
+
+def test_cycle_is_rejected():
+    with pytest.raises(ValueError, match="cycle"):
+        ScheduleNetwork(["A", "B"], ["2025-01-01"] * 2, ["2025-01-02"] * 2, [["B"], ["A"]])
@@ -0,0 +1,59 @@
+import math
+import os
+import random
+
+import pytest
+
+from atlas.search import SearchIndex, _tokens
+
+WORDS = "pump crane delay membrane level elevator pit inspection rebar pour slab permit".split()
+
+
+def _naive_scores(docs, query, k1=SearchIndex.k1, b=SearchIndex.b):
+    tokenized = [_tokens(text) for text in docs]
+    average = sum(map(len, tokenized)) / len(tokenized)
+    scores = []
+    for tokens in tokenized:
+        score = 0.0
+        for term in set(_tokens(query)):
+            df = sum(term in other for other in tokenized)
+            tf = tokens.count(term)
+            if tf:
+                idf = math.log(1 + (len(docs) - df + 0.5) / (df + 0.5))
+                score += idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * len(tokens) / average))
+        scores.append(score)
+    return scores
+
+
+def test_bm25_matches_naive_scores(tmp_path):
+    rng = random.Random(13)
+    path = str(tmp_path / "results.txt")
+    open(path, "w").close()
+    for _ in range(200):
+        docs = [" ".join(rng.choices(WORDS, k=rng.randrange(1, 12))) for _ in range(rng.randrange(1, 25))]
+        query = " ".join(rng.sample(WORDS, rng.randrange(1, 4)))
+        index = SearchIndex()
+        index.sync({path: lambda _: [(f"doc {i}", text) for i, text in enumerate(docs)]})
+        expected = sorted((round(s, 3) for s in _naive_scores(docs, query) if s > 0), reverse=True)[:8]
+        assert [hit["score"] for hit in index.search(query, limit=8)] == pytest.approx(expected, abs=1e-3)
+
+
+def test_sync_reindexes_only_changed_files_and_survives_failures(tmp_path):
+    path = str(tmp_path / "results.txt")
+    open(path, "w").close()
+    index = SearchIndex()
+    assert index.sync({path: lambda _: [("a", "elevator pit flooded")]}) == [path]
+    assert index.sync({path: lambda _: [("a", "never read")]}) == []
+
+    def broken(_):
+        yield "b", "elevator shaft"
+        raise ValueError("malformed project file")
+
+    os.utime(path, (1, 1))
+    with pytest.raises(ValueError):
+        index.sync({path: broken})
+    # The failed read left the previous documents in place, without orphans.
+    assert [hit["snippet"] for hit in index.search("elevator")] == ["elevator pit flooded"]
+    assert index.sync({path: lambda _: [("a", "crane permit")]}) == [path]
+    assert len(index.docs) == 1 and set(index.postings) == {"crane", "permit"}
+    assert index.sync({}) == [] and not index.docs and not index.postings
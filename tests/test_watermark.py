@@ -0,0 +1,61 @@
+import json
+import random
+
+from atlas.scanner import ScannerLogic
+from atlas.watermark import Watermark
+
+
+def _email(i, day):
+    return {"subject": f"Update {i}", "body": "Shipment delay reported", "date": f"2025-01-{day:02d}"}
+
+
+def _report(i, day):
+    return {"report_id": f"R{i}", "status": "Fail", "area": "L2", "comments": "rework", "date": f"2025-01-{day:02d}"}
+
+
+def test_incremental_scans_see_each_record_once(tmp_path):
+    rng = random.Random(17)
+    project = tmp_path / "project.json"
+    mark_path = str(tmp_path / "watermark.json")
+    data = {"emails": [], "inspection_reports": []}
+    seen, day, count = set(), 1, 0
+    for _ in range(40):
+        # Appends never predate the mark, but often land on the same day as it.
+        day = min(day + rng.randrange(2), 28)
+        for _ in range(rng.randrange(4)):
+            data["emails"].append(_email(count, day))
+            data["inspection_reports"].append(_report(count, day))
+            count += 1
+        project.write_text(json.dumps(data), encoding="utf-8")
+
+        watermark = Watermark(mark_path)
+        issues = list(ScannerLogic.stream(str(project), watermark=watermark))
+        # Rescanning before save returns the same issues.
+        assert list(ScannerLogic.stream(str(project), watermark=Watermark(mark_path))) == issues
+        watermark.save()
+
+        expected = {(r["subject"], r["date"]) for r in data["emails"]} | {
+            (r["report_id"], r["date"]) for r in data["inspection_reports"]
+        }
+        found = {(issue.text.split(":")[0] if issue.section == "emails" else issue.record_id, issue.date)
+                 for issue in issues}
+        assert found == expected - seen
+        seen = expected
+
+    # An unchanged file is skipped without being read.
+    assert list(ScannerLogic.stream(str(project), watermark=Watermark(mark_path))) == []
+
+
+def test_identical_record_appended_on_the_mark_date_is_new(tmp_path):
+    project = tmp_path / "project.json"
+    mark_path = str(tmp_path / "watermark.json")
+    data = {"emails": [_email(0, 5)]}
+    project.write_text(json.dumps(data), encoding="utf-8")
+    watermark = Watermark(mark_path)
+    assert len(list(ScannerLogic.stream(str(project), watermark=watermark))) == 1
+    watermark.save()
+
+    data["emails"].append(_email(0, 5))
+    project.write_text(json.dumps(data), encoding="utf-8")
+    issues = list(ScannerLogic.stream(str(project), watermark=Watermark(mark_path)))
+    assert [issue.record_id for issue in issues] == ["emails[1]"]